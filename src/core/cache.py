@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """Bounded in-process LRU cache whose entries expire after a fixed TTL.
+
+    Bounded by entry count and, when ``max_bytes`` is given, by the total of
+    ``sizeof(value)`` across entries; least recently used entries go first.
+
+    Not thread-safe; intended for use from a single event loop where
+    get/set never yield.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl_seconds: float = 300.0,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[V], int]] = None,
+    ):
+        if max_bytes is not None and sizeof is None:
+            raise ValueError("max_bytes requires a sizeof function")
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self.current_bytes = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, V, int]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        if key in self._data:
+            self._remove(key)
+        size = self._sizeof(value) if self._sizeof is not None else 0
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value, size)
+        self.current_bytes += size
+        while len(self._data) > self.maxsize or (
+            self.max_bytes is not None and self.current_bytes > self.max_bytes and self._data
+        ):
+            _, (_, _, evicted_size) = self._data.popitem(last=False)
+            self.current_bytes -= evicted_size
+
+    def pop(self, key: Hashable) -> Optional[V]:
+        if key not in self._data:
+            return None
+        return self._remove(key)
+
+    def values(self) -> List[V]:
+        """Unexpired values, least recently used first."""
+        now = time.monotonic()
+        return [value for expires_at, value, _ in self._data.values() if expires_at > now]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.current_bytes = 0
+
+    def _remove(self, key: Hashable) -> V:
+        _, value, size = self._data.pop(key)
+        self.current_bytes -= size
+        return value
+
+    def __len__(self) -> int:
+        return len(self._data)
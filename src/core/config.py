@@ -28,6 +28,14 @@ class DataStoreSettings(BaseModel):
     database_url: str
     redis_url: str
 
+    # Connection pool; pool_timeout makes exhaustion fail fast instead of queueing indefinitely
+    db_pool_size: int = Field(default=20, ge=1)
+    db_max_overflow: int = Field(default=40, ge=0)
+    db_pool_timeout: float = Field(default=10.0, gt=0)
+    db_pool_recycle_seconds: int = Field(default=1800, ge=-1)
+    # Behind pgbouncer in transaction mode: no app-side pool, no cached prepared statements
+    db_pgbouncer: bool = Field(default=False)
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
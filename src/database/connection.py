@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import os
 from contextlib import asynccontextmanager
-from typing import AsyncIterator, Optional
+from typing import Any, AsyncIterator, Dict, Optional
+from uuid import uuid4
 
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlalchemy import text
 
 try:
@@ -42,7 +44,46 @@ def _get_database_url() -> str:
     return env_val
 
 
-def init_engine(echo: bool = False, pool_size: int = 10, max_overflow: int = 20) -> AsyncEngine:
+def _get_datastore_option(name: str, default: Any) -> Any:
+    # Same lookup order as the URL: settings.datastore, then an upper-cased env var
+    if get_settings is not None:
+        try:
+            datastore = get_settings().datastore
+        except Exception:  # pragma: no cover
+            datastore = None
+        if datastore is not None and getattr(datastore, name, None) is not None:
+            return getattr(datastore, name)
+    env_val = os.getenv(name.upper())
+    if env_val is None:
+        return default
+    if isinstance(default, bool):
+        return env_val.lower() in ("1", "true", "yes")
+    return type(default)(env_val)
+
+
+def _engine_options(url: str, pool_size: Optional[int], max_overflow: Optional[int]) -> Dict[str, Any]:
+    if _get_datastore_option("db_pgbouncer", False):
+        # pgbouncer (transaction mode) owns pooling; a server connection may change
+        # between statements, so prepared statements must not be cached or reused by name
+        options: Dict[str, Any] = {"poolclass": NullPool}
+        if "+asyncpg" in url:
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        return options
+
+    return {
+        "pool_size": pool_size if pool_size is not None else _get_datastore_option("db_pool_size", 20),
+        "max_overflow": max_overflow if max_overflow is not None else _get_datastore_option("db_max_overflow", 40),
+        "pool_timeout": _get_datastore_option("db_pool_timeout", 10.0),
+        "pool_recycle": _get_datastore_option("db_pool_recycle_seconds", 1800),
+        "pool_pre_ping": True,
+    }
+
+
+def init_engine(echo: bool = False, pool_size: Optional[int] = None, max_overflow: Optional[int] = None) -> AsyncEngine:
     global _engine, _SessionLocal
 
     if _engine is not None:
@@ -52,10 +93,8 @@ def init_engine(echo: bool = False, pool_size: int = 10, max_overflow: int = 20)
     _engine = create_async_engine(
         url,
         echo=echo,
-        pool_size=pool_size,
-        max_overflow=max_overflow,
-        pool_pre_ping=True,
         future=True,
+        **_engine_options(url, pool_size, max_overflow),
     )
     _SessionLocal = async_sessionmaker(bind=_engine, expire_on_commit=False, autoflush=False, autocommit=False)
     return _engine
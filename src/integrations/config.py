@@ -59,6 +59,12 @@ class TLSVersion(str, Enum):
     TLS_1_3 = "1.3"
 
 
+class HTTPBackend(str, Enum):
+    """HTTP transport backends for integration clients."""
+    HTTPX = "httpx"
+    AIOHTTP = "aiohttp"
+
+
 class EncryptionAlgorithm(str, Enum):
     """Supported encryption algorithms."""
     AES_256_GCM = "AES-256-GCM"
@@ -152,7 +158,9 @@ class SyncConfig(BaseModel):
     direction: ConflictResolution = Field(default=ConflictResolution.LAST_WRITE_WINS, description="Conflict resolution strategy")
     lag_threshold_seconds: int = Field(default=5, ge=1, le=300, description="Maximum acceptable sync lag in seconds")
     batch_size: int = Field(default=100, ge=1, le=1000, description="Batch size for bulk operations")
+    max_concurrency: int = Field(default=16, ge=1, le=100, description="Maximum record syncs in flight at once")
     enable_real_time: bool = Field(default=False, description="Enable real-time synchronization")
+    lock_ttl_seconds: int = Field(default=900, ge=10, le=86400, description="Expiry of the cross-worker sync lock; should exceed the longest sync")
     
     @validator("lag_threshold_seconds")
     def validate_lag_threshold(cls, v: int) -> int:
@@ -214,6 +222,15 @@ class SalesforceIntegrationConfig(BaseIntegrationConfig):
     enable_platform_events: bool = Field(default=True, description="Enable Platform Events")
     enable_omni_channel: bool = Field(default=True, description="Enable Omni-Channel integration")
     sync_objects: List[str] = Field(default_factory=lambda: ["Case", "Contact", "Account"], description="Objects to sync")
+    knowledge_article_cache_ttl_seconds: int = Field(default=900, ge=0, description="TTL for cached knowledge articles")
+    knowledge_search_cache_ttl_seconds: int = Field(default=300, ge=0, description="TTL for cached knowledge searches")
+    knowledge_cache_max_entries: int = Field(default=1024, ge=1, description="Maximum cached knowledge entries")
+    case_cache_ttl_seconds: int = Field(default=300, ge=0, description="TTL for last-known case state used to answer updates")
+    case_cache_max_entries: int = Field(default=1024, ge=1, description="Maximum cached cases")
+    http_backend: HTTPBackend = Field(default=HTTPBackend.HTTPX, description="HTTP transport backend (aiohttp for high concurrency)")
+    presence_flush_ms: int = Field(default=500, ge=0, description="Window for coalescing agent presence updates")
+    presence_ttl_seconds: int = Field(default=600, ge=1, description="Idle time after which a tracked agent is marked Offline and forgotten")
+    max_tracked_agents: int = Field(default=10000, ge=1, description="Maximum agents tracked for presence")
     
     # Nested configurations
     rate_limit: RateLimitConfig = Field(default_factory=RateLimitConfig, description="Rate limiting configuration")
@@ -462,6 +479,7 @@ __all__ = [
     "SyncFrequency",
     "ConflictResolution",
     "TLSVersion",
+    "HTTPBackend",
     "EncryptionAlgorithm",
     "BaseIntegrationConfig",
     "OAuth2ClientConfig",
@@ -22,6 +22,7 @@ from .service_cloud import ServiceCloudIntegration as SalesforceServiceCloud
 # Import Salesforce models
 from .models import (
     SalesforceCase,
+    SalesforceCaseRow,
     SalesforceContact,
     SalesforceAccount,
     SalesforceCaseComment,
@@ -44,6 +45,7 @@ __all__ = [
     
     # Models
     "SalesforceCase",
+    "SalesforceCaseRow",
     "SalesforceContact", 
     "SalesforceAccount",
     "SalesforceCaseComment",
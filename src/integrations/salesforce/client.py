@@ -14,12 +14,15 @@ from __future__ import annotations
 
 import asyncio
 import json
+import re
 import ssl
 from datetime import datetime, timedelta
-from typing import Any, AsyncGenerator, Dict, List, Optional, Union
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple, Union
 from urllib.parse import urlencode, quote
 import httpx
 import jwt
+import orjson
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import rsa
 
@@ -27,18 +30,55 @@ from src.core.config import get_settings
 from src.core.logging import get_logger
 from src.core.exceptions import ExternalServiceError, RateLimitError
 from ..base import BaseIntegrationImpl, OAuth2Client
-from ..config import SecurityConfig, SalesforceIntegrationConfig
+from ..config import HTTPBackend, SecurityConfig, SalesforceIntegrationConfig
 from .. import IntegrationType
 
 logger = get_logger(__name__)
 
+# Maximum records accepted by a single sObject Collections request
+SOBJECT_COLLECTION_LIMIT = 200
+
+_API_PATH_PREFIX = re.compile(r"^.*?/services/data/v[\d.]+/")
+
 
 class SalesforceAPIError(ExternalServiceError):
     """Salesforce API specific errors."""
     
     def __init__(self, message: str, error_code: Optional[str] = None, details: Optional[Dict[str, Any]] = None):
-        super().__init__(message, details)
+        super().__init__(message, code=error_code)
         self.error_code = error_code
+        self.details = details or {}
+
+
+@lru_cache(maxsize=16)
+def _build_ssl_context(
+    tls_version: str,
+    ssl_cert_path: Optional[str],
+    ssl_key_path: Optional[str],
+    cipher_suites: Tuple[str, ...]
+) -> ssl.SSLContext:
+    """
+    Create an SSL context for a security configuration.
+    
+    Building a context loads the CA bundle from disk, so contexts are cached
+    and shared between clients with identical settings.
+    """
+    context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
+    
+    if tls_version == "1.3":
+        context.minimum_version = ssl.TLSVersion.TLSv1_3
+    else:
+        context.minimum_version = ssl.TLSVersion.TLSv1_2
+    
+    # Custom certificate if provided
+    if ssl_cert_path and ssl_key_path:
+        context.load_cert_chain(certfile=ssl_cert_path, keyfile=ssl_key_path)
+    
+    # Cipher suites if specified
+    if cipher_suites:
+        context.set_ciphers(":".join(cipher_suites))
+    
+    return context
 
 
 class SalesforceClient:
@@ -67,15 +107,15 @@ class SalesforceClient:
         self._last_api_check = datetime.utcnow()
     
     def _create_http_client(self) -> httpx.AsyncClient:
-        """Create configured HTTP client."""
+        """Create the long-lived, pooled HTTP client shared by all requests."""
         # SSL/TLS configuration
         ssl_context = self._create_ssl_context()
         
-        # Connection pooling configuration
+        # Connection pooling configuration; keep connections warm so calls skip TLS handshakes
         limits = httpx.Limits(
-            max_connections=100,
-            max_keepalive_connections=20,
-            keepalive_expiry=30
+            max_connections=200,
+            max_keepalive_connections=100,
+            keepalive_expiry=60
         )
         
         timeout = httpx.Timeout(
@@ -85,10 +125,22 @@ class SalesforceClient:
             pool=self.config.timeout_seconds
         )
         
+        # Optional aiohttp transport scales better under high concurrency;
+        # the transport owns a single ClientSession, closed with the client
+        transport = None
+        if self.config.http_backend == HTTPBackend.AIOHTTP:
+            try:
+                from httpx_aiohttp import AiohttpTransport
+            except ImportError:
+                raise SalesforceAPIError("httpx-aiohttp package not installed")
+            
+            transport = AiohttpTransport(verify=ssl_context, limits=limits)
+        
         return httpx.AsyncClient(
             verify=ssl_context,
             limits=limits,
             timeout=timeout,
+            transport=transport,
             headers={
                 "User-Agent": "AI-Customer-Service-Agent/1.0",
                 "Accept": "application/json",
@@ -97,29 +149,15 @@ class SalesforceClient:
         )
     
     def _create_ssl_context(self) -> ssl.SSLContext:
-        """Create SSL context with security configuration."""
+        """Get the shared SSL context for the security configuration."""
         security_config = self.config.security
         
-        # Create SSL context
-        if security_config.tls_version == "1.3":
-            context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
-            context.minimum_version = ssl.TLSVersion.TLSv1_3
-        else:
-            context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
-            context.minimum_version = ssl.TLSVersion.TLSv1_2
-        
-        # Custom certificate if provided
-        if security_config.ssl_cert_path and security_config.ssl_key_path:
-            context.load_cert_chain(
-                certfile=security_config.ssl_cert_path,
-                keyfile=security_config.ssl_key_path
-            )
-        
-        # Cipher suites if specified
-        if security_config.cipher_suites:
-            context.set_ciphers(":".join(security_config.cipher_suites))
-        
-        return context
+        return _build_ssl_context(
+            security_config.tls_version,
+            security_config.ssl_cert_path,
+            security_config.ssl_key_path,
+            tuple(security_config.cipher_suites)
+        )
     
     def _create_oauth_client(self) -> OAuth2Client:
         """Create OAuth 2.0 client for Salesforce."""
@@ -218,9 +256,10 @@ class SalesforceClient:
         endpoint: str,
         params: Optional[Dict[str, Any]] = None,
         json_data: Optional[Dict[str, Any]] = None,
-        headers: Optional[Dict[str, str]] = None
-    ) -> Dict[str, Any]:
-        """Make authenticated request to Salesforce API."""
+        headers: Optional[Dict[str, str]] = None,
+        raw: bool = False
+    ) -> Any:
+        """Make authenticated request to Salesforce API; ``raw`` returns the body text."""
         if not self.access_token:
             await self.authenticate()
         
@@ -254,7 +293,11 @@ class SalesforceClient:
             # Update governor limits
             await self._update_governor_limits(response)
             
-            return response.json() if response.content else {}
+            if raw:
+                return response.text
+            
+            # Query pages can carry thousands of records; orjson decodes them much faster
+            return orjson.loads(response.content) if response.content else {}
             
         except httpx.HTTPStatusError as e:
             error_data = {}
@@ -298,6 +341,40 @@ class SalesforceClient:
             params={"q": soql}
         )
     
+    async def query_more(self, next_records_url: str) -> Dict[str, Any]:
+        """Fetch the next page of a SOQL query via its nextRecordsUrl."""
+        # nextRecordsUrl is rooted at the instance, e.g. /services/data/v58.0/query/01g...-2000
+        return await self._make_request("GET", self._relative_endpoint(next_records_url))
+    
+    async def query_paginated(
+        self,
+        soql: str,
+        page_size: Optional[int] = None
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Execute SOQL query and yield each result page as it arrives."""
+        # batchSize is a hint between 200 and 2000; Salesforce may return fewer
+        options = f"batchSize={page_size}" if page_size else None
+        
+        result = await self._make_request(
+            "GET",
+            "query",
+            params={"q": soql},
+            headers={"Sforce-Query-Options": options} if options else None
+        )
+        
+        while True:
+            yield result
+            
+            next_url = result.get("nextRecordsUrl")
+            if result.get("done", True) or not next_url:
+                return
+            
+            result = await self._make_request(
+                "GET",
+                self._relative_endpoint(next_url),
+                headers={"Sforce-Query-Options": options} if options else None
+            )
+    
     async def search(self, sosl: str) -> Dict[str, Any]:
         """Execute SOSL search."""
         return await self._make_request(
@@ -329,6 +406,52 @@ class SalesforceClient:
             json_data=data
         )
     
+    async def create_objects_collection(
+        self,
+        object_type: str,
+        records: List[Dict[str, Any]],
+        all_or_none: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Create up to 200 objects in one sObject Collections request."""
+        if len(records) > SOBJECT_COLLECTION_LIMIT:
+            raise SalesforceAPIError(
+                f"sObject Collections accept at most {SOBJECT_COLLECTION_LIMIT} records, got {len(records)}"
+            )
+        
+        payload = {
+            "allOrNone": all_or_none,
+            "records": [{"attributes": {"type": object_type}, **record} for record in records]
+        }
+        
+        return await self._make_request(
+            "POST",
+            "composite/sobjects",
+            json_data=payload
+        )
+    
+    async def update_objects_collection(
+        self,
+        object_type: str,
+        records: List[Dict[str, Any]],
+        all_or_none: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Update up to 200 objects in one sObject Collections request; each record needs an ``id``."""
+        if len(records) > SOBJECT_COLLECTION_LIMIT:
+            raise SalesforceAPIError(
+                f"sObject Collections accept at most {SOBJECT_COLLECTION_LIMIT} records, got {len(records)}"
+            )
+        
+        payload = {
+            "allOrNone": all_or_none,
+            "records": [{"attributes": {"type": object_type}, **record} for record in records]
+        }
+        
+        return await self._make_request(
+            "PATCH",
+            "composite/sobjects",
+            json_data=payload
+        )
+    
     async def delete_object(self, object_type: str, object_id: str) -> Dict[str, Any]:
         """Delete object."""
         return await self._make_request(
@@ -381,6 +504,54 @@ class SalesforceClient:
             f"jobs/ingest/{job_id}"
         )
     
+    async def create_query_job(self, soql: str) -> str:
+        """Create a Bulk API 2.0 query job and return its ID."""
+        if not self.config.enable_bulk_api:
+            raise SalesforceAPIError("Bulk API is not enabled")
+        
+        response = await self._make_request(
+            "POST",
+            "jobs/query",
+            json_data={"operation": "query", "query": soql}
+        )
+        
+        return response["id"]
+    
+    async def get_query_job_status(self, job_id: str) -> Dict[str, Any]:
+        """Get Bulk API 2.0 query job status."""
+        return await self._make_request(
+            "GET",
+            f"jobs/query/{job_id}"
+        )
+    
+    async def get_query_result_pages(self, job_id: str) -> List[str]:
+        """List the result page links of a completed query job, which can be fetched in parallel."""
+        links: List[str] = []
+        response = await self._make_request("GET", f"jobs/query/{job_id}/resultPages")
+        
+        while True:
+            links.extend(page["resultLink"] for page in response.get("resultPages", []))
+            
+            next_url = response.get("nextRecordsUrl")
+            if not next_url:
+                return links
+            
+            response = await self._make_request("GET", self._relative_endpoint(next_url))
+    
+    async def get_query_result_page(self, result_link: str) -> str:
+        """Download one query result page as CSV text."""
+        return await self._make_request(
+            "GET",
+            self._relative_endpoint(result_link),
+            headers={"Accept": "text/csv"},
+            raw=True
+        )
+    
+    @staticmethod
+    def _relative_endpoint(url: str) -> str:
+        """Strip the instance and /services/data/vXX.X/ prefix from an API link."""
+        return _API_PATH_PREFIX.sub("", url, count=1)
+    
     # Platform Events
     
     async def subscribe_platform_events(self, channel: str) -> AsyncGenerator[Dict[str, Any], None]:
@@ -482,4 +653,4 @@ class SalesforceClient:
 
 
 # Export the client
-__all__ = ["SalesforceClient", "SalesforceAPIError"]
\ No newline at end of file
+__all__ = ["SalesforceClient", "SalesforceAPIError", "SOBJECT_COLLECTION_LIMIT"]
\ No newline at end of file
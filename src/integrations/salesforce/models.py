@@ -11,11 +11,14 @@ Provides Pydantic models for Salesforce objects with:
 
 from __future__ import annotations
 
+import functools
+import json
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 from uuid import UUID
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, PrivateAttr, model_validator, validator
 
 
 # Salesforce Case Enums
@@ -100,6 +103,38 @@ class SalesforceLiveAgentStatus(str, Enum):
     ENDED = "Ended"
 
 
+# Pre-resolved value -> member lookups for hot ingest paths.
+# Indexing these dicts skips the Enum.__call__ machinery on every record.
+
+_CASE_STATUS_FROM_STR: Dict[str, SalesforceCaseStatus] = {m.value: m for m in SalesforceCaseStatus}
+_CASE_PRIORITY_FROM_STR: Dict[str, SalesforceCasePriority] = {m.value: m for m in SalesforceCasePriority}
+_CASE_ORIGIN_FROM_STR: Dict[str, SalesforceCaseOrigin] = {m.value: m for m in SalesforceCaseOrigin}
+_CASE_TYPE_FROM_STR: Dict[str, SalesforceCaseType] = {m.value: m for m in SalesforceCaseType}
+_CASE_REASON_FROM_STR: Dict[str, SalesforceCaseReason] = {m.value: m for m in SalesforceCaseReason}
+_OMNI_STATUS_FROM_STR: Dict[str, SalesforceOmniChannelStatus] = {m.value: m for m in SalesforceOmniChannelStatus}
+_OMNI_PRESENCE_STATUS_FROM_STR: Dict[str, SalesforceOmniChannelPresenceStatus] = {
+    m.value: m for m in SalesforceOmniChannelPresenceStatus
+}
+_KB_STATUS_FROM_STR: Dict[str, SalesforceKnowledgeArticleStatus] = {
+    m.value: m for m in SalesforceKnowledgeArticleStatus
+}
+_LIVE_AGENT_STATUS_FROM_STR: Dict[str, SalesforceLiveAgentStatus] = {m.value: m for m in SalesforceLiveAgentStatus}
+
+# Reverse direction for outbound payloads: member -> plain str value
+_ENUM_STR: Dict[Enum, str] = {
+    member: member.value
+    for enum_cls in (
+        SalesforceCasePriority,
+        SalesforceCaseOrigin,
+        SalesforceCaseStatus,
+        SalesforceCaseType,
+        SalesforceCaseReason,
+        SalesforceOmniChannelPresenceStatus,
+    )
+    for member in enum_cls
+}
+
+
 # Base Models
 
 class BaseSalesforceModel(BaseModel):
@@ -162,6 +197,28 @@ class SalesforceCaseComment(BaseSalesforceModel):
         return v
 
 
+@dataclass(frozen=True, slots=True)
+class SalesforceCaseRow:
+    """
+    Lightweight read-only view of a Case record for streaming reads.
+    
+    Built positionally from trusted API records without model validation;
+    use SalesforceCase when the full model is needed.
+    """
+    
+    id: str
+    case_number: str
+    subject: str
+    description: str
+    status: SalesforceCaseStatus
+    priority: SalesforceCasePriority
+    origin: SalesforceCaseOrigin
+    contact_id: Optional[str]
+    account_id: Optional[str]
+    created_date: datetime
+    last_modified_date: datetime
+
+
 # Contact Models
 
 class SalesforceContact(BaseSalesforceModel):
@@ -313,15 +370,30 @@ class SalesforceFieldMapping(BaseModel):
     salesforce_field: str = Field(description="Salesforce field name")
     field_type: str = Field(description="Field data type")
     is_required: bool = Field(default=False, description="Whether field is required")
-    transformation_rule: Optional[str] = Field(default=None, description="Data transformation rule")
+    transformation_rule: Optional[str] = Field(default=None, description="Transformation pipeline, e.g. \"strip|truncate:255\"")
     validation_rule: Optional[str] = Field(default=None, description="Field validation rule")
     
+    _compiled: Optional[Callable[[Any], Any]] = PrivateAttr(default=None)
+    
     @validator("field_type")
     def validate_field_type(cls, v: str) -> str:
         allowed_types = ["string", "integer", "float", "boolean", "datetime", "email", "phone", "url"]
         if v not in allowed_types:
             raise ValueError(f"Field type must be one of: {allowed_types}")
         return v
+    
+    @model_validator(mode="after")
+    def _precompile(self) -> "SalesforceFieldMapping":
+        # Compile once at registration so per-record transforms are a plain call
+        if self.transformation_rule:
+            self._compiled = compile_transformation_rule(self.transformation_rule)
+        return self
+    
+    def apply_transformation(self, value: Any) -> Any:
+        """Apply the precompiled transformation rule to a value."""
+        if self._compiled is None:
+            return value
+        return self._compiled(value)
 
 
 class SalesforceObjectMapping(BaseModel):
@@ -404,6 +476,124 @@ def convert_to_salesforce_id(local_id: str) -> str:
     return clean_id + checksum
 
 
+@functools.lru_cache(maxsize=4096)
+def _parse_sf_ts(s: str) -> datetime:
+    """Parse a Salesforce ISO-8601 timestamp, memoized since batches share values."""
+    if s.endswith("Z"):
+        return datetime.fromisoformat(s[:-1] + "+00:00")
+    return datetime.fromisoformat(s)
+
+
+def _string_transform(func: Callable[[str], Any]) -> Callable[[Any], Any]:
+    """Apply a string transform to str values and pass anything else through."""
+    return lambda v: func(v) if isinstance(v, str) else v
+
+
+def _truncate_transform(arg: str) -> Callable[[Any], Any]:
+    try:
+        limit = int(arg)
+    except ValueError:
+        raise ValueError(f"truncate expects a non-negative integer, got {arg!r}")
+    if limit < 0:
+        raise ValueError(f"truncate expects a non-negative integer, got {arg!r}")
+    return _string_transform(lambda v: v[:limit])
+
+
+def _map_transform(arg: str) -> Callable[[Any], Any]:
+    try:
+        table = json.loads(arg)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"map expects a JSON object, got {arg!r}: {e.msg}")
+    if not isinstance(table, dict):
+        raise ValueError(f"map expects a JSON object, got {arg!r}")
+    # Values missing from the table pass through unchanged
+    return lambda v: table.get(v, v) if isinstance(v, str) else v
+
+
+def _default_transform(arg: str) -> Callable[[Any], Any]:
+    return lambda v: arg if v is None or v == "" else v
+
+
+# Named transforms usable in transformation rules; rules are never evaluated as code
+_TRANSFORMS_NO_ARG: Dict[str, Callable[[Any], Any]] = {
+    "strip": _string_transform(str.strip),
+    "upper": _string_transform(str.upper),
+    "lower": _string_transform(str.lower),
+    "title": _string_transform(str.title),
+}
+
+_TRANSFORMS_WITH_ARG: Dict[str, Callable[[str], Callable[[Any], Any]]] = {
+    "truncate": _truncate_transform,
+    "map": _map_transform,
+    "default": _default_transform,
+}
+
+
+def _split_rule_steps(rule: str) -> List[str]:
+    """Split a rule on '|' outside JSON strings and braces, so map tables may contain '|'."""
+    steps: List[str] = []
+    current: List[str] = []
+    depth = 0
+    in_string = False
+    escaped = False
+    
+    for ch in rule:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+        elif ch == "|" and depth == 0:
+            steps.append("".join(current))
+            current = []
+            continue
+        current.append(ch)
+    
+    steps.append("".join(current))
+    return steps
+
+
+def compile_transformation_rule(rule: str) -> Callable[[Any], Any]:
+    """
+    Compile a field transformation rule into a callable.
+    
+    A rule is a '|'-separated pipeline of named transforms applied left to
+    right, e.g. ``"strip|upper"`` or ``"strip|truncate:255"``. Supported
+    transforms are ``strip``, ``upper``, ``lower``, ``title``,
+    ``truncate:N``, ``map:{"from": "to", ...}`` and ``default:VALUE``.
+    Unknown transforms or malformed arguments raise ValueError.
+    """
+    steps: List[Callable[[Any], Any]] = []
+    
+    for step in _split_rule_steps(rule):
+        name, sep, arg = step.strip().partition(":")
+        name = name.strip()
+        if not sep and name in _TRANSFORMS_NO_ARG:
+            steps.append(_TRANSFORMS_NO_ARG[name])
+        elif sep and name in _TRANSFORMS_WITH_ARG:
+            steps.append(_TRANSFORMS_WITH_ARG[name](arg.strip()))
+        else:
+            raise ValueError(f"Invalid transformation rule {rule!r}: unknown transform {step.strip()!r}")
+    
+    if len(steps) == 1:
+        return steps[0]
+    
+    def apply(value: Any) -> Any:
+        for transform in steps:
+            value = transform(value)
+        return value
+    
+    return apply
+
+
 def map_local_to_salesforce(local_data: Dict[str, Any], field_mapping: Dict[str, str]) -> Dict[str, Any]:
     """Map local data to Salesforce format using field mapping."""
     salesforce_data = {}
@@ -442,6 +632,7 @@ __all__ = [
     # Models
     "BaseSalesforceModel",
     "SalesforceCase",
+    "SalesforceCaseRow",
     "SalesforceCaseComment",
     "SalesforceContact",
     "SalesforceAccount",
@@ -457,6 +648,7 @@ __all__ = [
     # Utility Functions
     "validate_salesforce_id",
     "convert_to_salesforce_id",
+    "compile_transformation_rule",
     "map_local_to_salesforce",
     "map_salesforce_to_local",
 ]
\ No newline at end of file
@@ -13,17 +13,22 @@ Provides comprehensive Service Cloud functionality including:
 from __future__ import annotations
 
 import asyncio
+import csv
+import io
+from collections import OrderedDict, defaultdict, deque
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, AsyncGenerator
+from typing import Any, Awaitable, Callable, Coroutine, Dict, List, Optional, AsyncGenerator, TypeVar, Union
 from uuid import UUID
 
+from src.core.cache import TTLCache
 from src.core.config import get_settings
 from src.core.logging import get_logger
 from src.core.exceptions import ExternalServiceError
 from ..base import SyncDirection
-from .client import SalesforceClient, SalesforceAPIError
+from .client import SalesforceClient, SalesforceAPIError, SOBJECT_COLLECTION_LIMIT
 from .models import (
     SalesforceCase,
+    SalesforceCaseRow,
     SalesforceContact,
     SalesforceAccount,
     SalesforceCaseComment,
@@ -37,19 +42,138 @@ from .models import (
     SalesforceKnowledgeArticle,
     SalesforceLiveAgentSession,
     SalesforceLiveAgentStatus,
+    _CASE_STATUS_FROM_STR,
+    _CASE_PRIORITY_FROM_STR,
+    _CASE_ORIGIN_FROM_STR,
+    _LIVE_AGENT_STATUS_FROM_STR,
+    _ENUM_STR,
+    _parse_sf_ts,
 )
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
+# Result handed to coalesced waiters when the caller running the lookup is cancelled
+_LEADER_CANCELLED: Any = object()
+
+CASE_FIELDS = (
+    "Id, CaseNumber, Subject, Description, Status, Priority, Origin, "
+    "ContactId, AccountId, CreatedDate, LastModifiedDate"
+)
+
+# Query templates, built once; only the variable fragments are filled per call
+_CASE_SELECT = f"SELECT {CASE_FIELDS} FROM Case"
+_CASE_ORDER = " ORDER BY CreatedDate DESC"
+_CASE_SOSL = "FIND {{{term}}} IN ALL FIELDS RETURNING Case(" + CASE_FIELDS + "{where}" + _CASE_ORDER + "{limit})"
+_LIMIT = " LIMIT %d"
+
+_AGENT_WORK_QUERY = (
+    "SELECT Id, UserId, CaseId, Status, CapacityWeight, CreatedDate FROM AgentWork "
+    "WHERE UserId IN ({ids}) AND Status IN ('Assigned', 'Opened') "
+    "ORDER BY UserId, CreatedDate ASC"
+)
+
+_KB_FIELDS = "Id, Title, Summary, UrlName, ArticleType, LastPublishedDate, Language, ArticleNumber"
+_KB_SEARCH_QUERY = (
+    "SELECT " + _KB_FIELDS + " FROM KnowledgeArticleVersion "
+    "WHERE PublishStatus = 'Online' AND Language = '{language}' "
+    "AND (Title LIKE '%{term}%' OR Summary LIKE '%{term}%') "
+    "ORDER BY LastPublishedDate DESC LIMIT {limit:d}"
+)
+_KB_SEARCH_SOSL = (
+    "FIND {{{term}}} IN ALL FIELDS RETURNING KnowledgeArticleVersion(" + _KB_FIELDS + " "
+    "WHERE PublishStatus = 'Online' AND Language = '{language}' LIMIT {limit:d})"
+)
+_KB_ARTICLE_QUERY = (
+    "SELECT " + _KB_FIELDS + ", ArticleBody__c, ArticleType__c FROM KnowledgeArticleVersion "
+    "WHERE Id = '{article_id}' AND PublishStatus = 'Online'"
+)
+
+_UNIFIED_SEARCH_SOSL = (
+    "FIND {{{term}}} IN ALL FIELDS RETURNING "
+    "Case(" + CASE_FIELDS + " WHERE Status != 'Closed' LIMIT {limit:d}), "
+    "KnowledgeArticleVersion(" + _KB_FIELDS + " "
+    "WHERE PublishStatus = 'Online' AND Language = '{language}' LIMIT {limit:d}) "
+    "WITH HIGHLIGHT"
+)
+
+_CONSOLE_APPS_QUERY = (
+    "SELECT Id, Name, DeveloperName, Description, IsActive FROM ServiceCloudConsoleApp "
+    "WHERE IsActive = true ORDER BY Name"
+)
+
+# SOSL rejects search terms shorter than two characters
+SOSL_MIN_TERM_LENGTH = 2
+
+# User IDs per AgentWork IN (...) query, keeps SOQL well under its length limit
+AGENT_WORK_ID_CHUNK_SIZE = 200
+
+# Case searches asking for more rows than this run as Bulk API 2.0 exports
+BULK_EXPORT_THRESHOLD = 10_000
+
+# Seconds between Bulk API query job status checks
+BULK_QUERY_POLL_INTERVAL = 2.0
+
+# Platform Event published on LiveChatTranscript status changes; carries
+# TranscriptId__c and Status__c
+LIVE_CHAT_STATUS_CHANNEL = "/event/LiveChatTranscriptChangeEvent__e"
+
+_SOSL_RESERVED_CHARS = frozenset('?&|!{}[]()^~*:\\"\'+-')
+
+
+def _escape_soql(value: str) -> str:
+    """Escape a value for use inside a single-quoted SOQL string literal."""
+    return value.replace("\\", "\\\\").replace("'", "\\'")
+
+
+def _escape_soql_like(value: str) -> str:
+    """Escape a value for use inside a SOQL LIKE pattern."""
+    return _escape_soql(value).replace("%", "\\%").replace("_", "\\_")
+
+
+def _escape_sosl(term: str) -> str:
+    """Escape SOSL reserved characters in a FIND search term."""
+    return "".join(f"\\{char}" if char in _SOSL_RESERVED_CHARS else char for char in term)
+
 
 class ServiceCloudError(ExternalServiceError):
     """Service Cloud specific errors."""
     pass
 
 
+class ServiceCloudBulkError(ServiceCloudError):
+    """Raised when some records of a bulk operation fail."""
+    
+    def __init__(self, message: str, created: List[SalesforceCase], errors: List[Dict[str, Any]]):
+        super().__init__(message)
+        self.created = created
+        self.errors = errors
+
+
 class ServiceCloudIntegration:
     """Salesforce Service Cloud integration with comprehensive functionality."""
     
+    __slots__ = (
+        "client",
+        "organization_id",
+        "settings",
+        "logger",
+        "config",
+        "_presence_status",
+        "_presence_capacity",
+        "_presence_ts",
+        "_presence_workid",
+        "_presence_update_task",
+        "_pending_presence",
+        "_presence_event",
+        "_article_cache",
+        "_article_search_cache",
+        "_case_cache",
+        "_inflight_cases",
+        "_inflight_articles",
+    )
+    
     def __init__(self, client: SalesforceClient, organization_id: UUID):
         self.client = client
         self.organization_id = organization_id
@@ -59,9 +183,55 @@ class ServiceCloudIntegration:
         # Service Cloud specific configuration
         self.config = self.client.config
         
-        # Agent presence tracking
-        self._agent_presence: Dict[str, Any] = {}
+        # Agent presence tracking, one dict per field keyed by user ID;
+        # _presence_ts is kept oldest-first so stale agents can be swept
+        self._presence_status: Dict[str, str] = {}
+        self._presence_capacity: Dict[str, int] = {}
+        self._presence_ts: "OrderedDict[str, datetime]" = OrderedDict()
+        self._presence_workid: Dict[str, str] = {}
         self._presence_update_task: Optional[asyncio.Task] = None
+        
+        # Presence changes waiting for the background writer, keyed by user
+        self._pending_presence: Dict[str, Dict[str, Any]] = {}
+        self._presence_event = asyncio.Event()
+        
+        # Knowledge articles change on publish cadence, so cache lookups
+        self._article_cache: TTLCache[SalesforceKnowledgeArticle] = TTLCache(
+            maxsize=self.config.knowledge_cache_max_entries,
+            ttl_seconds=self.config.knowledge_article_cache_ttl_seconds
+        )
+        self._article_search_cache: TTLCache[List[SalesforceKnowledgeArticle]] = TTLCache(
+            maxsize=self.config.knowledge_cache_max_entries,
+            ttl_seconds=self.config.knowledge_search_cache_ttl_seconds
+        )
+        
+        # Last-known case state, so update_case can answer without a refetch
+        self._case_cache: TTLCache[SalesforceCase] = TTLCache(
+            maxsize=self.config.case_cache_max_entries,
+            ttl_seconds=self.config.case_cache_ttl_seconds
+        )
+        
+        # In-flight lookups, so concurrent callers for one ID share a request
+        self._inflight_cases: Dict[str, asyncio.Future] = {}
+        self._inflight_articles: Dict[str, asyncio.Future] = {}
+    
+    async def __aenter__(self) -> "ServiceCloudIntegration":
+        return self
+    
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        await self.aclose()
+    
+    async def aclose(self) -> None:
+        """Release the underlying client and its pooled connections."""
+        if self._presence_update_task and not self._presence_update_task.done():
+            self._presence_update_task.cancel()
+            try:
+                await self._presence_update_task
+            except asyncio.CancelledError:
+                pass
+        
+        await self.flush_presence()
+        await self.client.close()
     
     # Case Management
     
@@ -79,45 +249,26 @@ class ServiceCloudIntegration:
     ) -> SalesforceCase:
         """Create a new support case."""
         try:
-            case_data = {
-                "Subject": subject,
-                "Description": description,
-                "Priority": priority.value,
-                "Origin": origin.value,
-                "Status": SalesforceCaseStatus.NEW.value
-            }
-            
-            if contact_id:
-                case_data["ContactId"] = contact_id
-            
-            if account_id:
-                case_data["AccountId"] = account_id
-            
-            if case_type:
-                case_data["Type"] = case_type.value
-            
-            if reason:
-                case_data["Reason"] = reason.value
-            
-            # Add custom fields
-            if custom_fields:
-                case_data.update(custom_fields)
-            
-            # Add AI context
-            case_data.update({
-                "AI_Source_System__c": "AI_Customer_Service_Agent",
-                "AI_Conversation_ID__c": str(self.organization_id),
-                "AI_Confidence_Score__c": 0.0,  # Will be updated by AI processing
-                "AI_Intent_Classified__c": "",
-                "AI_Sentiment_Analysis__c": ""
-            })
+            case_data = self._build_case_payload(
+                subject=subject,
+                description=description,
+                contact_id=contact_id,
+                account_id=account_id,
+                priority=priority,
+                origin=origin,
+                case_type=case_type,
+                reason=reason,
+                custom_fields=custom_fields
+            )
             
             response = await self.client.create_object("Case", case_data)
             
             self.logger.info(f"Created case {response['id']} with subject: {subject}")
             
-            return SalesforceCase(
+            now = datetime.utcnow()
+            case = SalesforceCase(
                 id=response["id"],
+                organization_id=self.organization_id,
                 case_number=response.get("CaseNumber", ""),
                 subject=subject,
                 description=description,
@@ -128,14 +279,110 @@ class ServiceCloudIntegration:
                 reason=reason,
                 contact_id=contact_id,
                 account_id=account_id,
-                created_date=datetime.utcnow(),
-                last_modified_date=datetime.utcnow()
+                created_date=now,
+                last_modified_date=now
             )
+            self._case_cache.set(case.id, case)
+            
+            return case
             
         except Exception as e:
             self.logger.error(f"Failed to create case: {e}")
             raise ServiceCloudError(f"Failed to create case: {e}")
     
+    async def create_cases_bulk(self, cases: List[SalesforceCase]) -> List[SalesforceCase]:
+        """
+        Create many cases using the sObject Collections API.
+        
+        Cases are sent in chunks of up to 200 records per request. Failed
+        records do not abort the batch; if any fail, a ServiceCloudBulkError
+        carrying the created cases and per-record errors is raised at the end.
+        """
+        created: List[SalesforceCase] = []
+        errors: List[Dict[str, Any]] = []
+        
+        for start in range(0, len(cases), SOBJECT_COLLECTION_LIMIT):
+            chunk = cases[start:start + SOBJECT_COLLECTION_LIMIT]
+            records = [
+                self._build_case_payload(
+                    subject=case.subject,
+                    description=case.description,
+                    contact_id=case.contact_id,
+                    account_id=case.account_id,
+                    priority=case.priority,
+                    origin=case.origin,
+                    case_type=case.type,
+                    reason=case.reason
+                )
+                for case in chunk
+            ]
+            
+            try:
+                response = await self.client.create_objects_collection("Case", records)
+            except Exception as e:
+                self.logger.error(f"Failed to create case batch starting at {start}: {e}")
+                errors.extend(
+                    {"index": start + offset, "errors": [str(e)]} for offset in range(len(chunk))
+                )
+                continue
+            
+            now = datetime.utcnow()
+            for offset, (case, result) in enumerate(zip(chunk, response)):
+                if result.get("success"):
+                    created.append(case.copy(update={
+                        "id": result["id"],
+                        "organization_id": self.organization_id,
+                        "status": SalesforceCaseStatus.NEW,
+                        "created_date": now,
+                        "last_modified_date": now
+                    }))
+                else:
+                    errors.append({"index": start + offset, "errors": result.get("errors", [])})
+        
+        self.logger.info(f"Bulk created {len(created)} of {len(cases)} cases")
+        
+        if errors:
+            raise ServiceCloudBulkError(
+                f"Failed to create {len(errors)} of {len(cases)} cases",
+                created=created,
+                errors=errors
+            )
+        
+        return created
+    
+    def _build_case_payload(
+        self,
+        subject: str,
+        description: str,
+        contact_id: Optional[str] = None,
+        account_id: Optional[str] = None,
+        priority: SalesforceCasePriority = SalesforceCasePriority.MEDIUM,
+        origin: SalesforceCaseOrigin = SalesforceCaseOrigin.WEB,
+        case_type: Optional[SalesforceCaseType] = None,
+        reason: Optional[SalesforceCaseReason] = None,
+        custom_fields: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Build the Salesforce Case payload for a new case."""
+        # Built as one literal so the dict is sized once; custom fields may
+        # override the standard fields but not the AI context
+        return {
+            "Subject": subject,
+            "Description": description,
+            "Priority": _ENUM_STR[priority],
+            "Origin": _ENUM_STR[origin],
+            "Status": _ENUM_STR[SalesforceCaseStatus.NEW],
+            **({"ContactId": contact_id} if contact_id else {}),
+            **({"AccountId": account_id} if account_id else {}),
+            **({"Type": _ENUM_STR[case_type]} if case_type else {}),
+            **({"Reason": _ENUM_STR[reason]} if reason else {}),
+            **(custom_fields or {}),
+            "AI_Source_System__c": "AI_Customer_Service_Agent",
+            "AI_Conversation_ID__c": str(self.organization_id),
+            "AI_Confidence_Score__c": 0.0,  # Will be updated by AI processing
+            "AI_Intent_Classified__c": "",
+            "AI_Sentiment_Analysis__c": ""
+        }
+    
     async def update_case(
         self,
         case_id: str,
@@ -143,123 +390,291 @@ class ServiceCloudIntegration:
         priority: Optional[SalesforceCasePriority] = None,
         subject: Optional[str] = None,
         description: Optional[str] = None,
-        custom_fields: Optional[Dict[str, Any]] = None
+        custom_fields: Optional[Dict[str, Any]] = None,
+        fetch_after: bool = False
     ) -> SalesforceCase:
-        """Update existing case."""
+        """
+        Update existing case.
+        
+        The returned case is the last-known state from this integration with
+        the sent changes applied, saving a read after the write. If the case
+        has not been seen recently, or ``fetch_after`` is set, it is fetched
+        with get_case instead.
+        """
         try:
-            update_data = {}
+            update_data = {
+                **({"Status": _ENUM_STR[status]} if status else {}),
+                **({"Priority": _ENUM_STR[priority]} if priority else {}),
+                **({"Subject": subject} if subject else {}),
+                **({"Description": description} if description else {}),
+                **(custom_fields or {})
+            }
             
-            if status:
-                update_data["Status"] = status.value
+            await self.client.update_object("Case", case_id, update_data)
             
-            if priority:
-                update_data["Priority"] = priority.value
+            self.logger.info(f"Updated case {case_id}")
             
-            if subject:
-                update_data["Subject"] = subject
+            baseline = None if fetch_after else self._case_cache.get(case_id)
+            if baseline is None:
+                return await self.get_case(case_id)
             
+            changes: Dict[str, Any] = {"last_modified_date": datetime.utcnow()}
+            if status:
+                changes["status"] = status
+            if priority:
+                changes["priority"] = priority
+            if subject:
+                changes["subject"] = subject
             if description:
-                update_data["Description"] = description
-            
-            if custom_fields:
-                update_data.update(custom_fields)
+                changes["description"] = description
             
-            # Update last modified timestamp
-            update_data["LastModifiedDate"] = datetime.utcnow().isoformat()
+            case = baseline.copy(update=changes)
+            self._case_cache.set(case_id, case)
             
-            response = await self.client.update_object("Case", case_id, update_data)
-            
-            self.logger.info(f"Updated case {case_id}")
-            
-            # Fetch updated case
-            return await self.get_case(case_id)
+            return case
             
         except Exception as e:
             self.logger.error(f"Failed to update case {case_id}: {e}")
             raise ServiceCloudError(f"Failed to update case: {e}")
     
+    async def _coalesced(
+        self,
+        inflight: Dict[str, asyncio.Future],
+        key: str,
+        fetch: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Run ``fetch`` once per key; concurrent callers await the same result."""
+        while True:
+            pending = inflight.get(key)
+            if pending is None:
+                break
+            # Shield so a cancelled waiter does not cancel the shared lookup
+            result = await asyncio.shield(pending)
+            if result is not _LEADER_CANCELLED:
+                return result
+            # The caller running the lookup was cancelled; retry, possibly as the new leader
+        
+        future = asyncio.get_running_loop().create_future()
+        inflight[key] = future
+        try:
+            result = await fetch()
+        except asyncio.CancelledError:
+            # Only the leader was cancelled; wake the waiters so they retry instead of failing
+            future.set_result(_LEADER_CANCELLED)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a lookup nobody else awaited does not log a warning
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            inflight.pop(key, None)
+    
     async def get_case(self, case_id: str) -> SalesforceCase:
-        """Get case by ID."""
+        """Get case by ID; concurrent lookups of one case share a request."""
+        return await self._coalesced(self._inflight_cases, case_id, lambda: self._fetch_case(case_id))
+    
+    async def _fetch_case(self, case_id: str) -> SalesforceCase:
         try:
             case_data = await self.client.get_object("Case", case_id)
             
-            return SalesforceCase(
-                id=case_data["Id"],
-                case_number=case_data.get("CaseNumber", ""),
-                subject=case_data.get("Subject", ""),
-                description=case_data.get("Description", ""),
-                status=SalesforceCaseStatus(case_data.get("Status", "New")),
-                priority=SalesforceCasePriority(case_data.get("Priority", "Medium")),
-                origin=SalesforceCaseOrigin(case_data.get("Origin", "Web")),
-                contact_id=case_data.get("ContactId"),
-                account_id=case_data.get("AccountId"),
-                created_date=datetime.fromisoformat(case_data["CreatedDate"].replace("Z", "+00:00")),
-                last_modified_date=datetime.fromisoformat(case_data["LastModifiedDate"].replace("Z", "+00:00"))
-            )
+            case = self._case_from_record(case_data)
+            self._case_cache.set(case_id, case)
+            
+            return case
             
         except Exception as e:
             self.logger.error(f"Failed to get case {case_id}: {e}")
             raise ServiceCloudError(f"Failed to get case: {e}")
     
+    def _case_from_record(self, record: Dict[str, Any]) -> SalesforceCase:
+        """Build a SalesforceCase from a trusted Salesforce API record."""
+        return SalesforceCase(
+            id=record["Id"],
+            organization_id=self.organization_id,
+            case_number=record.get("CaseNumber", ""),
+            subject=record.get("Subject", ""),
+            description=record.get("Description", ""),
+            status=_CASE_STATUS_FROM_STR[record.get("Status", "New")],
+            priority=_CASE_PRIORITY_FROM_STR[record.get("Priority", "Medium")],
+            origin=_CASE_ORIGIN_FROM_STR[record.get("Origin", "Web")],
+            contact_id=record.get("ContactId"),
+            account_id=record.get("AccountId"),
+            created_date=_parse_sf_ts(record["CreatedDate"]),
+            last_modified_date=_parse_sf_ts(record["LastModifiedDate"])
+        )
+    
+    def _case_row_from_record(self, record: Dict[str, Any]) -> SalesforceCaseRow:
+        """Build a SalesforceCaseRow from a trusted Salesforce API record."""
+        return SalesforceCaseRow(
+            record["Id"],
+            record.get("CaseNumber", ""),
+            record.get("Subject", ""),
+            record.get("Description", ""),
+            _CASE_STATUS_FROM_STR[record.get("Status", "New")],
+            _CASE_PRIORITY_FROM_STR[record.get("Priority", "Medium")],
+            _CASE_ORIGIN_FROM_STR[record.get("Origin", "Web")],
+            record.get("ContactId"),
+            record.get("AccountId"),
+            _parse_sf_ts(record["CreatedDate"]),
+            _parse_sf_ts(record["LastModifiedDate"])
+        )
+    
     async def search_cases(
         self,
         query: str,
         status: Optional[SalesforceCaseStatus] = None,
         priority: Optional[SalesforceCasePriority] = None,
         contact_id: Optional[str] = None,
-        limit: int = 50
-    ) -> List[SalesforceCase]:
-        """Search for cases using SOQL."""
+        limit: int = 50,
+        hydrate: bool = True
+    ) -> List[Union[SalesforceCase, SalesforceCaseRow]]:
+        """Search for cases; ``hydrate=False`` returns lightweight SalesforceCaseRow views."""
+        return [
+            case async for case in self.iter_cases(query, status, priority, contact_id, limit, hydrate)
+        ]
+    
+    async def iter_cases(
+        self,
+        query: str = "",
+        status: Optional[SalesforceCaseStatus] = None,
+        priority: Optional[SalesforceCasePriority] = None,
+        contact_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        hydrate: bool = False
+    ) -> AsyncGenerator[Union[SalesforceCase, SalesforceCaseRow], None]:
+        """
+        Stream matching cases page by page.
+        
+        Free-text queries go through SOSL, which uses Salesforce's search
+        index instead of a LIKE scan. Filter-only queries use SOQL and follow
+        nextRecordsUrl, so callers get the first cases before later pages are
+        fetched and can stop early. Filter values are escaped before they are
+        placed in the query string.
+        
+        Cases are yielded as SalesforceCaseRow views, which skip model
+        validation; pass ``hydrate=True`` for full SalesforceCase models.
+        """
+        build = self._case_from_record if hydrate else self._case_row_from_record
+        
         try:
             conditions = []
             
-            if query:
-                conditions.append(f"(Subject LIKE '%{query}%' OR Description LIKE '%{query}%')")
-            
             if status:
-                conditions.append(f"Status = '{status.value}'")
+                conditions.append(f"Status = '{_escape_soql(_ENUM_STR[status])}'")
             
             if priority:
-                conditions.append(f"Priority = '{priority.value}'")
+                conditions.append(f"Priority = '{_escape_soql(_ENUM_STR[priority])}'")
             
             if contact_id:
-                conditions.append(f"ContactId = '{contact_id}'")
+                conditions.append(f"ContactId = '{_escape_soql(contact_id)}'")
             
-            where_clause = " AND ".join(conditions) if conditions else ""
+            search_term = query.strip() if query else ""
+            limit_clause = _LIMIT % limit if limit is not None else ""
             
-            soql = f"""
-                SELECT Id, CaseNumber, Subject, Description, Status, Priority, Origin, 
-                       ContactId, AccountId, CreatedDate, LastModifiedDate
-                FROM Case
-                {f'WHERE {where_clause}' if where_clause else ''}
-                ORDER BY CreatedDate DESC
-                LIMIT {limit}
-            """
+            if len(search_term) >= SOSL_MIN_TERM_LENGTH:
+                sosl = _CASE_SOSL.format(
+                    term=_escape_sosl(search_term),
+                    where=" WHERE " + " AND ".join(conditions) if conditions else "",
+                    limit=limit_clause
+                )
+                
+                result = await self.client.search(sosl)
+                
+                for record in result.get("searchRecords", []):
+                    yield build(record)
+                return
+            
+            if search_term:
+                # SOSL needs at least two characters; fall back to an escaped LIKE
+                like_value = _escape_soql_like(search_term)
+                conditions.insert(0, f"(Subject LIKE '%{like_value}%' OR Description LIKE '%{like_value}%')")
+            
+            soql = (
+                _CASE_SELECT
+                + (" WHERE " + " AND ".join(conditions) if conditions else "")
+                + _CASE_ORDER
+                + limit_clause
+            )
             
-            result = await self.client.query(soql)
+            if limit is not None and limit > BULK_EXPORT_THRESHOLD and self.config.enable_bulk_api:
+                async for case in self.export_cases(soql, hydrate=hydrate):
+                    yield case
+                return
             
-            cases = []
-            for record in result.get("records", []):
-                cases.append(SalesforceCase(
-                    id=record["Id"],
-                    case_number=record.get("CaseNumber", ""),
-                    subject=record.get("Subject", ""),
-                    description=record.get("Description", ""),
-                    status=SalesforceCaseStatus(record.get("Status", "New")),
-                    priority=SalesforceCasePriority(record.get("Priority", "Medium")),
-                    origin=SalesforceCaseOrigin(record.get("Origin", "Web")),
-                    contact_id=record.get("ContactId"),
-                    account_id=record.get("AccountId"),
-                    created_date=datetime.fromisoformat(record["CreatedDate"].replace("Z", "+00:00")),
-                    last_modified_date=datetime.fromisoformat(record["LastModifiedDate"].replace("Z", "+00:00"))
-                ))
+            result = await self.client.query(soql)
             
-            return cases
+            while True:
+                for record in result.get("records", []):
+                    yield build(record)
+                
+                if result.get("done", True) or not result.get("nextRecordsUrl"):
+                    break
+                
+                result = await self.client.query_more(result["nextRecordsUrl"])
             
         except Exception as e:
             self.logger.error(f"Failed to search cases: {e}")
             raise ServiceCloudError(f"Failed to search cases: {e}")
     
+    async def export_cases(
+        self,
+        soql: str,
+        max_concurrency: int = 4,
+        poll_interval: float = BULK_QUERY_POLL_INTERVAL,
+        hydrate: bool = False
+    ) -> AsyncGenerator[Union[SalesforceCase, SalesforceCaseRow], None]:
+        """
+        Stream the cases matched by a SOQL query through a Bulk API 2.0 job.
+        
+        Once the job completes, up to ``max_concurrency`` result pages are
+        downloaded at a time while earlier pages are parsed and yielded, so
+        cases come out in result order without holding the whole export in
+        memory. The query must select the CASE_FIELDS columns. Cases are
+        SalesforceCaseRow views unless ``hydrate`` is set.
+        """
+        build = self._case_from_record if hydrate else self._case_row_from_record
+        pending: "deque[asyncio.Task]" = deque()
+        
+        try:
+            job_id = await self.client.create_query_job(soql)
+            
+            while True:
+                job = await self.client.get_query_job_status(job_id)
+                state = job.get("state")
+                if state == "JobComplete":
+                    break
+                if state in ("Failed", "Aborted"):
+                    raise ServiceCloudError(f"Bulk query job {job_id} {state.lower()}: {job.get('errorMessage')}")
+                await asyncio.sleep(poll_interval)
+            
+            links = deque(await self.client.get_query_result_pages(job_id))
+            self.logger.info(f"Exporting cases from bulk job {job_id} in {len(links)} pages")
+            
+            while links or pending:
+                while links and len(pending) < max_concurrency:
+                    pending.append(asyncio.create_task(self.client.get_query_result_page(links.popleft())))
+                
+                page = await pending.popleft()
+                for row in csv.DictReader(io.StringIO(page)):
+                    # Bulk CSV encodes nulls as empty strings
+                    yield build({k: v for k, v in row.items() if v != ""})
+            
+        except ServiceCloudError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Failed to export cases: {e}")
+            raise ServiceCloudError(f"Failed to export cases: {e}")
+        finally:
+            # Wait for cancelled downloads to settle so none outlive the export
+            # or leave an exception unretrieved
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+    
     # Case Comments
     
     async def add_case_comment(
@@ -310,28 +725,29 @@ class ServiceCloudIntegration:
             if not self.config.enable_omni_channel:
                 raise ServiceCloudError("Omni-Channel is not enabled")
             
+            status_value = _ENUM_STR[presence_status]
+            
             # Create agent work presence
             presence_data = {
                 "UserId": user_id,
-                "Status": presence_status.value,
+                "Status": status_value,
                 "Capacity": capacity,
                 "IsActive": True
             }
             
             response = await self.client.create_object("AgentWork", presence_data)
             
-            self._agent_presence[user_id] = {
-                "id": response["id"],
-                "status": presence_status.value,
-                "capacity": capacity,
-                "last_update": datetime.utcnow()
-            }
+            self._presence_workid[user_id] = response["id"]
+            self._presence_status[user_id] = status_value
+            self._presence_capacity[user_id] = capacity
+            self._touch_presence(user_id)
+            self._ensure_presence_writer()
             
             self.logger.info(f"Registered agent {user_id} with Omni-Channel")
             
             return {
                 "agent_work_id": response["id"],
-                "status": presence_status.value,
+                "status": status_value,
                 "capacity": capacity
             }
             
@@ -345,64 +761,186 @@ class ServiceCloudIntegration:
         presence_status: SalesforceOmniChannelPresenceStatus,
         capacity: Optional[int] = None
     ) -> Dict[str, Any]:
-        """Update agent presence status."""
+        """
+        Update agent presence status.
+        
+        The change is applied to the local presence state immediately and
+        written to Salesforce by a background task that coalesces updates
+        arriving within ``presence_flush_ms`` into one sObject Collections
+        request. The latest update for an agent wins.
+        """
         try:
-            if user_id not in self._agent_presence:
+            agent_work_id = self._presence_workid.get(user_id)
+            if agent_work_id is None:
                 # Register agent if not already registered
                 return await self.register_agent(user_id, presence_status, capacity or 5)
             
-            agent_work_id = self._agent_presence[user_id]["id"]
+            status_value = _ENUM_STR[presence_status]
             
-            update_data = {"Status": presence_status.value}
+            pending = self._pending_presence.setdefault(user_id, {"id": agent_work_id})
+            pending["Status"] = status_value
             if capacity is not None:
-                update_data["Capacity"] = capacity
+                pending["Capacity"] = capacity
+                self._presence_capacity[user_id] = capacity
             
-            await self.client.update_object("AgentWork", agent_work_id, update_data)
+            self._presence_status[user_id] = status_value
+            self._touch_presence(user_id)
             
-            self._agent_presence[user_id].update({
-                "status": presence_status.value,
-                "capacity": capacity or self._agent_presence[user_id]["capacity"],
-                "last_update": datetime.utcnow()
-            })
+            self._ensure_presence_writer()
+            self._presence_event.set()
             
-            self.logger.info(f"Updated agent {user_id} presence to {presence_status.value}")
+            self.logger.debug(f"Queued agent {user_id} presence update to {status_value}")
             
             return {
                 "agent_work_id": agent_work_id,
-                "status": presence_status.value,
-                "capacity": capacity or self._agent_presence[user_id]["capacity"]
+                "status": status_value,
+                "capacity": self._presence_capacity[user_id]
             }
             
         except Exception as e:
             self.logger.error(f"Failed to update agent {user_id} presence: {e}")
             raise ServiceCloudError(f"Failed to update agent presence: {e}")
     
+    def _touch_presence(self, user_id: str) -> None:
+        """Record activity for an agent, moving it to the fresh end of the sweep order."""
+        self._presence_ts[user_id] = datetime.utcnow()
+        self._presence_ts.move_to_end(user_id)
+    
+    def _ensure_presence_writer(self) -> None:
+        """Start the presence writer task on first use (needs a running loop)."""
+        if self._presence_update_task is None or self._presence_update_task.done():
+            self._presence_update_task = asyncio.create_task(self._flush_presence_loop())
+    
+    async def _flush_presence_loop(self) -> None:
+        """
+        Wait for queued presence changes, let a window accumulate, then flush.
+        
+        Stale agents are swept after each flush, and at least once per
+        presence TTL while no updates arrive.
+        """
+        while True:
+            try:
+                await asyncio.wait_for(self._presence_event.wait(), timeout=self.config.presence_ttl_seconds)
+            except asyncio.TimeoutError:
+                await self._unregister_stale_agents()
+                continue
+            
+            await asyncio.sleep(self.config.presence_flush_ms / 1000)
+            self._presence_event.clear()
+            await self.flush_presence()
+            await self._unregister_stale_agents()
+    
+    async def flush_presence(self) -> int:
+        """
+        Write all queued presence changes to Salesforce now.
+        
+        Returns the number of AgentWork records sent. Batches that fail as a
+        whole are re-queued beneath any newer change for the same agent and
+        retried with the next flush.
+        """
+        if not self._pending_presence:
+            return 0
+        
+        # Swap rather than copy so updates queued during the request land in
+        # the next batch instead of being overwritten by this one
+        batch, self._pending_presence = self._pending_presence, {}
+        items = list(batch.items())
+        
+        for start in range(0, len(items), SOBJECT_COLLECTION_LIMIT):
+            chunk = items[start:start + SOBJECT_COLLECTION_LIMIT]
+            
+            try:
+                results = await self.client.update_objects_collection(
+                    "AgentWork", [fields for _, fields in chunk]
+                )
+            except Exception as e:
+                self.logger.error(f"Failed to flush presence for {len(chunk)} agents: {e}")
+                for user_id, fields in chunk:
+                    self._pending_presence[user_id] = {**fields, **self._pending_presence.get(user_id, {})}
+                continue
+            
+            for (user_id, _), result in zip(chunk, results):
+                if not result.get("success"):
+                    self.logger.error(f"Failed to update agent {user_id} presence: {result.get('errors')}")
+        
+        self.logger.debug(f"Flushed presence updates for {len(items)} agents")
+        return len(items)
+    
+    async def _unregister_stale_agents(self) -> int:
+        """
+        Mark agents idle past presence_ttl_seconds, or beyond max_tracked_agents,
+        Offline in Salesforce and stop tracking them.
+        
+        A forgotten agent is registered again on its next presence update.
+        Returns the number of agents dropped.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.config.presence_ttl_seconds)
+        overflow = len(self._presence_ts) - self.config.max_tracked_agents
+        
+        stale: List[str] = []
+        for user_id, last_update in self._presence_ts.items():
+            if last_update > cutoff and len(stale) >= overflow:
+                break
+            stale.append(user_id)
+        
+        if not stale:
+            return 0
+        
+        offline = _ENUM_STR[SalesforceOmniChannelPresenceStatus.OFFLINE]
+        records = []
+        for user_id in stale:
+            records.append({"id": self._presence_workid.pop(user_id), "Status": offline})
+            del self._presence_ts[user_id]
+            self._presence_status.pop(user_id, None)
+            self._presence_capacity.pop(user_id, None)
+            self._pending_presence.pop(user_id, None)
+        
+        for start in range(0, len(records), SOBJECT_COLLECTION_LIMIT):
+            chunk = records[start:start + SOBJECT_COLLECTION_LIMIT]
+            try:
+                await self.client.update_objects_collection("AgentWork", chunk)
+            except Exception as e:
+                self.logger.error(f"Failed to mark {len(chunk)} stale agents offline: {e}")
+        
+        self.logger.info(f"Stopped tracking {len(stale)} stale agents")
+        return len(stale)
+    
     async def get_agent_work_assignments(self, user_id: str) -> List[Dict[str, Any]]:
         """Get work assignments for agent."""
+        return (await self.get_agent_work_assignments_many([user_id]))[user_id]
+    
+    async def get_agent_work_assignments_many(self, user_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Get work assignments for several agents with one SOQL query per 200 agents."""
+        assignments: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        
         try:
-            soql = f"""
-                SELECT Id, CaseId, Status, CapacityWeight, CreatedDate
-                FROM AgentWork
-                WHERE UserId = '{user_id}' AND Status IN ('Assigned', 'Opened')
-                ORDER BY CreatedDate ASC
-            """
-            
-            result = await self.client.query(soql)
+            unique_ids = list(dict.fromkeys(user_ids))
             
-            assignments = []
-            for record in result.get("records", []):
-                assignments.append({
-                    "id": record["Id"],
-                    "case_id": record.get("CaseId"),
-                    "status": record.get("Status"),
-                    "capacity_weight": record.get("CapacityWeight", 1),
-                    "created_date": datetime.fromisoformat(record["CreatedDate"].replace("Z", "+00:00"))
-                })
-            
-            return assignments
+            for start in range(0, len(unique_ids), AGENT_WORK_ID_CHUNK_SIZE):
+                chunk = unique_ids[start:start + AGENT_WORK_ID_CHUNK_SIZE]
+                id_list = ", ".join(f"'{_escape_soql(user_id)}'" for user_id in chunk)
+                
+                result = await self.client.query(_AGENT_WORK_QUERY.format(ids=id_list))
+                
+                while True:
+                    for record in result.get("records", []):
+                        assignments[record["UserId"]].append({
+                            "id": record["Id"],
+                            "case_id": record.get("CaseId"),
+                            "status": record.get("Status"),
+                            "capacity_weight": record.get("CapacityWeight", 1),
+                            "created_date": _parse_sf_ts(record["CreatedDate"])
+                        })
+                    
+                    if result.get("done", True) or not result.get("nextRecordsUrl"):
+                        break
+                    
+                    result = await self.client.query_more(result["nextRecordsUrl"])
+            
+            return {user_id: assignments[user_id] for user_id in unique_ids}
             
         except Exception as e:
-            self.logger.error(f"Failed to get agent assignments for {user_id}: {e}")
+            self.logger.error(f"Failed to get agent assignments for {len(user_ids)} agents: {e}")
             raise ServiceCloudError(f"Failed to get agent assignments: {e}")
     
     # Knowledge Base Integration
@@ -413,75 +951,150 @@ class ServiceCloudIntegration:
         language: str = "en-US",
         limit: int = 10
     ) -> List[SalesforceKnowledgeArticle]:
-        """Search knowledge base articles."""
+        """
+        Search knowledge base articles.
+        
+        Search terms go through SOSL, which ranks matches from Salesforce's
+        search index; single-character terms fall back to a LIKE query.
+        """
+        cache_key = (query, language, limit)
+        cached = self._article_search_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        
         try:
-            soql = f"""
-                SELECT Id, Title, Summary, UrlName, ArticleType, 
-                       LastPublishedDate, Language, ArticleNumber
-                FROM KnowledgeArticleVersion
-                WHERE PublishStatus = 'Online' 
-                  AND Language = '{language}'
-                  AND (Title LIKE '%{query}%' OR Summary LIKE '%{query}%')
-                ORDER BY LastPublishedDate DESC
-                LIMIT {limit}
-            """
+            search_term = query.strip()
             
-            result = await self.client.query(soql)
-            
-            articles = []
-            for record in result.get("records", []):
-                articles.append(SalesforceKnowledgeArticle(
-                    id=record["Id"],
-                    title=record.get("Title", ""),
-                    summary=record.get("Summary", ""),
-                    url_name=record.get("UrlName", ""),
-                    article_type=record.get("ArticleType", ""),
-                    last_published_date=datetime.fromisoformat(record["LastPublishedDate"].replace("Z", "+00:00")),
-                    language=record.get("Language", "en-US"),
-                    article_number=record.get("ArticleNumber", "")
+            if len(search_term) >= SOSL_MIN_TERM_LENGTH:
+                result = await self.client.search(_KB_SEARCH_SOSL.format(
+                    term=_escape_sosl(search_term),
+                    language=_escape_soql(language),
+                    limit=limit
+                ))
+                records = result.get("searchRecords", [])
+            else:
+                result = await self.client.query(_KB_SEARCH_QUERY.format(
+                    language=_escape_soql(language),
+                    term=_escape_soql_like(search_term),
+                    limit=limit
                 ))
+                records = result.get("records", [])
+            
+            articles = [self._article_from_record(record) for record in records]
+            
+            self._article_search_cache.set(cache_key, articles)
             
-            return articles
+            return list(articles)
             
         except Exception as e:
             self.logger.error(f"Failed to search knowledge articles: {e}")
             raise ServiceCloudError(f"Failed to search knowledge articles: {e}")
     
-    async def get_knowledge_article(self, article_id: str) -> SalesforceKnowledgeArticle:
-        """Get knowledge article by ID."""
+    def _article_from_record(self, record: Dict[str, Any]) -> SalesforceKnowledgeArticle:
+        """Build a SalesforceKnowledgeArticle from a trusted Salesforce API record."""
+        return SalesforceKnowledgeArticle(
+            id=record["Id"],
+            organization_id=self.organization_id,
+            title=record.get("Title", ""),
+            summary=record.get("Summary", ""),
+            url_name=record.get("UrlName", ""),
+            article_type=record.get("ArticleType", ""),
+            last_published_date=_parse_sf_ts(record["LastPublishedDate"]),
+            language=record.get("Language", "en-US"),
+            article_number=record.get("ArticleNumber", "")
+        )
+    
+    async def unified_search(
+        self,
+        query: str,
+        language: str = "en-US",
+        limit: int = 50
+    ) -> Dict[str, Any]:
+        """
+        Search open cases and knowledge articles in one SOSL request.
+        
+        The term is matched as a prefix. Returns ``cases``, ``articles`` and
+        ``highlights``, the latter mapping record IDs to highlighted field
+        snippets so callers need no second request to render matches.
+        """
+        results: Dict[str, Any] = {"cases": [], "articles": [], "highlights": {}}
+        
+        search_term = query.strip()
+        if len(search_term) < SOSL_MIN_TERM_LENGTH:
+            return results
+        
         try:
-            soql = f"""
-                SELECT Id, Title, Summary, UrlName, ArticleType, 
-                       LastPublishedDate, Language, ArticleNumber, 
-                       ArticleBody__c, ArticleType__c
-                FROM KnowledgeArticleVersion
-                WHERE Id = '{article_id}' AND PublishStatus = 'Online'
-            """
+            result = await self.client.search(_UNIFIED_SEARCH_SOSL.format(
+                term=_escape_sosl(search_term) + "*",
+                language=_escape_soql(language),
+                limit=limit
+            ))
+            
+            for record in result.get("searchRecords", []):
+                object_type = record.get("attributes", {}).get("type")
+                if object_type == "Case":
+                    results["cases"].append(self._case_from_record(record))
+                elif object_type == "KnowledgeArticleVersion":
+                    results["articles"].append(self._article_from_record(record))
+                else:
+                    continue
+                
+                if record.get("highlight"):
+                    results["highlights"][record["Id"]] = record["highlight"]
             
-            result = await self.client.query(soql)
+            return results
+            
+        except Exception as e:
+            self.logger.error(f"Failed unified search: {e}")
+            raise ServiceCloudError(f"Failed unified search: {e}")
+    
+    async def get_knowledge_article(self, article_id: str) -> SalesforceKnowledgeArticle:
+        """Get knowledge article by ID; concurrent lookups of one article share a request."""
+        cached = self._article_cache.get(article_id)
+        if cached is not None:
+            return cached
+        
+        return await self._coalesced(
+            self._inflight_articles, article_id, lambda: self._fetch_knowledge_article(article_id)
+        )
+    
+    async def _fetch_knowledge_article(self, article_id: str) -> SalesforceKnowledgeArticle:
+        try:
+            result = await self.client.query(_KB_ARTICLE_QUERY.format(article_id=_escape_soql(article_id)))
             
             if not result.get("records"):
                 raise ServiceCloudError(f"Knowledge article {article_id} not found")
             
             record = result["records"][0]
             
-            return SalesforceKnowledgeArticle(
+            article = SalesforceKnowledgeArticle(
                 id=record["Id"],
+                organization_id=self.organization_id,
                 title=record.get("Title", ""),
                 summary=record.get("Summary", ""),
                 url_name=record.get("UrlName", ""),
                 article_type=record.get("ArticleType", ""),
-                last_published_date=datetime.fromisoformat(record["LastPublishedDate"].replace("Z", "+00:00")),
+                last_published_date=_parse_sf_ts(record["LastPublishedDate"]),
                 language=record.get("Language", "en-US"),
                 article_number=record.get("ArticleNumber", ""),
                 content=record.get("ArticleBody__c", ""),
                 type_details=record.get("ArticleType__c")
             )
             
+            self._article_cache.set(article_id, article)
+            
+            return article
+            
         except Exception as e:
             self.logger.error(f"Failed to get knowledge article {article_id}: {e}")
             raise ServiceCloudError(f"Failed to get knowledge article: {e}")
     
+    def invalidate_article(self, article_id: str) -> None:
+        """Drop a knowledge article from the caches, e.g. on a publish webhook."""
+        self._article_cache.pop(article_id)
+        # Search results may embed the stale article
+        self._article_search_cache.clear()
+    
     # Live Agent Integration
     
     async def create_live_agent_session(
@@ -498,18 +1111,17 @@ class ServiceCloudIntegration:
                 "VisitorName": visitor_name,
                 "VisitorEmail": visitor_email,
                 "SessionStartDate": datetime.utcnow().isoformat(),
-                "Status": "Waiting"
+                "Status": "Waiting",
+                **(custom_fields or {})
             }
             
-            if custom_fields:
-                session_data.update(custom_fields)
-            
             response = await self.client.create_object("LiveChatTranscript", session_data)
             
             self.logger.info(f"Created Live Agent session {response['id']} for {visitor_name}")
             
             return SalesforceLiveAgentSession(
                 id=response["id"],
+                organization_id=self.organization_id,
                 deployment_id=deployment_id,
                 visitor_name=visitor_name,
                 visitor_email=visitor_email,
@@ -526,12 +1138,47 @@ class ServiceCloudIntegration:
         try:
             session_data = await self.client.get_object("LiveChatTranscript", session_id)
             
-            return SalesforceLiveAgentStatus(session_data.get("Status", "Waiting"))
+            return _LIVE_AGENT_STATUS_FROM_STR[session_data.get("Status", "Waiting")]
             
         except Exception as e:
             self.logger.error(f"Failed to get Live Agent status for {session_id}: {e}")
             raise ServiceCloudError(f"Failed to get Live Agent status: {e}")
     
+    async def watch_live_agent_status(self, session_id: str) -> AsyncGenerator[SalesforceLiveAgentStatus, None]:
+        """
+        Stream Live Agent session status changes.
+        
+        Yields the current status, then each change pushed on the Platform
+        Events channel, and stops once the session has ended. Use this instead
+        of polling get_live_agent_status.
+        """
+        if not self.config.enable_platform_events:
+            raise ServiceCloudError("Platform Events are not enabled")
+        
+        status = await self.get_live_agent_status(session_id)
+        yield status
+        if status is SalesforceLiveAgentStatus.ENDED:
+            return
+        
+        try:
+            async for event in self.client.subscribe_platform_events(LIVE_CHAT_STATUS_CHANNEL):
+                payload = event.get("data", {}).get("payload", {})
+                if payload.get("TranscriptId__c") != session_id:
+                    continue
+                
+                new_status = _LIVE_AGENT_STATUS_FROM_STR.get(payload.get("Status__c"))
+                if new_status is None or new_status is status:
+                    continue
+                
+                status = new_status
+                yield status
+                if status is SalesforceLiveAgentStatus.ENDED:
+                    return
+                    
+        except SalesforceAPIError as e:
+            self.logger.error(f"Live Agent status stream failed for {session_id}: {e}")
+            raise ServiceCloudError(f"Failed to watch Live Agent status: {e}")
+    
     # Cross-Cloud Orchestration
     
     async def orchestrate_cross_cloud(
@@ -542,17 +1189,22 @@ class ServiceCloudIntegration:
     ) -> Dict[str, Any]:
         """Orchestrate actions across multiple Salesforce clouds."""
         try:
-            results = {}
-            
+            # Clouds are independent, so dispatch them concurrently
+            tasks = {}
             for cloud in target_clouds:
-                if cloud == "Marketing":
-                    results["marketing"] = await self._orchestrate_marketing_cloud(case_id, orchestration_data)
-                elif cloud == "Commerce":
-                    results["commerce"] = await self._orchestrate_commerce_cloud(case_id, orchestration_data)
-                elif cloud == "Platform":
-                    results["platform"] = await self._orchestrate_platform_cloud(case_id, orchestration_data)
-                else:
-                    self.logger.warning(f"Unknown target cloud: {cloud}")
+                if cloud.lower() in tasks:
+                    continue
+                coro = self._dispatch_cloud(cloud, case_id, orchestration_data)
+                if coro is not None:
+                    tasks[cloud.lower()] = coro
+            
+            done = await asyncio.gather(*tasks.values(), return_exceptions=True)
+            
+            results = {}
+            for key, result in zip(tasks, done):
+                if isinstance(result, Exception):
+                    raise result
+                results[key] = result
             
             return {
                 "case_id": case_id,
@@ -565,6 +1217,23 @@ class ServiceCloudIntegration:
             self.logger.error(f"Cross-cloud orchestration failed for case {case_id}: {e}")
             raise ServiceCloudError(f"Cross-cloud orchestration failed: {e}")
     
+    def _dispatch_cloud(
+        self,
+        cloud: str,
+        case_id: str,
+        data: Dict[str, Any]
+    ) -> Optional[Coroutine[Any, Any, Dict[str, Any]]]:
+        """Return the orchestration coroutine for a cloud, or None if unknown."""
+        if cloud == "Marketing":
+            return self._orchestrate_marketing_cloud(case_id, data)
+        if cloud == "Commerce":
+            return self._orchestrate_commerce_cloud(case_id, data)
+        if cloud == "Platform":
+            return self._orchestrate_platform_cloud(case_id, data)
+        
+        self.logger.warning(f"Unknown target cloud: {cloud}")
+        return None
+    
     async def _orchestrate_marketing_cloud(self, case_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Orchestrate with Marketing Cloud."""
         # Implementation would integrate with Marketing Cloud APIs
@@ -601,14 +1270,7 @@ class ServiceCloudIntegration:
         """Get Service Cloud console metadata."""
         try:
             # Get available console apps
-            soql = """
-                SELECT Id, Name, DeveloperName, Description, IsActive
-                FROM ServiceCloudConsoleApp
-                WHERE IsActive = true
-                ORDER BY Name
-            """
-            
-            result = await self.client.query(soql)
+            result = await self.client.query(_CONSOLE_APPS_QUERY)
             
             return {
                 "console_apps": result.get("records", []),
@@ -655,31 +1317,38 @@ class ServiceCloudIntegration:
                 "platform_events_enabled": self.config.enable_platform_events
             }
             
+            # Run the independent probes concurrently
+            case_result, knowledge_result, live_agent_result, api_usage = await asyncio.gather(
+                self.client.query("SELECT Id FROM Case LIMIT 1"),
+                self.client.query("SELECT Id FROM KnowledgeArticleVersion LIMIT 1"),
+                self.client.query("SELECT Id FROM LiveChatTranscript LIMIT 1"),
+                self.client.get_api_usage(),
+                return_exceptions=True
+            )
+            
             # Test case creation capability
-            try:
-                # Try a lightweight query to test connectivity
-                result = await self.client.query("SELECT Id FROM Case LIMIT 1")
+            if isinstance(case_result, Exception):
+                self.logger.error(f"Service Cloud connectivity test failed: {case_result}")
+            else:
                 health_results["service_cloud_available"] = True
-            except Exception as e:
-                self.logger.error(f"Service Cloud connectivity test failed: {e}")
             
             # Test knowledge base
-            try:
-                result = await self.client.query("SELECT Id FROM KnowledgeArticleVersion LIMIT 1")
+            if isinstance(knowledge_result, Exception):
+                self.logger.warning(f"Knowledge base not available: {knowledge_result}")
+            else:
                 health_results["knowledge_enabled"] = True
-            except Exception as e:
-                self.logger.warning(f"Knowledge base not available: {e}")
             
             # Test Live Agent
-            try:
-                result = await self.client.query("SELECT Id FROM LiveChatTranscript LIMIT 1")
+            if isinstance(live_agent_result, Exception):
+                self.logger.warning(f"Live Agent not available: {live_agent_result}")
+            else:
                 health_results["live_agent_enabled"] = True
-            except Exception as e:
-                self.logger.warning(f"Live Agent not available: {e}")
             
             # Check API usage
             try:
-                api_usage = await self.client.get_api_usage()
+                if isinstance(api_usage, Exception):
+                    raise api_usage
+                
                 usage_percentage = (api_usage["used"] / api_usage["limit"] * 100) if api_usage["limit"] > 0 else 0
                 
                 health_results.update({
@@ -714,4 +1383,4 @@ class ServiceCloudIntegration:
 
 
 # Export the integration
-__all__ = ["ServiceCloudIntegration", "ServiceCloudError"]
\ No newline at end of file
+__all__ = ["ServiceCloudIntegration", "ServiceCloudError", "ServiceCloudBulkError"]
\ No newline at end of file
@@ -13,12 +13,19 @@ Provides comprehensive sync capabilities including:
 from __future__ import annotations
 
 import asyncio
-import json
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple, AsyncGenerator
+import csv
+import io
+import time
+from collections import Counter, defaultdict, deque
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple, TypeVar, AsyncGenerator
 from uuid import UUID, uuid4
 
-from sqlalchemy import select, insert, update, delete
+import numpy as np
+import orjson
+from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from redis import Redis
 
@@ -26,8 +33,10 @@ from src.core.config import get_settings
 from src.core.logging import get_logger
 from src.core.exceptions import ExternalServiceError
 from src.database.connection import get_sessionmaker
+from src.repositories.base import BULK_INSERT_CHUNK_SIZE
 from ..base import SyncDirection, ConflictResolutionStrategy
-from .client import SalesforceClient, SalesforceAPIError
+from .client import SalesforceClient, SalesforceAPIError, SOBJECT_COLLECTION_LIMIT
+from .service_cloud import _escape_soql
 from .models import (
     SalesforceCase,
     SalesforceContact,
@@ -35,16 +44,181 @@ from .models import (
     SalesforceSyncState,
     SalesforceObjectMapping,
     SalesforceFieldMapping,
+    _parse_sf_ts,
 )
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
+# Remote scans key off SystemModstamp: it is indexed and also moves on
+# system-driven writes that LastModifiedDate misses
+_REMOTE_SCAN_QUERY = "SELECT Id, LastModifiedDate, SystemModstamp FROM {object_type}{where} ORDER BY SystemModstamp ASC"
+_REMOTE_COUNT_QUERY = "SELECT COUNT() FROM {object_type}{where}"
+_REMOTE_SINCE = "SystemModstamp > {since}"
+_REMOTE_IDS = "Id IN ({ids})"
+
+# Records per REST query page (Salesforce accepts 200-2000)
+REMOTE_QUERY_PAGE_SIZE = 2000
+
+# Ids per "Id IN (...)" query; queries go out as GET ?q=, and 200 quoted Ids
+# keep the URL well under Salesforce's ~16 KB request-URI limit
+REMOTE_ID_CHUNK_SIZE = 200
+
+# Scans larger than this run as a Bulk API 2.0 query job, which Salesforce
+# splits into primary-key chunks server-side
+BULK_QUERY_THRESHOLD = 10_000
+BULK_QUERY_POLL_INTERVAL = 2.0
+
+# Redis key holding the newest SystemModstamp synced per organization and object type
+_HIGH_WATER_MARK_KEY = "salesforce_sync_hwm:{organization_id}:{object_type}"
+
+# Redis key holding the local clock time at which the last successful sync
+# started; local changes are read against it, never against the remote
+# SystemModstamp, so clock skew between the two cannot drop local edits
+_LOCAL_HIGH_WATER_MARK_KEY = "salesforce_sync_local_hwm:{organization_id}:{object_type}"
+
+# A last-sync time read from the database is only cached briefly; the
+# high-water mark written after each sync replaces it
+LAST_SYNC_FALLBACK_TTL_SECONDS = 60
+
+# Cross-worker lock so only one worker syncs an object type at a time; the
+# value is a per-run token so a worker only ever releases its own lock
+_SYNC_LOCK_KEY = "sf:sync_lock:{organization_id}:{object_type}"
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Change Data Capture: change types whose events carry no field values and
+# need a query to catch up, and the field every push from this engine sets,
+# used to drop the echo of our own writes
+_CDC_GAP_CHANGE_TYPES = frozenset({
+    "GAP_CREATE", "GAP_UPDATE", "GAP_DELETE", "GAP_UNDELETE", "GAP_OVERFLOW"
+})
+_CDC_ECHO_FIELD = "AI_Last_Sync_Date__c"
+
+# Per-organization entry counts for the dead letter and conflict queues. A
+# counter's TTL is reset to the entry retention on every add, so it lapses
+# together with the newest entry instead of drifting forever
+_DLQ_COUNT_KEY = "salesforce_dlq_count:{organization_id}"
+_CONFLICT_COUNT_KEY = "salesforce_conflicts_count:{organization_id}"
+
+# Per-organization sorted sets of queue entry keys scored by insertion time,
+# for paging through entries without KEYS; expired members are pruned on read
+_DLQ_INDEX_KEY = "salesforce_dlq_index:{organization_id}"
+_CONFLICT_INDEX_KEY = "salesforce_conflicts_index:{organization_id}"
+DLQ_RETENTION = timedelta(days=7)
+CONFLICT_RETENTION = timedelta(days=30)
+
+# Redis pub/sub channel announcing changed field mappings; the message is
+# an object type, or "*" for all of them
+FIELD_MAPPING_INVALIDATION_CHANNEL = "sf:mapping:invalidated"
+
+
+def _newest_stamp(records: List[Dict[str, Any]], current: Optional[str]) -> Optional[str]:
+    """Return the latest SystemModstamp among ``records`` and ``current``."""
+    stamps = [r["SystemModstamp"] for r in records if r.get("SystemModstamp")]
+    if current:
+        stamps.append(current)
+    return max(stamps, key=_parse_sf_ts) if stamps else None
+
+
+def _parse_optional_ts(value: Optional[str]) -> Optional[datetime]:
+    """Parse a record timestamp, treating missing or malformed values as unknown."""
+    if not value:
+        return None
+    try:
+        return _parse_sf_ts(value)
+    except ValueError:
+        return None
+
+
+_RecordTransformer = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+def _compile_field_mapping(
+    field_mapping: Dict[str, SalesforceFieldMapping]
+) -> Tuple[_RecordTransformer, _RecordTransformer]:
+    """
+    Compile a field mapping into (to Salesforce, from Salesforce) record transformers.
+    
+    The mapping is flattened once into tuples of field names and bound
+    transformation callables, so per-record transforms do no attribute
+    lookups or rule checks.
+    """
+    outbound = tuple(
+        (local_field, mapping.salesforce_field, mapping.apply_transformation if mapping.transformation_rule else None)
+        for local_field, mapping in field_mapping.items()
+    )
+    inbound = tuple((local_field, mapping.salesforce_field) for local_field, mapping in field_mapping.items())
+    
+    def to_salesforce(record: Dict[str, Any]) -> Dict[str, Any]:
+        data = {}
+        for local_field, salesforce_field, transform in outbound:
+            if local_field in record:
+                value = record[local_field]
+                data[salesforce_field] = transform(value) if transform else value
+        return data
+    
+    def from_salesforce(record: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            local_field: record[salesforce_field]
+            for local_field, salesforce_field in inbound
+            if salesforce_field in record
+        }
+    
+    return to_salesforce, from_salesforce
+
+
+def _datetime64(values: List[Optional[datetime]]) -> np.ndarray:
+    """Convert datetimes to a UTC datetime64 array; missing values become NaT."""
+    return np.array(
+        [v.astimezone(timezone.utc).replace(tzinfo=None) if v and v.tzinfo else v for v in values],
+        dtype="datetime64[us]"
+    )
+
+
+def _soql_where(*conditions: Optional[str]) -> str:
+    """Join the given SOQL conditions into a WHERE clause, or nothing if all are empty."""
+    conditions = [c for c in conditions if c]
+    return " WHERE " + " AND ".join(conditions) if conditions else ""
+
+
+async def _abatched(stream: AsyncGenerator[T, None], size: int) -> AsyncGenerator[List[T], None]:
+    """Group an async stream into lists of at most ``size`` items."""
+    batch: List[T] = []
+    async for item in stream:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _soql_datetime(value: datetime) -> str:
+    """Format a datetime as a SOQL literal (YYYY-MM-DDThh:mm:ssZ); naive values are taken as UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
 
 class SyncError(ExternalServiceError):
     """Synchronization specific errors."""
     pass
 
 
+class _SyncAction(str, Enum):
+    """What batch classification decided to do with a local record."""
+    PUSH = "push"                # no remote twin
+    IN_SYNC = "in_sync"          # twins without conflicting changes
+    LOCAL_WINS = "local_wins"    # conflict, local write is newer
+    REMOTE_WINS = "remote_wins"  # conflict, remote write is newer
+
+
 class SalesforceSyncEngine:
     """Bi-directional synchronization engine for Salesforce."""
     
@@ -66,10 +240,16 @@ class SalesforceSyncEngine:
         self.sync_config = self.client.config.sync
         self.lag_threshold = timedelta(seconds=self.sync_config.lag_threshold_seconds)
         self.batch_size = self.sync_config.batch_size
+        self.max_concurrency = self.sync_config.max_concurrency
+        self._release_lock = self.redis.register_script(_RELEASE_LOCK_SCRIPT)
         
         # Sync state tracking
         self._sync_in_progress = False
         self._last_sync_time: Optional[datetime] = None
+        
+        # (now, now.isoformat()) captured once per batch so every record in
+        # it shares one timestamp; None outside a batch
+        self._batch_time: Optional[Tuple[datetime, str]] = None
         self._sync_stats = {
             "total_processed": 0,
             "successful": 0,
@@ -81,6 +261,25 @@ class SalesforceSyncEngine:
         
         # In-memory sync state storage (simplified for Phase 7)
         self._sync_records: Dict[str, Dict[str, Any]] = {}
+        
+        # Sync state rows waiting to be upserted, keyed so a record updated
+        # twice in one batch is written once with its latest state
+        self._sync_state_buffer: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        
+        # Records waiting to be pushed through sObject Collections, per
+        # object type, as (local record, Salesforce payload) pairs
+        self._push_create_buf: Dict[str, List[Tuple[Dict[str, Any], Dict[str, Any]]]] = defaultdict(list)
+        self._push_update_buf: Dict[str, List[Tuple[Dict[str, Any], Dict[str, Any]]]] = defaultdict(list)
+        
+        # Dead letter and conflict entries waiting to be written in one
+        # pipeline, keyed by entry key as (counter key, index key, retention, payload)
+        self._queue_buffer: Dict[str, Tuple[str, str, timedelta, bytes]] = {}
+        
+        # Field mappings per object type, kept until an invalidation arrives
+        # on FIELD_MAPPING_INVALIDATION_CHANNEL
+        self._field_mapping_cache: Dict[str, Dict[str, SalesforceFieldMapping]] = {}
+        self._compiled_transformers: Dict[str, Tuple[_RecordTransformer, _RecordTransformer]] = {}
+        self._mapping_listener: Optional[asyncio.Task] = None
     
     # Core Sync Methods
     
@@ -95,16 +294,31 @@ class SalesforceSyncEngine:
             raise SyncError("Sync already in progress")
         
         self._sync_in_progress = True
+        lock_key = _SYNC_LOCK_KEY.format(organization_id=self.organization_id, object_type=object_type)
+        lock_token = uuid4().hex
+        lock_acquired = False
         self._sync_stats = {
             "total_processed": 0,
             "successful": 0,
             "failed": 0,
             "conflicts": 0,
-            "start_time": datetime.utcnow(),
+            "start_time": datetime.now(timezone.utc),
             "end_time": None
         }
         
         try:
+            lock_acquired = bool(await self.redis.set(
+                lock_key, lock_token, nx=True, ex=self.sync_config.lock_ttl_seconds
+            ))
+            if not lock_acquired:
+                self.logger.info(f"Skipping {object_type} sync, another worker is already syncing it")
+                return {
+                    "object_type": object_type,
+                    "sync_mode": sync_mode,
+                    "status": "skipped",
+                    "timestamp": datetime.now(timezone.utc).isoformat()
+                }
+            
             self.logger.info(f"Starting bi-directional sync for {object_type}")
             
             # Determine sync strategy
@@ -113,7 +327,7 @@ class SalesforceSyncEngine:
             else:
                 result = await self._perform_incremental_sync(object_type)
             
-            self._last_sync_time = datetime.utcnow()
+            self._last_sync_time = datetime.now(timezone.utc)
             self._sync_stats["end_time"] = self._last_sync_time
             
             self.logger.info(
@@ -133,7 +347,7 @@ class SalesforceSyncEngine:
             
         except Exception as e:
             self.logger.error(f"Bi-directional sync failed for {object_type}: {e}")
-            self._sync_stats["end_time"] = datetime.utcnow()
+            self._sync_stats["end_time"] = datetime.now(timezone.utc)
             
             return {
                 "object_type": object_type,
@@ -141,76 +355,210 @@ class SalesforceSyncEngine:
                 "status": "failed",
                 "error": str(e),
                 "stats": self._sync_stats.copy(),
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": datetime.now(timezone.utc).isoformat()
             }
             
         finally:
             self._sync_in_progress = False
+            if lock_acquired:
+                await self._release_sync_lock(lock_key, lock_token)
+    
+    async def _release_sync_lock(self, lock_key: str, lock_token: str) -> None:
+        """Release the sync lock if this run still holds it."""
+        try:
+            await self._release_lock(keys=[lock_key], args=[lock_token])
+        except Exception as e:
+            # The lock expires on its own after lock_ttl_seconds
+            self.logger.warning(f"Failed to release sync lock {lock_key}: {e}")
     
     async def _perform_full_sync(self, object_type: str) -> Dict[str, Any]:
         """Perform full synchronization (all records)."""
         self.logger.info(f"Performing full sync for {object_type}")
+        run_started = datetime.now(timezone.utc)
         
-        # Get all records from both systems
-        local_records = await self._get_all_local_records(object_type)
-        remote_records = await self._get_all_remote_records(object_type)
-        
-        # Sync each record
-        for local_record in local_records:
-            await self._sync_single_record(object_type, local_record, remote_records)
-        
-        # Handle remote-only records
-        for remote_record in remote_records:
-            if not any(r["salesforce_id"] == remote_record["Id"] for r in local_records):
-                await self._sync_remote_only_record(object_type, remote_record)
+        records_processed = await self._sync_streams(
+            object_type,
+            self._get_all_local_records(object_type),
+            self._get_all_remote_records(object_type),
+            since=None
+        )
+        await self._store_local_high_water_mark(object_type, run_started)
         
-        return {"status": "completed", "records_processed": len(local_records) + len(remote_records)}
+        return {"status": "completed", "records_processed": records_processed}
     
     async def _perform_incremental_sync(self, object_type: str) -> Dict[str, Any]:
         """Perform incremental synchronization (changed records only)."""
         self.logger.info(f"Performing incremental sync for {object_type}")
         
-        # Get last sync timestamp
-        last_sync = await self._get_last_sync_timestamp(object_type)
+        # Local changes are read from when the last sync started by the local
+        # clock, remote changes from the newest SystemModstamp seen; edits made
+        # while this run is in flight are picked up by the next one
+        run_started = datetime.now(timezone.utc)
+        local_since = await self._get_local_high_water_mark(object_type)
+        remote_since = await self._get_last_sync_timestamp(object_type)
+        
+        records_processed = await self._sync_streams(
+            object_type,
+            self._get_local_changes(object_type, local_since),
+            self._get_remote_changes(object_type, remote_since),
+            since=remote_since
+        )
+        await self._store_local_high_water_mark(object_type, run_started)
+        
+        return {"status": "completed", "records_processed": records_processed}
+    
+    async def _sync_streams(
+        self,
+        object_type: str,
+        local_stream: AsyncGenerator[Dict[str, Any], None],
+        remote_stream: AsyncGenerator[Dict[str, Any], None],
+        since: Optional[datetime]
+    ) -> int:
+        """
+        Sync local and remote record streams batch_size records at a time.
+        
+        Each local batch is matched against just the remote records it
+        references, fetched by Id, so neither side is held in memory beyond
+        the current batch and the Salesforce Ids seen locally. Remote records
+        not seen locally are then pulled. Returns the number of records read.
+        """
+        local_sfids: Set[str] = set()
+        newest_stamp: Optional[str] = None
+        records_processed = 0
+        
+        try:
+            async for batch in _abatched(local_stream, self.batch_size):
+                self._start_batch_clock()
+                sfids = [r["salesforce_id"] for r in batch if r.get("salesforce_id")]
+                local_sfids.update(sfids)
+                remote_index = await self._get_remote_records_by_id(object_type, sfids, since)
+                last_sync_times = await self._get_last_sync_times(
+                    object_type, [r["id"] for r in batch if r.get("salesforce_id") in remote_index]
+                )
+                
+                actions = self._classify_batch(batch, remote_index, last_sync_times)
+                
+                await self._gather_bounded(
+                    self._sync_single_record(
+                        object_type, local_record, remote_index.get(local_record.get("salesforce_id")), action
+                    )
+                    for local_record, action in zip(batch, actions)
+                )
+                records_processed += len(batch)
+            
+            # Handle remote-only records
+            async for batch in _abatched(remote_stream, self.batch_size):
+                self._start_batch_clock()
+                await self._gather_bounded(
+                    self._pull_from_salesforce(object_type, remote_record)
+                    for remote_record in batch
+                    if remote_record["Id"] not in local_sfids
+                )
+                records_processed += len(batch)
+                newest_stamp = _newest_stamp(batch, newest_stamp)
+        finally:
+            await self._flush_pushes(object_type)
+            await self._flush_sync_state()
+            await self._flush_queue_entries()
+            self._batch_time = None
+        
+        await self._store_high_water_mark(object_type, newest_stamp)
         
-        # Get changed records from both systems
-        local_changes = await self._get_local_changes(object_type, last_sync)
-        remote_changes = await self._get_remote_changes(object_type, last_sync)
+        return records_processed
+    
+    def _start_batch_clock(self) -> None:
+        """Capture the timestamp shared by the records of the batch about to run."""
+        now = datetime.now(timezone.utc)
+        self._batch_time = (now, now.isoformat())
+    
+    def _now(self) -> Tuple[datetime, str]:
+        """Current batch timestamp and its ISO form, or the current time outside a batch."""
+        if self._batch_time is not None:
+            return self._batch_time
+        now = datetime.now(timezone.utc)
+        return now, now.isoformat()
+    
+    async def _gather_bounded(self, calls: Iterable[Awaitable[None]]) -> None:
+        """
+        Run record sync calls concurrently, at most max_concurrency at a time.
         
-        # Sync changed records
-        for local_change in local_changes:
-            await self._sync_single_record(object_type, local_change, remote_changes)
+        A failing call does not stop the others; it is logged and counted
+        as failed.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
         
-        # Handle remote-only changes
-        for remote_change in remote_changes:
-            if not any(r["salesforce_id"] == remote_change["Id"] for r in local_changes):
-                await self._sync_remote_only_record(object_type, remote_change)
+        async def guarded(call: Awaitable[None]) -> None:
+            async with semaphore:
+                await call
         
-        return {"status": "completed", "records_processed": len(local_changes) + len(remote_changes)}
+        results = await asyncio.gather(*(guarded(call) for call in calls), return_exceptions=True)
+        
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.error(f"Record sync failed: {result}")
+                self._sync_stats["failed"] += 1
+    
+    def _classify_batch(
+        self,
+        batch: List[Dict[str, Any]],
+        remote_index: Dict[str, Dict[str, Any]],
+        last_sync_times: Dict[str, datetime]
+    ) -> List[_SyncAction]:
+        """
+        Decide the sync action for every local record in a batch at once.
+        
+        A record conflicts when both sides changed after its last sync; the
+        action then names the newer side, breaking equal timestamps by
+        comparing (local ID, Salesforce ID) so every engine resolving the
+        same pair picks the same winner.
+        """
+        actions = [_SyncAction.PUSH] * len(batch)
+        matched = [i for i, r in enumerate(batch) if r.get("salesforce_id") in remote_index]
+        if not matched:
+            return actions
+        
+        locals_ = [batch[i] for i in matched]
+        remotes = [remote_index[r["salesforce_id"]] for r in locals_]
+        
+        local_ts = _datetime64([_parse_optional_ts(r.get("last_modified_date")) for r in locals_])
+        remote_ts = _datetime64([_parse_optional_ts(r.get("LastModifiedDate")) for r in remotes])
+        last_sync_ts = _datetime64([last_sync_times.get(r["id"]) for r in locals_])
+        
+        # NaT compares false, so a missing timestamp never counts as a conflict
+        conflicts = (local_ts > last_sync_ts) & (remote_ts > last_sync_ts)
+        local_ids = np.array([str(r.get("id")) for r in locals_])
+        remote_ids = np.array([str(r["Id"]) for r in remotes])
+        local_wins = (local_ts > remote_ts) | ((local_ts == remote_ts) & (local_ids > remote_ids))
+        
+        codes = np.where(
+            conflicts,
+            np.where(local_wins, _SyncAction.LOCAL_WINS.value, _SyncAction.REMOTE_WINS.value),
+            _SyncAction.IN_SYNC.value
+        )
+        for i, code in zip(matched, codes.tolist()):
+            actions[i] = _SyncAction(code)
+        
+        return actions
     
     async def _sync_single_record(
         self,
         object_type: str,
         local_record: Dict[str, Any],
-        remote_records: List[Dict[str, Any]]
+        remote_record: Optional[Dict[str, Any]],
+        action: _SyncAction
     ) -> None:
-        """Synchronize a single record."""
+        """Synchronize a single record as decided by _classify_batch."""
         try:
             self._sync_stats["total_processed"] += 1
             
-            # Find corresponding remote record
-            remote_record = None
-            for record in remote_records:
-                if record["Id"] == local_record.get("salesforce_id"):
-                    remote_record = record
-                    break
-            
-            if remote_record:
-                # Both records exist, check for conflicts
-                await self._resolve_conflict(object_type, local_record, remote_record)
-            else:
+            if action == _SyncAction.PUSH:
                 # Local record only, push to Salesforce
                 await self._push_to_salesforce(object_type, local_record)
+            elif action == _SyncAction.IN_SYNC:
+                # No conflict, just update sync state
+                await self._update_sync_state(object_type, local_record["id"], remote_record["Id"])
+            else:
+                await self._resolve_conflict(object_type, local_record, remote_record, action)
             
             self._sync_stats["successful"] += 1
             
@@ -225,65 +573,32 @@ class SalesforceSyncEngine:
         self,
         object_type: str,
         local_record: Dict[str, Any],
-        remote_record: Dict[str, Any]
+        remote_record: Dict[str, Any],
+        action: _SyncAction
     ) -> None:
         """Resolve conflict between local and remote records."""
-        # Check if there's an actual conflict (both modified since last sync)
-        local_modified = local_record.get("last_modified_date")
-        remote_modified = remote_record.get("LastModifiedDate")
-        last_sync = await self._get_last_sync_time(object_type, local_record["id"])
-        
-        if self._has_conflict(local_modified, remote_modified, last_sync):
-            self._sync_stats["conflicts"] += 1
-            self.logger.warning(f"Conflict detected for {object_type} record {local_record['id']}")
-            
-            # Resolve based on configured strategy
-            if self.conflict_resolution == ConflictResolutionStrategy.LAST_WRITE_WINS:
-                await self._resolve_last_write_wins(object_type, local_record, remote_record)
-            elif self.conflict_resolution == ConflictResolutionStrategy.MERGE:
-                await self._resolve_merge(object_type, local_record, remote_record)
-            else:
-                # Manual resolution required
-                await self._flag_manual_resolution(object_type, local_record, remote_record)
-        else:
-            # No conflict, just update sync state
-            await self._update_sync_state(object_type, local_record["id"], remote_record["Id"])
-    
-    def _has_conflict(
-        self,
-        local_modified: Optional[str],
-        remote_modified: Optional[str],
-        last_sync: Optional[datetime]
-    ) -> bool:
-        """Determine if there's a conflict between local and remote changes."""
-        if not last_sync:
-            return False
+        self._sync_stats["conflicts"] += 1
+        self.logger.warning(f"Conflict detected for {object_type} record {local_record['id']}")
         
-        if not local_modified or not remote_modified:
-            return False
-        
-        # Parse timestamps
-        try:
-            local_dt = datetime.fromisoformat(local_modified.replace("Z", "+00:00"))
-            remote_dt = datetime.fromisoformat(remote_modified.replace("Z", "+00:00"))
-            
-            # Conflict if both modified after last sync
-            return local_dt > last_sync and remote_dt > last_sync
-            
-        except Exception:
-            return False
+        # Resolve based on configured strategy
+        local_wins = action == _SyncAction.LOCAL_WINS
+        if self.conflict_resolution == ConflictResolutionStrategy.LAST_WRITE_WINS:
+            await self._resolve_last_write_wins(object_type, local_record, remote_record, local_wins)
+        elif self.conflict_resolution == ConflictResolutionStrategy.MERGE:
+            await self._resolve_merge(object_type, local_record, remote_record, local_wins)
+        else:
+            # Manual resolution required
+            await self._flag_manual_resolution(object_type, local_record, remote_record)
     
     async def _resolve_last_write_wins(
         self,
         object_type: str,
         local_record: Dict[str, Any],
-        remote_record: Dict[str, Any]
+        remote_record: Dict[str, Any],
+        local_wins: bool
     ) -> None:
         """Resolve conflict using last-write-wins strategy."""
-        local_modified = datetime.fromisoformat(local_record["last_modified_date"].replace("Z", "+00:00"))
-        remote_modified = datetime.fromisoformat(remote_record["LastModifiedDate"].replace("Z", "+00:00"))
-        
-        if local_modified >= remote_modified:
+        if local_wins:
             # Local is newer, push to Salesforce
             await self._push_to_salesforce(object_type, local_record)
         else:
@@ -294,12 +609,13 @@ class SalesforceSyncEngine:
         self,
         object_type: str,
         local_record: Dict[str, Any],
-        remote_record: Dict[str, Any]
+        remote_record: Dict[str, Any],
+        local_wins: bool
     ) -> None:
         """Resolve conflict by merging data."""
         # Merge logic would be implemented here
         # For now, use last-write-wins as fallback
-        await self._resolve_last_write_wins(object_type, local_record, remote_record)
+        await self._resolve_last_write_wins(object_type, local_record, remote_record, local_wins)
     
     async def _flag_manual_resolution(
         self,
@@ -316,35 +632,76 @@ class SalesforceSyncEngine:
             "local_record": local_record,
             "remote_record": remote_record,
             "conflict_type": "manual_resolution_required",
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": self._now()[1]
         }
         
         await self._store_conflict(conflict_data)
     
     async def _push_to_salesforce(self, object_type: str, local_record: Dict[str, Any]) -> None:
-        """Push local record to Salesforce."""
+        """
+        Queue a local record to be pushed to Salesforce.
+        
+        Records are sent in sObject Collections requests of up to 200, when
+        a bucket fills or at the end of the sync run; see _flush_pushes.
+        """
         try:
             # Transform local data to Salesforce format
             salesforce_data = await self._transform_to_salesforce(object_type, local_record)
-            
-            # Determine if this is a new or existing record
-            if local_record.get("salesforce_id"):
-                # Update existing record
-                result = await self.client.update_object(object_type, local_record["salesforce_id"], salesforce_data)
-                salesforce_id = local_record["salesforce_id"]
-            else:
-                # Create new record
-                result = await self.client.create_object(object_type, salesforce_data)
-                salesforce_id = result["id"]
-            
-            # Update sync state
-            await self._update_sync_state(object_type, local_record["id"], salesforce_id)
-            
-            self.logger.info(f"Pushed {object_type} record {local_record['id']} to Salesforce as {salesforce_id}")
-            
         except Exception as e:
             self.logger.error(f"Failed to push {object_type} record to Salesforce: {e}")
             raise SyncError(f"Failed to push record to Salesforce: {e}")
+        
+        # Determine if this is a new or existing record
+        if local_record.get("salesforce_id"):
+            bucket = self._push_update_buf[object_type]
+            bucket.append((local_record, {"id": local_record["salesforce_id"], **salesforce_data}))
+        else:
+            bucket = self._push_create_buf[object_type]
+            bucket.append((local_record, salesforce_data))
+        
+        if len(bucket) >= SOBJECT_COLLECTION_LIMIT:
+            await self._flush_pushes(object_type)
+    
+    async def _flush_pushes(self, object_type: str) -> None:
+        """
+        Send queued creates and updates for an object type via sObject Collections.
+        
+        Successful records get their sync state recorded; failed records are
+        counted as failed and sent to the dead letter queue.
+        """
+        # Pop first so records queued while this flush awaits start a new bucket
+        creates = self._push_create_buf.pop(object_type, [])
+        updates = self._push_update_buf.pop(object_type, [])
+        
+        pushed = 0
+        for send, entries in (
+            (self.client.create_objects_collection, creates),
+            (self.client.update_objects_collection, updates)
+        ):
+            for start in range(0, len(entries), SOBJECT_COLLECTION_LIMIT):
+                chunk = entries[start:start + SOBJECT_COLLECTION_LIMIT]
+                
+                try:
+                    results = await send(object_type, [payload for _, payload in chunk])
+                except Exception as e:
+                    self.logger.error(f"Failed to push {len(chunk)} {object_type} records to Salesforce: {e}")
+                    results = [{"success": False, "errors": [str(e)]}] * len(chunk)
+                
+                for (local_record, payload), result in zip(chunk, results):
+                    if result.get("success"):
+                        salesforce_id = result.get("id") or payload["id"]
+                        await self._update_sync_state(object_type, local_record["id"], salesforce_id)
+                        pushed += 1
+                    else:
+                        # Counted as successful when queued; correct that now
+                        self._sync_stats["successful"] -= 1
+                        self._sync_stats["failed"] += 1
+                        await self._add_to_dead_letter_queue(
+                            object_type, local_record, f"Push failed: {result.get('errors')}"
+                        )
+        
+        if creates or updates:
+            self.logger.info(f"Pushed {pushed} of {len(creates) + len(updates)} {object_type} records to Salesforce")
     
     async def _pull_from_salesforce(self, object_type: str, remote_record: Dict[str, Any]) -> None:
         """Pull remote record from Salesforce to local system."""
@@ -366,58 +723,36 @@ class SalesforceSyncEngine:
             self.logger.error(f"Failed to pull {object_type} record from Salesforce: {e}")
             raise SyncError(f"Failed to pull record from Salesforce: {e}")
     
-    async def _sync_remote_only_record(self, object_type: str, remote_record: Dict[str, Any]) -> None:
-        """Sync remote-only record to local system."""
-        await self._pull_from_salesforce(object_type, remote_record)
-    
     # Data Transformation Methods
     
     async def _transform_to_salesforce(self, object_type: str, local_record: Dict[str, Any]) -> Dict[str, Any]:
         """Transform local record to Salesforce format."""
-        # Get field mapping for this object type
-        field_mapping = await self._get_field_mapping(object_type)
-        
-        salesforce_data = {}
-        
-        # Apply field mappings
-        for local_field, salesforce_field in field_mapping.items():
-            if local_field in local_record:
-                # Apply transformation if specified
-                if salesforce_field.transformation_rule:
-                    transformed_value = await self._apply_transformation(
-                        local_record[local_field],
-                        salesforce_field.transformation_rule
-                    )
-                    salesforce_data[salesforce_field.salesforce_field] = transformed_value
-                else:
-                    salesforce_data[salesforce_field.salesforce_field] = local_record[local_field]
+        # Apply the compiled field mapping for this object type
+        to_salesforce, _ = await self._get_transformers(object_type)
+        salesforce_data = to_salesforce(local_record)
         
         # Add AI-specific fields
         salesforce_data.update({
             "AI_Source_System__c": "AI_Customer_Service_Agent",
             "AI_Conversation_ID__c": str(self.organization_id),
-            "AI_Last_Sync_Date__c": datetime.utcnow().isoformat()
+            "AI_Last_Sync_Date__c": self._now()[1]
         })
         
         return salesforce_data
     
     async def _transform_from_salesforce(self, object_type: str, remote_record: Dict[str, Any]) -> Dict[str, Any]:
         """Transform Salesforce record to local format."""
-        # Get field mapping for this object type
-        field_mapping = await self._get_field_mapping(object_type)
+        _, from_salesforce = await self._get_transformers(object_type)
         
         local_data = {
             "id": await self._get_local_id_by_salesforce_id(object_type, remote_record["Id"]),
             "salesforce_id": remote_record["Id"],
             "organization_id": self.organization_id,
-            "last_synced_at": datetime.utcnow().isoformat()
+            "last_synced_at": self._now()[1]
         }
         
-        # Apply field mappings
-        for local_field, salesforce_field in field_mapping.items():
-            sf_field_name = salesforce_field.salesforce_field
-            if sf_field_name in remote_record:
-                local_data[local_field] = remote_record[sf_field_name]
+        # Apply the compiled field mapping for this object type
+        local_data.update(from_salesforce(remote_record))
         
         return local_data
     
@@ -430,55 +765,75 @@ class SalesforceSyncEngine:
         salesforce_id: str,
         status: str = "synced"
     ) -> None:
-        """Update sync state for a record."""
+        """
+        Record sync state for a record.
+        
+        States are buffered and written in one upsert per batch_size records
+        (and at the end of each sync run) instead of a transaction per record.
+        """
+        self._sync_state_buffer[(local_id, object_type)] = {
+            "id": uuid4(),
+            "organization_id": self.organization_id,
+            "local_id": local_id,
+            "salesforce_id": salesforce_id,
+            "object_type": object_type,
+            "sync_direction": SyncDirection.BIDIRECTIONAL.value,
+            "sync_status": status,
+            "last_sync_date": self._now()[0],
+            "conflict_resolution": self.conflict_resolution.value
+        }
+        
+        if len(self._sync_state_buffer) >= self.batch_size:
+            await self._flush_sync_state()
+    
+    async def _flush_sync_state(self) -> None:
+        """Upsert all buffered sync states in a single statement and commit."""
+        if not self._sync_state_buffer:
+            return
+        
+        # Swap first so states recorded while this flush awaits go to the next one
+        rows, self._sync_state_buffer = list(self._sync_state_buffer.values()), {}
+        
         session_factory = get_sessionmaker()
         async with session_factory() as session:
-            # Update or create sync record
-            stmt = select(SalesforceSyncRecord).where(
-                SalesforceSyncRecord.organization_id == self.organization_id,
-                SalesforceSyncRecord.local_id == local_id,
-                SalesforceSyncRecord.object_type == object_type
-            )
-            
-            result = await session.execute(stmt)
-            sync_record = result.scalar_one_or_none()
-            
-            if sync_record:
-                # Update existing record
-                sync_record.salesforce_id = salesforce_id
-                sync_record.sync_status = status
-                sync_record.last_sync_date = datetime.utcnow()
-            else:
-                # Create new record
-                sync_record = SalesforceSyncRecord(
-                    id=uuid4(),
-                    organization_id=self.organization_id,
-                    local_id=local_id,
-                    salesforce_id=salesforce_id,
-                    object_type=object_type,
-                    sync_direction=SyncDirection.BIDIRECTIONAL.value,
-                    sync_status=status,
-                    last_sync_date=datetime.utcnow(),
-                    conflict_resolution=self.conflict_resolution.value
+            # Chunked so large batch sizes stay under the bind-parameter limit;
+            # all chunks still commit together
+            for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+                stmt = pg_insert(SalesforceSyncRecord).values(rows[start:start + BULK_INSERT_CHUNK_SIZE])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["organization_id", "local_id", "object_type"],
+                    set_={
+                        "salesforce_id": stmt.excluded.salesforce_id,
+                        "sync_status": stmt.excluded.sync_status,
+                        "last_sync_date": stmt.excluded.last_sync_date
+                    }
                 )
-                session.add(sync_record)
-            
+                await session.execute(stmt)
             await session.commit()
+        
+        self.logger.debug(f"Flushed sync state for {len(rows)} records")
     
-    async def _get_last_sync_time(self, object_type: str, record_id: str) -> Optional[datetime]:
-        """Get last sync time for a record."""
+    async def _get_last_sync_times(self, object_type: str, record_ids: List[str]) -> Dict[str, datetime]:
+        """Get last sync times for a batch of records in one query, keyed by local ID."""
+        if not record_ids:
+            return {}
+        
         session_factory = get_sessionmaker()
         async with session_factory() as session:
-            stmt = select(SalesforceSyncRecord.last_sync_date).where(
+            stmt = select(SalesforceSyncRecord.local_id, SalesforceSyncRecord.last_sync_date).where(
                 SalesforceSyncRecord.organization_id == self.organization_id,
-                SalesforceSyncRecord.local_id == record_id,
+                SalesforceSyncRecord.local_id.in_(record_ids),
                 SalesforceSyncRecord.object_type == object_type
             )
             
             result = await session.execute(stmt)
-            last_sync = result.scalar_one_or_none()
             
-            return last_sync
+            # Stored times are naive UTC; record timestamps parse as aware
+            return {
+                local_id: last_sync if last_sync.tzinfo else last_sync.replace(tzinfo=timezone.utc)
+                for local_id, last_sync in result.all()
+                if last_sync
+            }
     
     async def _get_local_id_by_salesforce_id(self, object_type: str, salesforce_id: str) -> Optional[str]:
         """Get local ID by Salesforce ID."""
@@ -497,43 +852,140 @@ class SalesforceSyncEngine:
     
     # Data Retrieval Methods
     
-    async def _get_all_local_records(self, object_type: str) -> List[Dict[str, Any]]:
-        """Get all local records of specified type."""
-        # This would query the local database
+    async def _get_all_local_records(self, object_type: str) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream all local records of specified type."""
+        # This would stream from the local database
         # Implementation depends on the specific object type
-        return []
+        return
+        yield
     
-    async def _get_all_remote_records(self, object_type: str) -> List[Dict[str, Any]]:
-        """Get all remote records of specified type."""
+    async def _get_all_remote_records(self, object_type: str) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream all remote records of specified type."""
         try:
-            soql = f"SELECT Id, LastModifiedDate FROM {object_type} ORDER BY LastModifiedDate DESC"
-            result = await self.client.query(soql)
-            return result.get("records", [])
+            async for record in self._query_remote_records(object_type, ""):
+                yield record
         except Exception as e:
             self.logger.error(f"Failed to get remote {object_type} records: {e}")
-            return []
     
-    async def _get_local_changes(self, object_type: str, since: Optional[datetime]) -> List[Dict[str, Any]]:
-        """Get local records changed since specified time."""
+    async def _get_local_changes(
+        self,
+        object_type: str,
+        since: Optional[datetime]
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream local records changed since specified time."""
         # Implementation depends on the specific object type
-        return []
+        return
+        yield
     
-    async def _get_remote_changes(self, object_type: str, since: Optional[datetime]) -> List[Dict[str, Any]]:
-        """Get remote records changed since specified time."""
+    async def _get_remote_changes(
+        self,
+        object_type: str,
+        since: Optional[datetime]
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream remote records changed since specified time."""
         try:
-            where_clause = ""
-            if since:
-                where_clause = f"WHERE LastModifiedDate > {since.isoformat()}"
-            
-            soql = f"SELECT Id, LastModifiedDate FROM {object_type} {where_clause} ORDER BY LastModifiedDate DESC"
-            result = await self.client.query(soql)
-            return result.get("records", [])
+            where = _soql_where(_REMOTE_SINCE.format(since=_soql_datetime(since)) if since else None)
+            async for record in self._query_remote_records(object_type, where):
+                yield record
         except Exception as e:
             self.logger.error(f"Failed to get remote {object_type} changes: {e}")
-            return []
+    
+    async def _get_remote_records_by_id(
+        self,
+        object_type: str,
+        salesforce_ids: List[str],
+        since: Optional[datetime]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Index the given remote records by Id, limited to those changed since ``since`` if set."""
+        remote_index: Dict[str, Dict[str, Any]] = {}
+        since_clause = _REMOTE_SINCE.format(since=_soql_datetime(since)) if since else None
+        
+        for start in range(0, len(salesforce_ids), REMOTE_ID_CHUNK_SIZE):
+            chunk = salesforce_ids[start:start + REMOTE_ID_CHUNK_SIZE]
+            where = _soql_where(
+                _REMOTE_IDS.format(ids=", ".join(f"'{_escape_soql(sfid)}'" for sfid in chunk)),
+                since_clause
+            )
+            async for page in self.client.query_paginated(_REMOTE_SCAN_QUERY.format(object_type=object_type, where=where)):
+                remote_index.update((r["Id"], r) for r in page.get("records", []))
+        
+        return remote_index
+    
+    async def _query_remote_records(self, object_type: str, where: str) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Stream Id/LastModifiedDate/SystemModstamp rows, oldest change first.
+        
+        Small scans page through the REST query endpoint; scans above
+        BULK_QUERY_THRESHOLD run as a bulk query job when the Bulk API is enabled.
+        """
+        soql = _REMOTE_SCAN_QUERY.format(object_type=object_type, where=where)
+        
+        if self.client.config.enable_bulk_api:
+            count = await self.client.query(_REMOTE_COUNT_QUERY.format(object_type=object_type, where=where))
+            if count.get("totalSize", 0) > BULK_QUERY_THRESHOLD:
+                async for record in self._bulk_query_records(soql):
+                    yield record
+                return
+        
+        async for page in self.client.query_paginated(soql, page_size=REMOTE_QUERY_PAGE_SIZE):
+            for record in page.get("records", []):
+                yield record
+    
+    async def _bulk_query_records(
+        self,
+        soql: str,
+        poll_interval: float = BULK_QUERY_POLL_INTERVAL
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Run a Bulk API 2.0 query job and stream its rows, prefetching the next page."""
+        job_id = await self.client.create_query_job(soql)
+        
+        while True:
+            job = await self.client.get_query_job_status(job_id)
+            state = job.get("state")
+            if state == "JobComplete":
+                break
+            if state in ("Failed", "Aborted"):
+                raise SyncError(f"Bulk query job {job_id} {state.lower()}: {job.get('errorMessage')}")
+            await asyncio.sleep(poll_interval)
+        
+        links = deque(await self.client.get_query_result_pages(job_id))
+        next_page: Optional[asyncio.Task] = None
+        
+        try:
+            if links:
+                next_page = asyncio.create_task(self.client.get_query_result_page(links.popleft()))
+            
+            while next_page is not None:
+                page = await next_page
+                next_page = asyncio.create_task(self.client.get_query_result_page(links.popleft())) if links else None
+                
+                for row in csv.DictReader(io.StringIO(page)):
+                    yield row
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+                await asyncio.gather(next_page, return_exceptions=True)
     
     async def _get_last_sync_timestamp(self, object_type: str) -> Optional[datetime]:
         """Get last successful sync timestamp for object type."""
+        high_water_mark = await self.redis.get(self._high_water_mark_key(object_type))
+        if high_water_mark:
+            if isinstance(high_water_mark, bytes):
+                high_water_mark = high_water_mark.decode()
+            return _parse_sf_ts(high_water_mark)
+        
+        last_sync = await self._get_last_synced_date(object_type)
+        if last_sync:
+            await self.redis.set(
+                self._high_water_mark_key(object_type),
+                last_sync.isoformat(),
+                ex=LAST_SYNC_FALLBACK_TTL_SECONDS
+            )
+        
+        return last_sync
+    
+    async def _get_last_synced_date(self, object_type: str) -> Optional[datetime]:
+        """Latest local last_sync_date among synced records of the object type."""
         session_factory = get_sessionmaker()
         async with session_factory() as session:
             stmt = select(SalesforceSyncRecord.last_sync_date).where(
@@ -543,22 +995,121 @@ class SalesforceSyncEngine:
             ).order_by(SalesforceSyncRecord.last_sync_date.desc())
             
             result = await session.execute(stmt)
-            last_sync = result.scalar_one_or_none()
-            
-            return last_sync
+            return result.scalar_one_or_none()
+    
+    async def _store_high_water_mark(self, object_type: str, stamp: Optional[str]) -> None:
+        """Remember the newest SystemModstamp seen so the next incremental sync starts there."""
+        if not stamp:
+            return
+        
+        try:
+            await self.redis.set(self._high_water_mark_key(object_type), stamp)
+        except Exception as e:
+            self.logger.warning(f"Failed to store sync high-water mark for {object_type}: {e}")
+    
+    def _high_water_mark_key(self, object_type: str) -> str:
+        return _HIGH_WATER_MARK_KEY.format(organization_id=self.organization_id, object_type=object_type)
+    
+    async def _get_local_high_water_mark(self, object_type: str) -> Optional[datetime]:
+        """Local time the last successful sync started, falling back to the latest local sync date."""
+        mark = await self.redis.get(self._local_high_water_mark_key(object_type))
+        if not mark:
+            return await self._get_last_synced_date(object_type)
+        if isinstance(mark, bytes):
+            mark = mark.decode()
+        return datetime.fromisoformat(mark)
+    
+    async def _store_local_high_water_mark(self, object_type: str, started: datetime) -> None:
+        """Remember when a successful sync started so the next one reads local changes from there."""
+        try:
+            await self.redis.set(self._local_high_water_mark_key(object_type), started.isoformat())
+        except Exception as e:
+            self.logger.warning(f"Failed to store local sync high-water mark for {object_type}: {e}")
+    
+    def _local_high_water_mark_key(self, object_type: str) -> str:
+        return _LOCAL_HIGH_WATER_MARK_KEY.format(organization_id=self.organization_id, object_type=object_type)
     
     # Helper Methods
     
     async def _get_field_mapping(self, object_type: str) -> Dict[str, SalesforceFieldMapping]:
-        """Get field mapping configuration for object type."""
+        """Get field mapping configuration for object type, cached in-process."""
+        mapping = self._field_mapping_cache.get(object_type)
+        if mapping is None:
+            self._ensure_mapping_listener()
+            mapping = await self._load_field_mapping(object_type)
+            self._field_mapping_cache[object_type] = mapping
+        return mapping
+    
+    async def _get_transformers(self, object_type: str) -> Tuple[_RecordTransformer, _RecordTransformer]:
+        """Get the compiled (to Salesforce, from Salesforce) transformers for object type."""
+        transformers = self._compiled_transformers.get(object_type)
+        if transformers is None:
+            transformers = _compile_field_mapping(await self._get_field_mapping(object_type))
+            self._compiled_transformers[object_type] = transformers
+        return transformers
+    
+    async def _load_field_mapping(self, object_type: str) -> Dict[str, SalesforceFieldMapping]:
+        """Load field mapping configuration for object type."""
         # This would load from configuration
         # Return default mappings for now
         return {}
     
-    async def _apply_transformation(self, value: Any, rule: str) -> Any:
-        """Apply data transformation rule."""
-        # Implementation of transformation rules
-        return value
+    async def invalidate_field_mapping(self, object_type: Optional[str] = None) -> None:
+        """Drop cached field mappings here and in every engine listening on Redis."""
+        self._evict_field_mapping(object_type)
+        await self.redis.publish(FIELD_MAPPING_INVALIDATION_CHANNEL, object_type or "*")
+    
+    def _evict_field_mapping(self, object_type: Optional[str]) -> None:
+        """Drop the cached mapping and compiled transformers for one or all object types."""
+        if object_type is None:
+            self._field_mapping_cache.clear()
+            self._compiled_transformers.clear()
+        else:
+            self._field_mapping_cache.pop(object_type, None)
+            self._compiled_transformers.pop(object_type, None)
+    
+    def _ensure_mapping_listener(self) -> None:
+        """Start the invalidation listener if it is not already running."""
+        if self._mapping_listener is None or self._mapping_listener.done():
+            self._mapping_listener = asyncio.create_task(self._listen_for_mapping_invalidations())
+    
+    async def _listen_for_mapping_invalidations(self) -> None:
+        """Evict cached field mappings as invalidation messages arrive."""
+        pubsub = self.redis.pubsub()
+        try:
+            await pubsub.subscribe(FIELD_MAPPING_INVALIDATION_CHANNEL)
+            
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                
+                object_type = message["data"]
+                if isinstance(object_type, bytes):
+                    object_type = object_type.decode()
+                
+                self._evict_field_mapping(None if object_type == "*" else object_type)
+                    
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Without invalidations the cache could go stale, so start over
+            self.logger.warning(f"Field mapping invalidation listener stopped: {e}")
+            self._evict_field_mapping(None)
+        finally:
+            try:
+                await pubsub.reset()
+            except Exception:
+                pass
+    
+    async def aclose(self) -> None:
+        """Stop the field mapping invalidation listener."""
+        if self._mapping_listener is not None:
+            self._mapping_listener.cancel()
+            try:
+                await self._mapping_listener
+            except asyncio.CancelledError:
+                pass
+            self._mapping_listener = None
     
     async def _add_to_dead_letter_queue(
         self,
@@ -572,28 +1123,113 @@ class SalesforceSyncEngine:
             "record_data": record,
             "error_message": error_message,
             "retry_count": record.get("retry_count", 0),
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": self._now()[1]
         }
         
         # Store in Redis with TTL
         dlq_key = f"salesforce_dlq:{self.organization_id}:{object_type}:{record['id']}"
-        await self.redis.setex(
+        self._buffer_queue_entry(
             dlq_key,
-            timedelta(days=7),  # 7 day retention
-            json.dumps(dlq_data)
+            _DLQ_COUNT_KEY.format(organization_id=self.organization_id),
+            _DLQ_INDEX_KEY.format(organization_id=self.organization_id),
+            DLQ_RETENTION,
+            orjson.dumps(dlq_data, default=str)
         )
         
         self.logger.error(f"Added {object_type} record {record['id']} to dead letter queue: {error_message}")
+        
+        if len(self._queue_buffer) >= self.batch_size:
+            await self._flush_queue_entries()
     
     async def _store_conflict(self, conflict_data: Dict[str, Any]) -> None:
         """Store conflict data for manual resolution."""
         conflict_key = f"salesforce_conflicts:{self.organization_id}:{conflict_data['object_type']}:{conflict_data['local_record']['id']}"
-        await self.redis.setex(
+        self._buffer_queue_entry(
             conflict_key,
-            timedelta(days=30),  # 30 day retention
-            json.dumps(conflict_data)
+            _CONFLICT_COUNT_KEY.format(organization_id=self.organization_id),
+            _CONFLICT_INDEX_KEY.format(organization_id=self.organization_id),
+            CONFLICT_RETENTION,
+            orjson.dumps(conflict_data, default=str)
+        )
+        
+        if len(self._queue_buffer) >= self.batch_size:
+            await self._flush_queue_entries()
+    
+    async def remove_from_dead_letter_queue(self, object_type: str, record_id: str) -> bool:
+        """Drop a record's dead letter entry, e.g. after a successful retry."""
+        dlq_key = f"salesforce_dlq:{self.organization_id}:{object_type}:{record_id}"
+        if not await self.redis.delete(dlq_key):
+            return False
+        
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.decr(_DLQ_COUNT_KEY.format(organization_id=self.organization_id))
+            pipe.zrem(_DLQ_INDEX_KEY.format(organization_id=self.organization_id), dlq_key)
+            await pipe.execute()
+        return True
+    
+    async def list_dead_letter_queue(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """List the newest dead letter entries, at most ``limit`` of them."""
+        return await self._list_queue_entries(
+            _DLQ_INDEX_KEY.format(organization_id=self.organization_id), DLQ_RETENTION, limit
         )
     
+    async def _list_queue_entries(self, index_key: str, retention: timedelta, limit: int) -> List[Dict[str, Any]]:
+        """Read the newest queue entries through their index, pruning expired members first."""
+        await self.redis.zremrangebyscore(index_key, "-inf", time.time() - retention.total_seconds())
+        
+        keys = await self.redis.zrevrange(index_key, 0, limit - 1)
+        if not keys:
+            return []
+        
+        # Entries can still expire between the prune and this read
+        return [orjson.loads(payload) for payload in await self.redis.mget(keys) if payload]
+    
+    def _buffer_queue_entry(
+        self,
+        key: str,
+        counter_key: str,
+        index_key: str,
+        retention: timedelta,
+        payload: bytes
+    ) -> None:
+        """Queue a dead letter or conflict entry for the next pipelined write."""
+        self._queue_buffer[key] = (counter_key, index_key, retention, payload)
+    
+    async def _flush_queue_entries(self) -> None:
+        """
+        Write all buffered queue entries in one pipelined transaction.
+        
+        Each entry is stored with its TTL, added to its index and counted;
+        entries that replaced one already in Redis are uncounted afterwards.
+        """
+        if not self._queue_buffer:
+            return
+        
+        # Swap first so entries added while this flush awaits go to the next one
+        entries, self._queue_buffer = self._queue_buffer, {}
+        now = time.time()
+        
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for key in entries:
+                pipe.exists(key)
+            for key, (counter_key, index_key, retention, payload) in entries.items():
+                pipe.setex(key, retention, payload)
+                pipe.zadd(index_key, {key: now})
+                pipe.expire(index_key, retention)
+                pipe.incr(counter_key)
+                pipe.expire(counter_key, retention)
+            results = await pipe.execute()
+        
+        replaced = Counter(
+            counter_key
+            for (counter_key, *_), existed in zip(entries.values(), results[:len(entries)])
+            if existed
+        )
+        for counter_key, count in replaced.items():
+            await self.redis.decrby(counter_key, count)
+        
+        self.logger.debug(f"Flushed {len(entries)} dead letter and conflict entries")
+    
     # Real-time Sync Methods
     
     async def enable_real_time_sync(self, object_type: str) -> None:
@@ -602,26 +1238,50 @@ class SalesforceSyncEngine:
             self.logger.warning(f"Real-time sync not enabled for {object_type}")
             return
         
-        # Subscribe to Platform Events
-        channel = f"/event/{object_type}ChangeEvent"
+        # Subscribe to Change Data Capture events
+        channel = f"/data/{object_type}ChangeEvent"
         
         async for event in self.client.subscribe_platform_events(channel):
             await self._handle_real_time_change(event)
     
     async def _handle_real_time_change(self, event: Dict[str, Any]) -> None:
-        """Handle real-time change event."""
+        """
+        Handle real-time change event.
+        
+        Change Data Capture events carry the changed fields, so they are
+        pulled straight into the local store. Gap events, which carry no
+        field values, fall back to an incremental sync.
+        """
         try:
             event_data = event.get("data", {}).get("payload", {})
-            object_type = event_data.get("ChangeEventHeader", {}).get("entityName", "")
+            header = event_data.get("ChangeEventHeader", {})
+            object_type = header.get("entityName", "")
+            change_type = header.get("changeType", "")
             
             if not object_type:
                 return
             
             # Process the change
-            self.logger.info(f"Processing real-time change for {object_type}")
+            self.logger.info(f"Processing real-time {change_type} change for {object_type}")
+            
+            if change_type in _CDC_GAP_CHANGE_TYPES:
+                await self.sync_bidirectional(object_type, sync_mode="incremental")
+                return
             
-            # Trigger incremental sync for the changed record
-            await self.sync_bidirectional(object_type, sync_mode="incremental")
+            if change_type == "DELETE":
+                self.logger.info(f"Ignoring deletion of {object_type} records {header.get('recordIds')}")
+                return
+            
+            if _CDC_ECHO_FIELD in header.get("changedFields", ()):
+                # Our own push coming back
+                return
+            
+            fields = {k: v for k, v in event_data.items() if k != "ChangeEventHeader"}
+            for record_id in header.get("recordIds", []):
+                await self._pull_from_salesforce(object_type, {**fields, "Id": record_id})
+            
+            await self._flush_sync_state()
+            await self._flush_queue_entries()
             
         except Exception as e:
             self.logger.error(f"Failed to handle real-time change: {e}")
@@ -632,35 +1292,30 @@ class SalesforceSyncEngine:
         """Get synchronization status and statistics."""
         session_factory = get_sessionmaker()
         async with session_factory() as session:
-            # Get overall sync statistics
+            # Count sync records per status in the database
+            stmt = select(SalesforceSyncRecord.sync_status, func.count()).where(
+                SalesforceSyncRecord.organization_id == self.organization_id
+            ).group_by(SalesforceSyncRecord.sync_status)
             if object_type:
-                stmt = select(SalesforceSyncRecord).where(
-                    SalesforceSyncRecord.organization_id == self.organization_id,
-                    SalesforceSyncRecord.object_type == object_type
-                )
-            else:
-                stmt = select(SalesforceSyncRecord).where(
-                    SalesforceSyncRecord.organization_id == self.organization_id
-                )
+                stmt = stmt.where(SalesforceSyncRecord.object_type == object_type)
             
             result = await session.execute(stmt)
-            sync_records = result.scalars().all()
+            status_counts = dict(result.all())
             
             # Calculate statistics
-            total_records = len(sync_records)
-            synced_records = len([r for r in sync_records if r.sync_status == "synced"])
-            failed_records = len([r for r in sync_records if r.sync_status == "failed"])
-            conflict_records = len([r for r in sync_records if r.sync_status == "conflict"])
-            
-            # Get dead letter queue size
-            dlq_pattern = f"salesforce_dlq:{self.organization_id}:*"
-            dlq_keys = await self.redis.keys(dlq_pattern)
-            dlq_size = len(dlq_keys)
+            total_records = sum(status_counts.values())
+            synced_records = status_counts.get("synced", 0)
+            failed_records = status_counts.get("failed", 0)
+            conflict_records = status_counts.get("conflict", 0)
             
-            # Get conflict queue size
-            conflict_pattern = f"salesforce_conflicts:{self.organization_id}:*"
-            conflict_keys = await self.redis.keys(conflict_pattern)
-            conflict_size = len(conflict_keys)
+            # Get dead letter and conflict queue sizes from their counters
+            dlq_size, conflict_size = (
+                max(int(count or 0), 0)
+                for count in await self.redis.mget(
+                    _DLQ_COUNT_KEY.format(organization_id=self.organization_id),
+                    _CONFLICT_COUNT_KEY.format(organization_id=self.organization_id)
+                )
+            )
             
             return {
                 "organization_id": str(self.organization_id),
@@ -673,7 +1328,7 @@ class SalesforceSyncEngine:
                 "dead_letter_queue_size": dlq_size,
                 "conflict_queue_size": conflict_size,
                 "last_sync_time": self._last_sync_time.isoformat() if self._last_sync_time else None,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": datetime.now(timezone.utc).isoformat()
             }
     
     async def get_sync_lag(self, object_type: str) -> float:
@@ -686,14 +1341,14 @@ class SalesforceSyncEngine:
             if not result.get("records"):
                 return 0.0
             
-            remote_modified = datetime.fromisoformat(result["records"][0]["LastModifiedDate"].replace("Z", "+00:00"))
+            remote_modified = _parse_sf_ts(result["records"][0]["LastModifiedDate"])
             
             # Get last sync time
             last_sync = await self._get_last_sync_timestamp(object_type)
             if not last_sync:
                 return 0.0
             
-            lag = (datetime.utcnow() - remote_modified).total_seconds()
+            lag = (datetime.now(timezone.utc) - remote_modified).total_seconds()
             return max(lag, 0.0)
             
         except Exception as e:
@@ -703,18 +1358,22 @@ class SalesforceSyncEngine:
     async def health_check(self) -> Dict[str, Any]:
         """Perform comprehensive health check of sync engine."""
         try:
-            # Check client health
-            client_health = await self.client.health_check()
+            # Check client health and the sync lag of configured objects concurrently
+            obj_types = list(self.client.config.sync_objects)
+            client_health, *lags = await asyncio.gather(
+                self.client.health_check(),
+                *(self.get_sync_lag(obj_type) for obj_type in obj_types),
+                return_exceptions=True
+            )
+            if isinstance(client_health, Exception):
+                raise client_health
             
-            # Check sync lag for configured objects
             sync_lags = {}
-            for obj_type in self.client.config.sync_objects:
-                try:
-                    lag = await self.get_sync_lag(obj_type)
-                    sync_lags[obj_type] = lag
-                except Exception as e:
-                    self.logger.warning(f"Failed to get sync lag for {obj_type}: {e}")
-                    sync_lags[obj_type] = -1.0
+            for obj_type, lag in zip(obj_types, lags):
+                if isinstance(lag, Exception):
+                    self.logger.warning(f"Failed to get sync lag for {obj_type}: {lag}")
+                    lag = -1.0
+                sync_lags[obj_type] = lag
             
             # Check for excessive lag
             excessive_lag = any(lag > self.sync_config.lag_threshold_seconds for lag in sync_lags.values() if lag >= 0)
@@ -733,7 +1392,7 @@ class SalesforceSyncEngine:
                 "excessive_lag": excessive_lag,
                 "sync_in_progress": self._sync_in_progress,
                 "last_sync_time": self._last_sync_time.isoformat() if self._last_sync_time else None,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": datetime.now(timezone.utc).isoformat()
             }
             
         except Exception as e:
@@ -741,7 +1400,7 @@ class SalesforceSyncEngine:
             return {
                 "status": "unhealthy",
                 "error": str(e),
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": datetime.now(timezone.utc).isoformat()
             }
 
 
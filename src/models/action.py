@@ -4,8 +4,8 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import JSON, String, Integer, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import String, Integer, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.database.base import CoreSchemaBase, UUIDPkMixin, TimestampMixin
@@ -14,19 +14,19 @@ from src.database.base import CoreSchemaBase, UUIDPkMixin, TimestampMixin
 class Action(CoreSchemaBase, UUIDPkMixin, TimestampMixin):
     __tablename__ = "actions"
 
-    conversation_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey("core.conversations.id", ondelete="CASCADE"))
-    message_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey("core.messages.id", ondelete="CASCADE"))
+    conversation_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey("core.conversations.id", ondelete="CASCADE"), index=True)
+    message_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey("core.messages.id", ondelete="CASCADE"), index=True)
 
     action_type: Mapped[str] = mapped_column(String(100), nullable=False)
     action_category: Mapped[Optional[str]] = mapped_column(String(50))
     status: Mapped[str] = mapped_column(String(50), default="pending")
 
-    parameters: Mapped[dict] = mapped_column(JSON, default=dict)
-    result: Mapped[dict] = mapped_column(JSON, default=dict)
+    parameters: Mapped[dict] = mapped_column(JSONB, default=dict)
+    result: Mapped[dict] = mapped_column(JSONB, default=dict)
     error_message: Mapped[Optional[str]] = mapped_column(String)
-    error_details: Mapped[Optional[dict]] = mapped_column(JSON)
+    error_details: Mapped[Optional[dict]] = mapped_column(JSONB)
 
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     scheduled_for: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
@@ -4,12 +4,30 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import JSON, String, Integer, Boolean, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import String, Integer, Boolean, DateTime, ForeignKey, Index, text, func
+from sqlalchemy.dialects.postgresql import ENUM, JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.database.base import CoreSchemaBase, UUIDPkMixin, TimestampMixin
 
+# Values of core.conversation_status as created by database_schema.sql
+CONVERSATION_STATUSES = (
+    "initialized",
+    "active",
+    "waiting_for_user",
+    "waiting_for_agent",
+    "processing",
+    "escalated",
+    "transferred",
+    "resolved",
+    "abandoned",
+    "archived",
+)
+
+# Statuses of a conversation that is still open
+OPEN_CONVERSATION_STATUSES = ("active", "waiting_for_user", "waiting_for_agent", "processing")
+_OPEN_STATUSES_SQL = "status IN (%s)" % ", ".join(f"'{status}'" for status in OPEN_CONVERSATION_STATUSES)
+
 
 class Conversation(CoreSchemaBase, UUIDPkMixin, TimestampMixin):
     __tablename__ = "conversations"
@@ -18,11 +36,16 @@ class Conversation(CoreSchemaBase, UUIDPkMixin, TimestampMixin):
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("core.users.id"), nullable=False)
 
     channel: Mapped[str] = mapped_column(String(50), nullable=False)
-    status: Mapped[str] = mapped_column(String(50), default="active")
+    # Native enum: 4-byte oid compares instead of varchar collation per row. The type is
+    # owned by the deployed schema, so it is bound by name and never created from here
+    status: Mapped[str] = mapped_column(
+        ENUM(*CONVERSATION_STATUSES, name="conversation_status", schema="core", create_type=False),
+        default="active",
+    )
     priority: Mapped[int] = mapped_column(Integer, default=2)
 
-    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
-    last_activity_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    last_activity_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     ended_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
     message_count: Mapped[int] = mapped_column(Integer, default=0)
@@ -31,7 +54,7 @@ class Conversation(CoreSchemaBase, UUIDPkMixin, TimestampMixin):
 
     ai_confidence_avg: Mapped[Optional[float]] = mapped_column()
     sentiment_score_avg: Mapped[Optional[float]] = mapped_column()
-    emotion_trajectory: Mapped[list] = mapped_column(JSON, default=list)
+    emotion_trajectory: Mapped[list] = mapped_column(JSONB, default=list)
 
     resolution_type: Mapped[Optional[str]] = mapped_column(String(50))
     resolution_time_seconds: Mapped[Optional[int]] = mapped_column(Integer)
@@ -46,6 +69,26 @@ class Conversation(CoreSchemaBase, UUIDPkMixin, TimestampMixin):
     satisfaction_feedback: Mapped[Optional[str]] = mapped_column(String)
     satisfaction_submitted_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
-    context: Mapped[dict] = mapped_column(JSON, default=dict)
-    context_switches: Mapped[list] = mapped_column(JSON, default=list)
-    conversation_data: Mapped[dict] = mapped_column(JSON, default=dict)
+    context: Mapped[dict] = mapped_column(JSONB, default=dict)
+    context_switches: Mapped[list] = mapped_column(JSONB, default=list)
+    conversation_data: Mapped[dict] = mapped_column(JSONB, default=dict)
+
+    __table_args__ = (
+        # Serves get_active_by_user: equality on (user_id, channel), newest activity first,
+        # restricted to open conversations so closed history never enters the index
+        Index(
+            "ix_conv_user_channel_activity",
+            "user_id",
+            "channel",
+            text("last_activity_at DESC"),
+            postgresql_where=text(_OPEN_STATUSES_SQL),
+        ),
+        # Open conversations only; serves close_abandoned's status + staleness scan
+        Index(
+            "ix_conv_active_status",
+            "status",
+            "last_activity_at",
+            postgresql_where=text(_OPEN_STATUSES_SQL),
+        ),
+        {"schema": "core"},
+    )
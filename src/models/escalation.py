@@ -4,8 +4,8 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import JSON, String, Integer, Boolean, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import String, Integer, Boolean, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.database.base import CoreSchemaBase, UUIDPkMixin, TimestampMixin
@@ -14,7 +14,7 @@ from src.database.base import CoreSchemaBase, UUIDPkMixin, TimestampMixin
 class Escalation(CoreSchemaBase, UUIDPkMixin, TimestampMixin):
     __tablename__ = "escalations"
 
-    conversation_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("core.conversations.id"), nullable=False)
+    conversation_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("core.conversations.id"), nullable=False, index=True)
 
     reason: Mapped[str] = mapped_column(String(255), nullable=False)
     category: Mapped[Optional[str]] = mapped_column(String(100))
@@ -26,7 +26,7 @@ class Escalation(CoreSchemaBase, UUIDPkMixin, TimestampMixin):
     assigned_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     assignment_method: Mapped[Optional[str]] = mapped_column(String(50))
 
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     acknowledged_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     first_response_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     resolved_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
@@ -39,5 +39,6 @@ class Escalation(CoreSchemaBase, UUIDPkMixin, TimestampMixin):
     resolution_category: Mapped[Optional[str]] = mapped_column(String(100))
     resolved_by: Mapped[Optional[str]] = mapped_column(String(255))
 
-    context: Mapped[dict] = mapped_column(JSON, default=dict)
-    metadata: Mapped[dict] = mapped_column(JSON, default=dict)
+    context: Mapped[dict] = mapped_column(JSONB, default=dict)
+    # "metadata" is reserved on declarative classes; keep the column name, rename the attribute
+    meta: Mapped[dict] = mapped_column("metadata", JSONB, default=dict)
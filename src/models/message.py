@@ -4,16 +4,19 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import JSON, String, Integer, DateTime, Boolean, ForeignKey, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import String, Integer, DateTime, Boolean, ForeignKey, Index, Text, text, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
-from src.database.base import CoreSchemaBase, UUIDPkMixin, TimestampMixin
+from src.database.base import CoreSchemaBase, UUIDPkMixin, TimestampMixin, uuid7
 
 
 class Message(CoreSchemaBase, UUIDPkMixin, TimestampMixin):
     __tablename__ = "messages"
 
+    # Messages are append-only; time-ordered ids keep pk inserts on the rightmost index pages
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+
     conversation_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("core.conversations.id", ondelete="CASCADE"), nullable=False)
 
     sender_type: Mapped[str] = mapped_column(String(20), nullable=False)
@@ -26,8 +29,8 @@ class Message(CoreSchemaBase, UUIDPkMixin, TimestampMixin):
 
     intent: Mapped[Optional[str]] = mapped_column(String(100))
     intent_confidence: Mapped[Optional[float]] = mapped_column()
-    secondary_intents: Mapped[list] = mapped_column(JSON, default=list)
-    entities: Mapped[list] = mapped_column(JSON, default=list)
+    secondary_intents: Mapped[list] = mapped_column(JSONB, default=list)
+    entities: Mapped[list] = mapped_column(JSONB, default=list)
     sentiment: Mapped[Optional[float]] = mapped_column()
     emotion: Mapped[Optional[str]] = mapped_column(String(50))
     emotion_intensity: Mapped[Optional[float]] = mapped_column()
@@ -37,9 +40,27 @@ class Message(CoreSchemaBase, UUIDPkMixin, TimestampMixin):
     processing_time_ms: Mapped[Optional[int]] = mapped_column(Integer)
     tokens_used: Mapped[Optional[int]] = mapped_column(Integer)
 
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     edited_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
-    attachments: Mapped[list] = mapped_column(JSON, default=list)
-    message_data: Mapped[dict] = mapped_column(JSON, default=dict)
+    attachments: Mapped[list] = mapped_column(JSONB, default=list)
+    message_data: Mapped[dict] = mapped_column(JSONB, default=dict)
+
+    __table_args__ = (
+        # Leads with the FK, so it also serves joins and ON DELETE CASCADE from conversations;
+        # the DESC key lets list_by_conversation read newest-first straight off the index
+        Index("ix_msg_conv_created", "conversation_id", text("created_at DESC")),
+        # created_at follows physical insert order, so a BRIN summary serves time-range scans
+        # at a fraction of a B-tree's size
+        Index("ix_msg_created_brin", "created_at", postgresql_using="brin", postgresql_with={"pages_per_range": 32}),
+        # Covering index for aggregate_ai_metrics: AI rows only, metric columns carried in the
+        # leaf pages so the aggregate is an index-only scan
+        Index(
+            "ix_msg_ai_metrics",
+            "conversation_id",
+            postgresql_include=["ai_confidence", "sentiment", "processing_time_ms", "tokens_used"],
+            postgresql_where=text("sender_type = 'ai_agent'"),
+        ),
+        {"schema": "core"},
+    )
@@ -3,7 +3,8 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import JSON, String, Integer, Boolean, DateTime
+from sqlalchemy import String, Integer, Boolean, DateTime, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.database.base import CoreSchemaBase, UUIDPkMixin, TimestampMixin
@@ -20,8 +21,14 @@ class Organization(CoreSchemaBase, UUIDPkMixin, TimestampMixin):
     max_users: Mapped[int] = mapped_column(Integer, default=100)
     max_knowledge_entries: Mapped[int] = mapped_column(Integer, default=1000)
 
-    settings: Mapped[dict] = mapped_column(JSON, default=dict)
-    features: Mapped[list] = mapped_column(JSON, default=list)
+    settings: Mapped[dict] = mapped_column(JSONB, default=dict)
+    features: Mapped[list] = mapped_column(JSONB, default=list)
 
     activated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     suspended_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # Default jsonb_ops (not jsonb_path_ops) so both @> containment and ? key-exists can use it
+        Index("ix_org_features_gin", "features", postgresql_using="gin"),
+        {"schema": "core"},
+    )
@@ -4,7 +4,8 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import JSON, String, DateTime
+from sqlalchemy import String, DateTime, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.database.base import CoreSchemaBase, UUIDPkMixin, TimestampMixin
@@ -22,9 +23,14 @@ class User(CoreSchemaBase, UUIDPkMixin, TimestampMixin):
     timezone: Mapped[str] = mapped_column(String(50), default="UTC")
     language: Mapped[str] = mapped_column(String(10), default="en")
 
-    preferences: Mapped[dict] = mapped_column(JSON, default=dict)
+    preferences: Mapped[dict] = mapped_column(JSONB, default=dict)
 
     status: Mapped[str] = mapped_column(String(50), default="active")
     last_login_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
-    __table_args__ = ({"schema": "core"},)
+    __table_args__ = (
+        # Named explicitly: the naming convention keys on column_0 and both start with organization_id
+        UniqueConstraint("organization_id", "external_id", name="uq_user_org_ext"),
+        UniqueConstraint("organization_id", "email", name="uq_user_org_email"),
+        {"schema": "core"},
+    )
@@ -1,13 +1,24 @@
 from __future__ import annotations
 
-from typing import Generic, List, Optional, Sequence, Type, TypeVar
+import json
+from typing import Any, AsyncIterator, Dict, Generic, List, Optional, Sequence, Type, TypeVar
 
-from sqlalchemy import select, update
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import DeclarativeMeta
 
 ModelT = TypeVar("ModelT")
 
+# Rows per INSERT statement for bulk writes; keeps wide tables well under
+# Postgres' 65535 bind-parameter limit per statement
+BULK_INSERT_CHUNK_SIZE = 500
+
+# Rows fetched per server-side cursor round trip when streaming results
+STREAM_BATCH_SIZE = 200
+
+# Below this many rows COPY's setup cost outweighs its throughput advantage
+COPY_MIN_ROWS = 100
+
 
 class BaseRepository(Generic[ModelT]):
     def __init__(self, session: AsyncSession, model: Type[ModelT]):
@@ -22,19 +33,90 @@ class BaseRepository(Generic[ModelT]):
         result = await self.session.execute(select(self.model).limit(limit).offset(offset))
         return list(result.scalars().all())
 
+    async def iter_list(self, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[ModelT]:
+        """Stream every row through a server-side cursor, holding one batch in memory at a time."""
+        async for obj in self.stream(select(self.model), batch_size):
+            yield obj
+
+    async def stream(self, stmt, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[ModelT]:
+        result = await self.session.stream_scalars(stmt.execution_options(yield_per=batch_size))
+        async for obj in result:
+            yield obj
+
     async def create(self, **kwargs) -> ModelT:
-        obj = self.model(**kwargs)
-        self.session.add(obj)
-        await self.session.flush()
-        return obj
+        # One INSERT ... RETURNING instead of add + flush; defaults come back populated
+        result = await self.session.execute(insert(self.model).values(**kwargs).returning(self.model))
+        return result.scalar_one()
+
+    async def bulk_create(self, rows: Sequence[Dict[str, Any]]) -> List[Any]:
+        """Insert many rows with one multi-row INSERT per chunk and return their ids in row order."""
+        ids: List[Any] = []
+        for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+            # A multi-row INSERT ... RETURNING does not promise row order; have SQLAlchemy restore it
+            result = await self.session.execute(
+                insert(self.model).returning(self.model.id, sort_by_parameter_order=True),
+                list(rows[start:start + BULK_INSERT_CHUNK_SIZE]),
+            )
+            ids.extend(result.scalars().all())
+        return ids
+
+    async def copy_from_records(self, rows: Sequence[Dict[str, Any]]) -> List[Any]:
+        """Bulk load rows over the binary COPY protocol and return their ids.
+
+        COPY bypasses SQLAlchemy, so client-side column defaults are applied
+        here and JSON values are serialized up front. Small batches fall back
+        to bulk_create.
+        """
+        if len(rows) < COPY_MIN_ROWS:
+            return await self.bulk_create(rows)
+
+        table = self.model.__table__
+        mapper = self.model.__mapper__
+        # Rows are keyed by mapped attribute name, which can differ from the column name
+        attrs = {column: mapper.get_property_by_column(column).key for column in table.columns}
+        # Columns with server defaults are left out of the COPY unless supplied, so Postgres fills them
+        columns = [column for column in table.columns if column.server_default is None or attrs[column] in rows[0]]
+        records = []
+        for row in rows:
+            record = []
+            for column in columns:
+                if attrs[column] in row:
+                    value = row[attrs[column]]
+                elif column.default is not None:
+                    default = column.default
+                    value = default.arg(None) if default.is_callable else default.arg
+                else:
+                    value = None
+                if isinstance(value, (dict, list)):
+                    value = json.dumps(value)
+                record.append(value)
+            records.append(tuple(record))
+
+        connection = await self.session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            table.name,
+            records=records,
+            columns=[column.name for column in columns],
+            schema_name=table.schema,
+        )
+        id_index = [attrs[column] for column in columns].index("id")
+        return [record[id_index] for record in records]
 
     async def update(self, obj_id, **kwargs) -> Optional[ModelT]:
-        await self.session.execute(update(self.model).where(self.model.id == obj_id).values(**kwargs))
-        await self.session.flush()
-        return await self.get(obj_id)
-
-    async def delete(self, obj_id) -> None:
-        obj = await self.get(obj_id)
-        if obj is not None:
-            await self.session.delete(obj)  # type: ignore[arg-type]
-            await self.session.flush()
+        # RETURNING hands back the updated row in the same round trip
+        result = await self.session.execute(
+            update(self.model)
+            .where(self.model.id == obj_id)
+            .values(**kwargs)
+            .returning(self.model)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def delete(self, obj_id) -> bool:
+        # Single DELETE; dependent rows go through the FKs' ON DELETE CASCADE
+        result = await self.session.execute(
+            delete(self.model).where(self.model.id == obj_id).returning(self.model.id)
+        )
+        return result.scalar_one_or_none() is not None
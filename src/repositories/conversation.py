@@ -1,25 +1,32 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import List, Optional
-from sqlalchemy import select, update
+from sqlalchemy import func, lambda_stmt, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.models.conversation import Conversation
+from src.models.conversation import OPEN_CONVERSATION_STATUSES, Conversation
 from .base import BaseRepository
 
+# Rows closed per transaction by close_abandoned
+CLOSE_ABANDONED_BATCH_SIZE = 1000
+
 
 class ConversationRepository(BaseRepository[Conversation]):
     def __init__(self, session: AsyncSession):
         super().__init__(session, Conversation)
 
     async def get_active_by_user(self, user_id, channel: str) -> Optional[Conversation]:
+        # lambda_stmt caches the constructed statement too, not just its compiled SQL;
+        # user_id and channel become bound parameters
         result = await self.session.execute(
-            select(Conversation).where(
-                Conversation.user_id == user_id,
-                Conversation.channel == channel,
-                Conversation.status.in_(["active", "waiting", "processing"])  # type: ignore[arg-type]
-            ).order_by(Conversation.last_activity_at.desc())
+            lambda_stmt(
+                lambda: select(Conversation).where(
+                    Conversation.user_id == user_id,
+                    Conversation.channel == channel,
+                    Conversation.status.in_(OPEN_CONVERSATION_STATUSES)  # type: ignore[arg-type]
+                ).order_by(Conversation.last_activity_at.desc())
+            )
         )
         return result.scalar_one_or_none()
 
@@ -27,19 +34,42 @@ class ConversationRepository(BaseRepository[Conversation]):
         await self.session.execute(
             update(Conversation)
             .where(Conversation.id == conversation_id)
-            .values(escalated=True, escalation_reason=reason, escalated_at=datetime.utcnow())
+            .values(escalated=True, escalation_reason=reason, escalated_at=func.now())
         )
-        await self.session.flush()
 
-    async def close_abandoned(self, timeout_hours: int = 24) -> int:
-        cutoff = datetime.utcnow() - timedelta(hours=timeout_hours)
-        result = await self.session.execute(
-            update(Conversation)
-            .where(Conversation.status.in_(["active", "waiting"]))  # type: ignore[arg-type]
+    async def close_abandoned(self, timeout_hours: int = 24, batch_size: int = CLOSE_ABANDONED_BATCH_SIZE) -> int:
+        """Mark stale open conversations abandoned, committing every batch_size rows.
+
+        Each batch locks its rows with SKIP LOCKED, so concurrent runs split the
+        work instead of waiting on each other and no transaction grows unbounded.
+        The session is committed after every batch, so run this on a session
+        with no other pending work.
+        """
+        if batch_size < 1:
+            # LIMIT 0 would return no rows yet never a short batch, looping forever
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+        # Timestamps come from the database clock, matching the columns' server defaults
+        cutoff = func.now() - timedelta(hours=timeout_hours)
+        stale_ids = (
+            select(Conversation.id)
+            # Waiting on the user, not on an agent: a stale agent queue is not the user walking away
+            .where(Conversation.status.in_(["active", "waiting_for_user"]))  # type: ignore[arg-type]
             .where(Conversation.last_activity_at < cutoff)
-            .values(status="abandoned", ended_at=datetime.utcnow(), resolution_type="abandoned")
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(Conversation)
+            .where(Conversation.id.in_(stale_ids.scalar_subquery()))
+            .values(status="abandoned", ended_at=func.now(), resolution_type="abandoned")
             .returning(Conversation.id)
+            .execution_options(synchronize_session=False)
         )
-        rows = result.fetchall()
-        await self.session.flush()
-        return len(rows)
+        closed = 0
+        while True:
+            result = await self.session.execute(stmt)
+            count = len(result.fetchall())
+            await self.session.commit()
+            closed += count
+            if count < batch_size:
+                return closed
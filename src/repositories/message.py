@@ -1,36 +1,95 @@
 from __future__ import annotations
 
-from typing import List
-from sqlalchemy import select, func
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+from uuid import UUID
+from sqlalchemy import func, lambda_stmt, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.message import Message
 from .base import BaseRepository
 
 
+@dataclass(frozen=True, slots=True)
+class MessageSummary:
+    """Lightweight read-only view of a message for chat transcripts."""
+
+    id: UUID
+    sender_type: str
+    content: str
+    created_at: datetime
+
+
+# Aggregates over AI-authored messages, in the order _metrics_from_row expects
+_AI_METRIC_COLUMNS = (
+    func.avg(Message.ai_confidence),
+    func.avg(Message.sentiment),
+    func.avg(Message.processing_time_ms),
+    func.sum(Message.tokens_used),
+)
+
+
+def _metrics_from_row(avg_conf: Optional[Any], avg_sent: Optional[Any], avg_latency: Optional[Any], total_tokens: Optional[Any]) -> dict:
+    return {
+        "ai_confidence_avg": float(avg_conf) if avg_conf is not None else None,
+        "sentiment_score_avg": float(avg_sent) if avg_sent is not None else None,
+        "avg_processing_time_ms": float(avg_latency) if avg_latency is not None else None,
+        "total_tokens": int(total_tokens) if total_tokens is not None else 0,
+    }
+
+
 class MessageRepository(BaseRepository[Message]):
     def __init__(self, session: AsyncSession):
         super().__init__(session, Message)
 
     async def list_by_conversation(self, conversation_id, limit: int = 50) -> List[Message]:
         result = await self.session.execute(
-            select(Message).where(Message.conversation_id == conversation_id).order_by(Message.created_at.desc()).limit(limit)
+            lambda_stmt(
+                lambda: select(Message)
+                .where(Message.conversation_id == conversation_id)
+                .order_by(Message.created_at.desc())
+                .limit(limit)
+            )
         )
         return list(result.scalars().all())
 
+    async def list_by_conversation_lite(self, conversation_id, limit: int = 50) -> List[MessageSummary]:
+        """Like list_by_conversation, but selects only transcript columns and skips ORM hydration."""
+        result = await self.session.execute(
+            lambda_stmt(
+                lambda: select(Message.id, Message.sender_type, Message.content, Message.created_at)
+                .where(Message.conversation_id == conversation_id)
+                .order_by(Message.created_at.desc())
+                .limit(limit)
+            )
+        )
+        return [MessageSummary(*row) for row in result.all()]
+
+    async def iter_by_conversation(self, conversation_id) -> AsyncIterator[Message]:
+        """Stream a conversation's messages oldest first without buffering the whole history."""
+        async for message in self.stream(
+            select(Message).where(Message.conversation_id == conversation_id).order_by(Message.created_at)
+        ):
+            yield message
+
     async def aggregate_ai_metrics(self, conversation_id) -> dict:
         result = await self.session.execute(
-            select(
-                func.avg(Message.ai_confidence),
-                func.avg(Message.sentiment),
-                func.avg(Message.processing_time_ms),
-                func.sum(Message.tokens_used),
-            ).where(Message.conversation_id == conversation_id, Message.sender_type == "ai_agent")
+            select(*_AI_METRIC_COLUMNS).where(Message.conversation_id == conversation_id, Message.sender_type == "ai_agent")
+        )
+        return _metrics_from_row(*result.first())
+
+    async def aggregate_ai_metrics_many(self, conversation_ids: Iterable) -> Dict[Any, dict]:
+        """Aggregate AI metrics for many conversations in one GROUP BY query."""
+        ids = list(conversation_ids)
+        if not ids:
+            return {}
+        result = await self.session.execute(
+            select(Message.conversation_id, *_AI_METRIC_COLUMNS)
+            .where(Message.conversation_id.in_(ids), Message.sender_type == "ai_agent")
+            .group_by(Message.conversation_id)
         )
-        avg_conf, avg_sent, avg_latency, total_tokens = result.first()
-        return {
-            "ai_confidence_avg": float(avg_conf) if avg_conf is not None else None,
-            "sentiment_score_avg": float(avg_sent) if avg_sent is not None else None,
-            "avg_processing_time_ms": float(avg_latency) if avg_latency is not None else None,
-            "total_tokens": int(total_tokens) if total_tokens is not None else 0,
-        }
+        metrics = {conversation_id: _metrics_from_row(*row) for conversation_id, *row in result.all()}
+        # Conversations without AI messages get the same empty metrics as aggregate_ai_metrics
+        empty = _metrics_from_row(None, None, None, None)
+        return {conversation_id: metrics.get(conversation_id, dict(empty)) for conversation_id in ids}
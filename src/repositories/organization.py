@@ -1,12 +1,21 @@
 from __future__ import annotations
 
-from typing import Optional
-from sqlalchemy import select
+from typing import FrozenSet, Optional
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.cache import TTLCache
 from src.models.organization import Organization
 from .base import BaseRepository
 
+# Feature sets rarely change and repositories are built per session, so the
+# cache lives at module level and is shared across requests in this process.
+# Writes evict an organization's entry when issued and again when their
+# transaction ends, so a read racing the write cannot re-cache the old value
+# past the commit; other processes still see it for up to the TTL
+FEATURE_CACHE_TTL_SECONDS = 300.0
+_feature_cache: TTLCache[FrozenSet[str]] = TTLCache(maxsize=10_000, ttl_seconds=FEATURE_CACHE_TTL_SECONDS)
+
 
 class OrganizationRepository(BaseRepository[Organization]):
     def __init__(self, session: AsyncSession):
@@ -18,10 +27,31 @@ class OrganizationRepository(BaseRepository[Organization]):
         )
         return result.scalar_one_or_none()
 
+    async def get_features(self, org_id) -> FrozenSet[str]:
+        features = _feature_cache.get(org_id)
+        if features is None:
+            result = await self.session.execute(select(Organization.features).where(Organization.id == org_id))
+            features = frozenset(result.scalar_one_or_none() or ())
+            _feature_cache.set(org_id, features)
+        return features
+
     async def is_feature_enabled(self, org_id, feature: str) -> bool:
-        result = await self.session.execute(select(Organization).where(Organization.id == org_id))
-        org = result.scalar_one_or_none()
-        if not org:
-            return False
-        features = org.features or []
-        return feature in features
+        return feature in await self.get_features(org_id)
+
+    async def update(self, obj_id, **kwargs) -> Optional[Organization]:
+        self._evict_features(obj_id)
+        return await super().update(obj_id, **kwargs)
+
+    async def delete(self, obj_id) -> bool:
+        self._evict_features(obj_id)
+        return await super().delete(obj_id)
+
+    def _evict_features(self, org_id) -> None:
+        _feature_cache.pop(org_id)
+
+        def evict(session, *args) -> None:
+            _feature_cache.pop(org_id)
+
+        # Also evict once the transaction commits or rolls back
+        event.listen(self.session.sync_session, "after_commit", evict, once=True)
+        event.listen(self.session.sync_session, "after_rollback", evict, once=True)
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 from typing import Optional
-from sqlalchemy import select
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.user import User
@@ -14,7 +15,7 @@ class UserRepository(BaseRepository[User]):
 
     async def get_by_email(self, organization_id, email: str) -> Optional[User]:
         result = await self.session.execute(
-            select(User).where(User.organization_id == organization_id, User.email == email)
+            lambda_stmt(lambda: select(User).where(User.organization_id == organization_id, User.email == email))
         )
         return result.scalar_one_or_none()
 
@@ -23,3 +24,14 @@ class UserRepository(BaseRepository[User]):
             select(User).where(User.organization_id == organization_id, User.external_id == external_id)
         )
         return result.scalar_one_or_none()
+
+    async def upsert(self, organization_id, external_id: str, **fields) -> User:
+        """Insert a user or update the existing (organization_id, external_id) row in one round trip."""
+        stmt = insert(User).values(organization_id=organization_id, external_id=external_id, **fields)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[User.organization_id, User.external_id],
+            # updated_at is always refreshed, which also keeps SET non-empty when only keys are given
+            set_={name: stmt.excluded[name] for name in (*fields, "updated_at")},
+        ).returning(User).execution_options(populate_existing=True)
+        result = await self.session.execute(stmt)
+        return result.scalar_one()
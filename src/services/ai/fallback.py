@@ -3,19 +3,39 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import re
+import threading
 import time
-from dataclasses import dataclass
-from enum import Enum
-from typing import Any, Dict, List, Optional, Union
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass
+from enum import Enum, IntEnum
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Protocol, Set, Tuple, Union
 
 from pydantic import BaseModel, Field
 
+from src.core.cache import TTLCache
 from src.core.exceptions import AIServiceError
 from src.core.logging import get_logger
 from src.services.ai.models import AIModel, ModelCapability
 
 logger = get_logger(__name__)
 
+# Elapsed-time clock: immune to NTP/wall-clock steps; wall time is kept only for reporting
+_now = time.monotonic
+
+
+class _HasConfidence(Protocol):
+    """Shape of model responses that carry a confidence score (e.g. AIResponse)."""
+    confidence: float
+
+
+# request_func(model, *args, **kwargs); responses without a confidence attribute skip the threshold check
+RequestFunc = Callable[..., Awaitable[Union[_HasConfidence, Any]]]
+
+# batch_func(model, payloads) -> one response per payload, in order
+BatchRequestFunc = Callable[[AIModel, List[Any]], Awaitable[List[Any]]]
+
 
 class FallbackStrategy(str, Enum):
     """Fallback strategies for AI service failures."""
@@ -37,6 +57,38 @@ class ErrorType(str, Enum):
     UNKNOWN_ERROR = "unknown_error"
 
 
+# Error-message keywords per error type, highest priority first
+_ERROR_KEYWORDS = (
+    (ErrorType.TIMEOUT, "timeout"),
+    (ErrorType.RATE_LIMIT, "rate limit|too many requests"),
+    (ErrorType.QUOTA_EXCEEDED, "quota|limit exceeded"),
+    (ErrorType.AUTHENTICATION_ERROR, "unauthorized|authentication"),
+    (ErrorType.NETWORK_ERROR, "network|connection"),
+)
+# One case-insensitive alternation with a named group per error type
+_ERROR_RE = re.compile(
+    "|".join(f"(?P<{error_type.name}>{keywords})" for error_type, keywords in _ERROR_KEYWORDS),
+    re.IGNORECASE,
+)
+_ERROR_PRIORITY = {error_type.name: rank for rank, (error_type, _) in enumerate(_ERROR_KEYWORDS)}
+
+
+def _retrieve_exception(future: asyncio.Future) -> None:
+    """Mark a single-flight future's exception as seen when no follower awaited it."""
+    if not future.cancelled():
+        future.exception()
+
+
+# Result handed to single-flight followers when the leader is cancelled
+_LEADER_CANCELLED: Any = object()
+
+# Extra delay-schedule entries beyond max_attempts, for fallback chains longer than max_attempts
+RETRY_SCHEDULE_HEADROOM = 8
+
+# Lock shards for per-model stats; models hash to a shard so unrelated updates rarely contend
+STATS_LOCK_SHARDS = 16
+
+
 @dataclass
 class FallbackConfig:
     """Configuration for fallback behavior."""
@@ -51,9 +103,17 @@ class FallbackConfig:
     enable_circuit_breaker: bool = True
     circuit_breaker_threshold: int = 5
     circuit_breaker_timeout: int = 300
+    circuit_breaker_half_open_max_calls: int = 1  # concurrent probes allowed while half-open
+    circuit_breaker_success_threshold: int = 2  # consecutive probe successes needed to close
+    max_parallel: int = 4  # concurrent parallel-mode calls per provider
+    per_provider_limits: Optional[Dict[str, int]] = None  # overrides max_parallel per provider
+    cache_ttl: float = 0.0  # seconds to reuse successful responses for a cache_key; 0 disables
+    cache_max_entries: int = 1024
+    batch_window_ms: float = 5.0  # micro-batching window, used when a batch function is supplied
+    batch_max_size: int = 32
 
 
-@dataclass
+@dataclass(slots=True)
 class FallbackAttempt:
     """Record of a fallback attempt."""
     model_name: str
@@ -65,9 +125,10 @@ class FallbackAttempt:
     error_message: Optional[str] = None
     confidence: float = 0.0
     response_time: float = 0.0
+    response: Optional[Any] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class FallbackResult:
     """Result of fallback execution."""
     success: bool
@@ -82,63 +143,272 @@ class FallbackResult:
             self.attempts = []
 
 
+@dataclass(slots=True)
+class ModelStats:
+    """Per-model attempt counters kept by FallbackManager."""
+    total_attempts: int = 0
+    successful_attempts: int = 0
+    failed_attempts: int = 0
+    avg_response_time: float = 0.0
+    success_rate: float = 0.0
+
+
+class _CBState(IntEnum):
+    """Circuit breaker states; integer compares on the per-attempt check."""
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
+
+
+# Names reported by get_stats(), unchanged from the previous string states
+_CB_STATE_NAMES = {
+    _CBState.CLOSED: "closed",
+    _CBState.OPEN: "open",
+    _CBState.HALF_OPEN: "half-open",
+}
+
+
 class CircuitBreaker:
     """Circuit breaker pattern for AI service protection."""
     
+    __slots__ = (
+        "failure_threshold",
+        "timeout",
+        "expected_exception",
+        "failure_count",
+        "last_failure_time",
+        "last_failure_wall",
+        "state",
+        "half_open_max_calls",
+        "success_threshold",
+        "_half_open_inflight",
+        "_consecutive_successes",
+        "_lock",
+    )
+    
     def __init__(
         self,
         failure_threshold: int = 5,
         timeout: int = 300,
-        expected_exception: type = Exception
+        expected_exception: type = Exception,
+        half_open_max_calls: int = 1,
+        success_threshold: int = 2
     ):
-        self.failure_threshold = failure_threshold
-        self.timeout = timeout
-        self.expected_exception = expected_exception
-        self.failure_count = 0
-        self.last_failure_time = None
-        self.state = "closed"  # closed, open, half-open
+        # Attributes are annotated so a mypyc build can give them native int/float layouts
+        self.failure_threshold: int = failure_threshold
+        self.timeout: int = timeout
+        self.expected_exception: type = expected_exception
+        self.half_open_max_calls: int = half_open_max_calls
+        self.success_threshold: int = success_threshold
+        self.failure_count: int = 0
+        self.last_failure_time: Optional[float] = None  # monotonic, for timeout math
+        self.last_failure_wall: Optional[float] = None  # wall clock, for get_stats()
+        self.state: _CBState = _CBState.CLOSED
+        self._half_open_inflight: int = 0
+        self._consecutive_successes: int = 0
+        # Guards state transitions when a manager is shared across threads or event loops
+        self._lock = threading.Lock()
     
     def can_execute(self) -> bool:
-        """Check if the circuit breaker allows execution."""
-        if self.state == "closed":
+        """
+        Check if the circuit breaker allows execution.
+        
+        While half-open only half_open_max_calls probes may be in flight; each
+        admitted call must be settled with record_success, record_failure or release.
+        """
+        if self.state == _CBState.CLOSED:
             return True
-        elif self.state == "open":
-            if time.time() - self.last_failure_time > self.timeout:
-                self.state = "half-open"
+        with self._lock:
+            if self.state == _CBState.OPEN:
+                if _now() - self.last_failure_time <= self.timeout:
+                    return False
+                self.state = _CBState.HALF_OPEN
+                self._half_open_inflight = 0
+                self._consecutive_successes = 0
+            elif self.state == _CBState.CLOSED:
                 return True
-            return False
-        else:  # half-open
+            
+            # half-open
+            if self._half_open_inflight >= self.half_open_max_calls:
+                return False
+            self._half_open_inflight += 1
             return True
     
+    def release(self) -> None:
+        """Give back a half-open probe slot for a call that ended without an outcome (e.g. cancelled)."""
+        with self._lock:
+            if self.state == _CBState.HALF_OPEN and self._half_open_inflight > 0:
+                self._half_open_inflight -= 1
+    
+    def reset(self) -> None:
+        """Return to the closed state with no recorded failures."""
+        with self._lock:
+            self.failure_count = 0
+            self.state = _CBState.CLOSED
+            self._half_open_inflight = 0
+            self._consecutive_successes = 0
+    
     def record_success(self) -> None:
         """Record a successful execution."""
-        self.failure_count = 0
-        self.state = "closed"
+        with self._lock:
+            self.failure_count = 0
+            if self.state == _CBState.HALF_OPEN:
+                if self._half_open_inflight > 0:
+                    self._half_open_inflight -= 1
+                self._consecutive_successes += 1
+                if self._consecutive_successes < self.success_threshold:
+                    return
+            self.state = _CBState.CLOSED
     
     def record_failure(self) -> None:
         """Record a failed execution."""
-        self.failure_count += 1
-        self.last_failure_time = time.time()
+        with self._lock:
+            self.failure_count += 1
+            self.last_failure_time = _now()
+            self.last_failure_wall = time.time()
+            
+            # A failed probe reopens immediately rather than waiting for the threshold again
+            opened = False
+            if self.state == _CBState.HALF_OPEN:
+                self.state = _CBState.OPEN
+                self._half_open_inflight = 0
+                self._consecutive_successes = 0
+            elif self.failure_count >= self.failure_threshold:
+                self.state = _CBState.OPEN
+                opened = True
+            failure_count = self.failure_count
         
-        if self.failure_count >= self.failure_threshold:
-            self.state = "open"
-            logger.warning(f"Circuit breaker opened after {self.failure_count} failures")
+        # Log outside the lock so handler I/O never blocks other callers
+        if opened:
+            logger.warning("Circuit breaker opened after %d failures", failure_count)
+
+
+class MicroBatcher:
+    """
+    Coalesces single-payload requests to the same model into batched provider calls.
+    
+    Requests arriving within window_ms of the first one in a batch (or until
+    max_batch accumulate) are sent as one batch_func call, and each caller
+    receives its own element of the response list.
+    """
+    
+    def __init__(self, batch_func: BatchRequestFunc, window_ms: float = 5.0, max_batch: int = 32):
+        self.batch_func = batch_func
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._pending: Dict[str, Deque[Tuple[Any, asyncio.Future]]] = {}
+        self._models: Dict[str, AIModel] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+    
+    async def submit(self, model: AIModel, payload: Any) -> Any:
+        """Queue a payload for the model's next batch and wait for its response."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self._pending.setdefault(model.name, deque())
+        queue.append((payload, future))
+        self._models[model.name] = model
+        
+        if len(queue) >= self.max_batch:
+            self._flush(model.name)
+        elif model.name not in self._timers:
+            self._timers[model.name] = loop.call_later(self.window, self._flush, model.name)
+        return await future
+    
+    def _flush(self, model_name: str) -> None:
+        """Send up to max_batch queued payloads for a model as one batch."""
+        timer = self._timers.pop(model_name, None)
+        if timer is not None:
+            timer.cancel()
+        
+        queue = self._pending.get(model_name)
+        if not queue:
+            return
+        batch = [queue.popleft() for _ in range(min(len(queue), self.max_batch))]
+        if queue:
+            self._timers[model_name] = asyncio.get_running_loop().call_later(self.window, self._flush, model_name)
+        
+        # Keep a reference so the dispatch task is not garbage-collected mid-flight
+        task = asyncio.create_task(self._dispatch(self._models[model_name], batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _dispatch(self, model: AIModel, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        """Make the batched call and hand each caller its response."""
+        # Callers that already timed out or were cancelled are dropped from the batch
+        live = [(payload, future) for payload, future in batch if not future.done()]
+        if not live:
+            return
+        
+        try:
+            responses = await self.batch_func(model, [payload for payload, _ in live])
+            if len(responses) != len(live):
+                raise AIServiceError(
+                    f"Batch call to {model.name} returned {len(responses)} responses for {len(live)} requests"
+                )
+        except Exception as e:
+            for _, future in live:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), response in zip(live, responses):
+            if not future.done():
+                future.set_result(response)
 
 
 class FallbackManager:
     """Manages fallback strategies and error handling for AI services."""
     
-    def __init__(self, config: FallbackConfig):
+    def __init__(self, config: FallbackConfig, batch_func: Optional[BatchRequestFunc] = None):
         self.config = config
+        # Models flagged supports_batch (in metadata) route single-payload requests through the batcher
+        self._batcher: Optional[MicroBatcher] = (
+            MicroBatcher(batch_func, window_ms=config.batch_window_ms, max_batch=config.batch_max_size)
+            if batch_func is not None else None
+        )
         self.circuit_breakers: Dict[str, CircuitBreaker] = {}
-        self.fallback_stats: Dict[str, Dict[str, Any]] = {}
+        self.fallback_stats: Dict[str, ModelStats] = defaultdict(ModelStats)
+        self._stats_locks: Tuple[threading.Lock, ...] = tuple(threading.Lock() for _ in range(STATS_LOCK_SHARDS))
+        self._delays = self._build_delay_schedule(config)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        # Strategy is fixed per manager, so resolve it once rather than branching per request
+        self._run_strategy = {
+            FallbackStrategy.SEQUENTIAL: self._sequential_entry,
+            FallbackStrategy.PARALLEL: self._parallel_entry,
+            FallbackStrategy.HYBRID: self._execute_hybrid,
+        }[config.strategy]
+        self._inflight: Dict[bytes, asyncio.Future] = {}
+        self._response_cache: Optional[TTLCache[Tuple[str, Any]]] = (
+            TTLCache(maxsize=config.cache_max_entries, ttl_seconds=config.cache_ttl)
+            if config.cache_ttl > 0 else None
+        )
+    
+    @staticmethod
+    def _build_delay_schedule(config: FallbackConfig) -> Tuple[float, ...]:
+        """Materialize the retry delay for each attempt index once; the config is fixed per manager."""
+        length = config.max_attempts + RETRY_SCHEDULE_HEADROOM
+        if not config.exponential_backoff:
+            return (config.retry_delay,) * length
+        return tuple(min(config.retry_delay * (2 ** i), config.max_backoff_delay) for i in range(length))
+    
+    def _semaphore_for(self, model: AIModel) -> asyncio.Semaphore:
+        """Get or create the semaphore bounding concurrent calls to a model's provider."""
+        provider = str(getattr(model, "provider", model.name))
+        semaphore = self._semaphores.get(provider)
+        if semaphore is None:
+            limits = self.config.per_provider_limits or {}
+            semaphore = self._semaphores[provider] = asyncio.Semaphore(limits.get(provider, self.config.max_parallel))
+        return semaphore
     
     def get_circuit_breaker(self, model_name: str) -> CircuitBreaker:
         """Get or create a circuit breaker for a model."""
         if model_name not in self.circuit_breakers:
             self.circuit_breakers[model_name] = CircuitBreaker(
                 failure_threshold=self.config.circuit_breaker_threshold,
-                timeout=self.config.circuit_breaker_timeout
+                timeout=self.config.circuit_breaker_timeout,
+                half_open_max_calls=self.config.circuit_breaker_half_open_max_calls,
+                success_threshold=self.config.circuit_breaker_success_threshold
             )
         return self.circuit_breakers[model_name]
     
@@ -147,33 +417,119 @@ class FallbackManager:
         primary_model: AIModel,
         fallback_models: List[AIModel],
         capability: ModelCapability,
-        request_func: callable,
+        request_func: RequestFunc,
         *args,
+        cache_key: Optional[str] = None,
         **kwargs
     ) -> FallbackResult:
-        """Execute a request with fallback support."""
-        start_time = time.time()
-        attempts = []
-        all_models = [primary_model] + fallback_models
+        """
+        Execute a request with fallback support.
         
-        if self.config.strategy == FallbackStrategy.SEQUENTIAL:
-            return await self._execute_sequential(
-                all_models, capability, request_func, attempts, start_time, *args, **kwargs
-            )
-        elif self.config.strategy == FallbackStrategy.PARALLEL:
-            return await self._execute_parallel(
-                all_models, capability, request_func, attempts, start_time, *args, **kwargs
-            )
-        else:  # HYBRID
-            return await self._execute_hybrid(
-                primary_model, fallback_models, capability, request_func, attempts, start_time, *args, **kwargs
-            )
+        Callers may pass a cache_key identifying the request payload (e.g. the
+        prompt). Concurrent identical requests then share a single execution,
+        and when response caching is enabled a successful response is reused
+        for identical requests within cache_ttl.
+        """
+        if cache_key is None:
+            return await self._execute(primary_model, fallback_models, capability, request_func, *args, **kwargs)
+        
+        key = self._cache_digest(primary_model, fallback_models, cache_key)
+        if self._response_cache is not None:
+            cached = self._response_cache.get(key)
+            if cached is not None:
+                final_model, response = cached
+                return FallbackResult(success=True, final_model=final_model, response=response)
+        
+        # Single-flight: followers await the leader's result instead of calling the provider again
+        while True:
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            result = await asyncio.shield(inflight)
+            if result is not _LEADER_CANCELLED:
+                return result
+            # The leader was cancelled; retry, possibly as the new leader
+        
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_retrieve_exception)
+        self._inflight[key] = future
+        try:
+            result = await self._execute(primary_model, fallback_models, capability, request_func, *args, **kwargs)
+            if self._response_cache is not None and result.success:
+                self._response_cache.set(key, (result.final_model, result.response))
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            # Only the leader was cancelled; wake followers so they retry instead of failing
+            future.set_result(_LEADER_CANCELLED)
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+    
+    @staticmethod
+    def _cache_digest(primary_model: AIModel, fallback_models: List[AIModel], cache_key: str) -> bytes:
+        """Fixed-size key for a request: the model chain plus the caller's payload key."""
+        digest = hashlib.blake2b(digest_size=16)
+        for model in (primary_model, *fallback_models):
+            digest.update(model.name.encode())
+            digest.update(b"\0")
+        digest.update(cache_key.encode())
+        return digest.digest()
+    
+    async def _execute(
+        self,
+        primary_model: AIModel,
+        fallback_models: List[AIModel],
+        capability: ModelCapability,
+        request_func: RequestFunc,
+        *args,
+        **kwargs
+    ) -> FallbackResult:
+        """Run the configured fallback strategy."""
+        return await self._run_strategy(
+            primary_model, fallback_models, capability, request_func, [], _now(), *args, **kwargs
+        )
+    
+    async def _sequential_entry(
+        self,
+        primary_model: AIModel,
+        fallback_models: List[AIModel],
+        capability: ModelCapability,
+        request_func: RequestFunc,
+        attempts: List[FallbackAttempt],
+        start_time: float,
+        *args,
+        **kwargs
+    ) -> FallbackResult:
+        """SEQUENTIAL strategy: the primary, then each fallback in order."""
+        return await self._execute_sequential(
+            [primary_model, *fallback_models], capability, request_func, attempts, start_time, *args, **kwargs
+        )
+    
+    async def _parallel_entry(
+        self,
+        primary_model: AIModel,
+        fallback_models: List[AIModel],
+        capability: ModelCapability,
+        request_func: RequestFunc,
+        attempts: List[FallbackAttempt],
+        start_time: float,
+        *args,
+        **kwargs
+    ) -> FallbackResult:
+        """PARALLEL strategy: the primary and all fallbacks at once."""
+        return await self._execute_parallel(
+            [primary_model, *fallback_models], capability, request_func, attempts, start_time, *args, **kwargs
+        )
     
     async def _execute_sequential(
         self,
         models: List[AIModel],
         capability: ModelCapability,
-        request_func: callable,
+        request_func: RequestFunc,
         attempts: List[FallbackAttempt],
         start_time: float,
         *args,
@@ -184,7 +540,7 @@ class FallbackManager:
             attempt = FallbackAttempt(
                 model_name=model.name,
                 attempt_number=i + 1,
-                start_time=time.time()
+                start_time=_now()
             )
             
             # Check circuit breaker
@@ -192,26 +548,26 @@ class FallbackManager:
             if not circuit_breaker.can_execute():
                 attempt.error_type = ErrorType.MODEL_UNAVAILABLE
                 attempt.error_message = "Circuit breaker is open"
-                attempt.end_time = time.time()
+                attempt.end_time = attempt.start_time
                 attempts.append(attempt)
                 continue
             
             try:
-                # Execute request with timeout
-                response = await asyncio.wait_for(
-                    request_func(model, *args, **kwargs),
-                    timeout=self.config.timeout_per_attempt
-                )
+                # Execute request with timeout (a cancel scope on this task, no wrapper task)
+                async with asyncio.timeout(self.config.timeout_per_attempt):
+                    response = await self._call_model(model, request_func, args, kwargs)
                 
-                attempt.end_time = time.time()
-                attempt.response_time = attempt.end_time - attempt.start_time
+                end = _now()
+                attempt.end_time = end
+                attempt.response_time = end - attempt.start_time
                 
-                # Check confidence if applicable
-                if hasattr(response, 'confidence'):
-                    attempt.confidence = response.confidence
-                    if response.confidence < self.config.confidence_threshold:
+                # Check confidence if applicable; one lookup with a default instead of hasattr + read
+                confidence = getattr(response, "confidence", None)
+                if confidence is not None:
+                    attempt.confidence = confidence
+                    if confidence < self.config.confidence_threshold:
                         attempt.error_type = ErrorType.LOW_CONFIDENCE
-                        attempt.error_message = f"Low confidence: {response.confidence:.2f}"
+                        attempt.error_message = f"Low confidence: {confidence:.2f}"
                         circuit_breaker.record_failure()
                         attempts.append(attempt)
                         continue
@@ -227,7 +583,7 @@ class FallbackManager:
                     success=True,
                     final_model=model.name,
                     attempts=attempts,
-                    total_time=time.time() - start_time,
+                    total_time=end - start_time,
                     response=response
                 )
                 
@@ -235,13 +591,17 @@ class FallbackManager:
                 attempt.error_type = ErrorType.TIMEOUT
                 attempt.error_message = "Request timeout"
                 circuit_breaker.record_failure()
+            except asyncio.CancelledError:
+                circuit_breaker.release()
+                raise
             except Exception as e:
                 attempt.error_type = self._classify_error(e)
                 attempt.error_message = str(e)
                 circuit_breaker.record_failure()
             
-            attempt.end_time = time.time()
-            attempt.response_time = attempt.end_time - attempt.start_time
+            end = _now()
+            attempt.end_time = end
+            attempt.response_time = end - attempt.start_time
             attempts.append(attempt)
             
             self._update_stats(model.name, False, attempt.response_time)
@@ -256,7 +616,7 @@ class FallbackManager:
         return FallbackResult(
             success=False,
             attempts=attempts,
-            total_time=time.time() - start_time,
+            total_time=_now() - start_time,
             error="All fallback attempts failed"
         )
     
@@ -264,77 +624,84 @@ class FallbackManager:
         self,
         models: List[AIModel],
         capability: ModelCapability,
-        request_func: callable,
+        request_func: RequestFunc,
         attempts: List[FallbackAttempt],
         start_time: float,
         *args,
         **kwargs
     ) -> FallbackResult:
-        """Execute models in parallel and return the best result."""
-        tasks = []
+        """Execute models in parallel; the first acceptable result wins and the rest are cancelled."""
+        winner: Optional[FallbackAttempt] = None
+        admitted = 0
+        tasks: List[asyncio.Task] = []
         
-        for model in models:
-            # Check circuit breaker
+        async def run(model: AIModel) -> None:
+            nonlocal winner, admitted
             circuit_breaker = self.get_circuit_breaker(model.name)
+            # Admission happens inside the task: a task cancelled before it starts never holds a
+            # half-open probe slot, and one that started always settles or releases it below
             if not circuit_breaker.can_execute():
-                continue
+                return
+            admitted += 1
+            settled = False
+            try:
+                attempt = await self._execute_single_model(model, request_func, *args, **kwargs)
+                if attempt.success and attempt.confidence < self.config.confidence_threshold:
+                    attempt.success = False
+                    attempt.error_type = ErrorType.LOW_CONFIDENCE
+                    attempt.error_message = f"Low confidence: {attempt.confidence:.2f}"
+                
+                if attempt.success:
+                    circuit_breaker.record_success()
+                else:
+                    circuit_breaker.record_failure()
+                settled = True
+            finally:
+                if not settled:
+                    # Cancelled losers and timed-out calls have no outcome; free the probe slot
+                    circuit_breaker.release()
             
-            task = asyncio.create_task(
-                self._execute_single_model(model, request_func, *args, **kwargs)
-            )
-            tasks.append((model, task))
+            # Every completed attempt is recorded, numbered in completion order
+            attempt.attempt_number = len(attempts) + 1
+            attempts.append(attempt)
+            self._update_stats(model.name, attempt.success, attempt.response_time)
+            
+            if attempt.success and winner is None:
+                winner = attempt
+                # Cancel the losers; the task group awaits their cleanup before exiting
+                current = asyncio.current_task()
+                for task in tasks:
+                    if task is not current:
+                        task.cancel()
+        
+        try:
+            async with asyncio.timeout(self.config.parallel_timeout):
+                async with asyncio.TaskGroup() as tg:
+                    tasks.extend(tg.create_task(run(model)) for model in models)
+        except asyncio.TimeoutError:
+            pass
         
-        if not tasks:
+        if not admitted:
             return FallbackResult(
                 success=False,
                 attempts=attempts,
-                total_time=time.time() - start_time,
+                total_time=_now() - start_time,
                 error="No models available (all circuit breakers open)"
             )
         
-        # Wait for first successful result or all to complete
-        try:
-            done, pending = await asyncio.wait(
-                [task for _, task in tasks],
-                timeout=self.config.parallel_timeout,
-                return_when=asyncio.FIRST_COMPLETED
+        if winner is not None:
+            return FallbackResult(
+                success=True,
+                final_model=winner.model_name,
+                attempts=attempts,
+                total_time=_now() - start_time,
+                response=winner.response
             )
-            
-            # Cancel pending tasks
-            for task in pending:
-                task.cancel()
-            
-            # Check results
-            best_attempt = None
-            best_confidence = 0.0
-            
-            for model, task in tasks:
-                if task in done:
-                    try:
-                        result = await task
-                        if result.success and result.confidence > best_confidence:
-                            best_attempt = result
-                            best_confidence = result.confidence
-                    except Exception:
-                        pass
-            
-            if best_attempt and best_confidence >= self.config.confidence_threshold:
-                attempts.append(best_attempt)
-                return FallbackResult(
-                    success=True,
-                    final_model=best_attempt.model_name,
-                    attempts=attempts,
-                    total_time=time.time() - start_time,
-                    response=best_attempt.response
-                )
-            
-        except asyncio.TimeoutError:
-            pass
         
         return FallbackResult(
             success=False,
             attempts=attempts,
-            total_time=time.time() - start_time,
+            total_time=_now() - start_time,
             error="Parallel execution timeout or no successful results"
         )
     
@@ -343,7 +710,7 @@ class FallbackManager:
         primary_model: AIModel,
         fallback_models: List[AIModel],
         capability: ModelCapability,
-        request_func: callable,
+        request_func: RequestFunc,
         attempts: List[FallbackAttempt],
         start_time: float,
         *args,
@@ -370,109 +737,129 @@ class FallbackManager:
     async def _execute_single_model(
         self,
         model: AIModel,
-        request_func: callable,
+        request_func: RequestFunc,
         *args,
         **kwargs
     ) -> FallbackAttempt:
         """Execute a single model and return attempt result."""
+        # Bound fan-out per provider; waiting for a slot is not counted against the attempt timeout
+        async with self._semaphore_for(model):
+            return await self._run_single_attempt(model, request_func, *args, **kwargs)
+    
+    async def _run_single_attempt(
+        self,
+        model: AIModel,
+        request_func: RequestFunc,
+        *args,
+        **kwargs
+    ) -> FallbackAttempt:
+        """Run one timed model call and record it as an attempt."""
         attempt = FallbackAttempt(
             model_name=model.name,
             attempt_number=1,
-            start_time=time.time()
+            start_time=_now()
         )
         
         try:
-            response = await asyncio.wait_for(
-                request_func(model, *args, **kwargs),
-                timeout=self.config.timeout_per_attempt
-            )
+            async with asyncio.timeout(self.config.timeout_per_attempt):
+                response = await self._call_model(model, request_func, args, kwargs)
             
-            attempt.end_time = time.time()
-            attempt.response_time = attempt.end_time - attempt.start_time
+            end = _now()
+            attempt.end_time = end
+            attempt.response_time = end - attempt.start_time
             attempt.success = True
             
-            if hasattr(response, 'confidence'):
-                attempt.confidence = response.confidence
+            attempt.confidence = getattr(response, "confidence", 0.0)
             
             attempt.response = response
             
         except Exception as e:
-            attempt.end_time = time.time()
-            attempt.response_time = attempt.end_time - attempt.start_time
+            end = _now()
+            attempt.end_time = end
+            attempt.response_time = end - attempt.start_time
             attempt.error_type = self._classify_error(e)
             attempt.error_message = str(e)
         
         return attempt
     
+    def _call_model(
+        self,
+        model: AIModel,
+        request_func: RequestFunc,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any]
+    ) -> Awaitable[Any]:
+        """Issue one model request, through the micro-batcher when the model supports batching."""
+        if (
+            self._batcher is not None
+            and len(args) == 1
+            and not kwargs
+            and (getattr(model, "supports_batch", False) or model.metadata.get("supports_batch", False))
+        ):
+            return self._batcher.submit(model, args[0])
+        return request_func(model, *args, **kwargs)
+    
     def _classify_error(self, error: Exception) -> ErrorType:
         """Classify an error type for fallback decisions."""
-        error_str = str(error).lower()
-        
-        if "timeout" in error_str:
-            return ErrorType.TIMEOUT
-        elif "rate limit" in error_str or "too many requests" in error_str:
-            return ErrorType.RATE_LIMIT
-        elif "quota" in error_str or "limit exceeded" in error_str:
-            return ErrorType.QUOTA_EXCEEDED
-        elif "unauthorized" in error_str or "authentication" in error_str:
-            return ErrorType.AUTHENTICATION_ERROR
-        elif "network" in error_str or "connection" in error_str:
-            return ErrorType.NETWORK_ERROR
-        else:
-            return ErrorType.UNKNOWN_ERROR
+        # Single regex pass; when several types match, the highest-priority one wins
+        best: Optional[str] = None
+        for match in _ERROR_RE.finditer(str(error)):
+            name = match.lastgroup
+            if best is None or _ERROR_PRIORITY[name] < _ERROR_PRIORITY[best]:
+                best = name
+                if _ERROR_PRIORITY[best] == 0:
+                    break
+        return ErrorType[best] if best is not None else ErrorType.UNKNOWN_ERROR
     
     def _calculate_delay(self, attempt_number: int) -> float:
-        """Calculate retry delay with exponential backoff."""
-        if not self.config.exponential_backoff:
-            return self.config.retry_delay
-        
-        delay = self.config.retry_delay * (2 ** attempt_number)
-        return min(delay, self.config.max_backoff_delay)
+        """Look up the retry delay for an attempt; indexes past the schedule reuse its last entry."""
+        return self._delays[min(attempt_number, len(self._delays) - 1)]
     
     def _update_stats(self, model_name: str, success: bool, response_time: float) -> None:
         """Update fallback statistics."""
-        if model_name not in self.fallback_stats:
-            self.fallback_stats[model_name] = {
-                "total_attempts": 0,
-                "successful_attempts": 0,
-                "failed_attempts": 0,
-                "avg_response_time": 0.0,
-                "success_rate": 0.0,
-            }
-        
-        stats = self.fallback_stats[model_name]
-        stats["total_attempts"] += 1
-        
-        if success:
-            stats["successful_attempts"] += 1
-        else:
-            stats["failed_attempts"] += 1
-        
-        # Update averages
-        stats["avg_response_time"] = (
-            (stats["avg_response_time"] * (stats["total_attempts"] - 1) + response_time) 
-            / stats["total_attempts"]
-        )
-        stats["success_rate"] = stats["successful_attempts"] / stats["total_attempts"]
+        with self._stats_lock(model_name):
+            stats = self.fallback_stats[model_name]
+            
+            total = stats.total_attempts + 1
+            stats.total_attempts = total
+            if success:
+                stats.successful_attempts += 1
+            else:
+                stats.failed_attempts += 1
+            
+            # Incremental mean: avoids re-multiplying the running sum, no drift as the count grows
+            stats.avg_response_time += (response_time - stats.avg_response_time) / total
+            stats.success_rate = stats.successful_attempts / total
+    
+    def _stats_lock(self, model_name: str) -> threading.Lock:
+        """Lock shard guarding a model's stats entry."""
+        return self._stats_locks[hash(model_name) % STATS_LOCK_SHARDS]
+    
+    def _snapshot_stats(self, model_name: str, stats: ModelStats) -> Dict[str, Any]:
+        """Serialize one stats entry without observing a half-applied update."""
+        with self._stats_lock(model_name):
+            return asdict(stats)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get fallback statistics."""
         return {
             "circuit_breakers": {
                 name: {
-                    "state": cb.state,
+                    "state": _CB_STATE_NAMES[cb.state],
                     "failure_count": cb.failure_count,
-                    "last_failure_time": cb.last_failure_time,
+                    "last_failure_time": cb.last_failure_wall,
                 }
                 for name, cb in self.circuit_breakers.items()
             },
-            "model_stats": self.fallback_stats.copy(),
+            # Serialized to plain dicts, so callers get a snapshot rather than the live counters
+            "model_stats": {
+                name: self._snapshot_stats(name, stats) for name, stats in list(self.fallback_stats.items())
+            },
         }
     
     def reset_stats(self) -> None:
         """Reset fallback statistics."""
         self.fallback_stats.clear()
         for cb in self.circuit_breakers.values():
-            cb.failure_count = 0
-            cb.state = "closed"
+            cb.reset()
         logger.info("Fallback manager statistics reset")
@@ -0,0 +1,164 @@
+"""Embedding cache backends: persistent storage and similarity-keyed caching."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from typing import Generic, Hashable, List, Optional, Protocol, Sequence, Tuple, TypeVar, Union
+
+import numpy as np
+
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+V = TypeVar("V")
+
+
+class EmbeddingCacheBackend(Protocol):
+    """Key/value store for serialized embeddings that survives restarts.
+
+    Methods may block; EmbeddingService calls them from a worker thread, so
+    implementations must be safe to use from threads other than their creator's.
+    """
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the stored payload for key, or None."""
+        ...
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        """Return the stored payload (or None) for each key, in order."""
+        ...
+
+    def put_many(self, items: Sequence[Tuple[str, bytes]]) -> None:
+        """Store several payloads, replacing existing keys."""
+        ...
+
+
+class SQLiteEmbeddingCache:
+    """SQLite-backed embedding cache in WAL mode.
+
+    Calls block on disk I/O; async callers should run them in a worker thread.
+    """
+
+    # Bump when the payload layout changes so old rows are never decoded with the new layout
+    TABLE_NAME = "embedding_cache_v1"
+
+    # Keys per SELECT ... IN (...), below SQLite's default bound-parameter limit
+    LOOKUP_CHUNK_SIZE = 500
+
+    def __init__(self, path: str):
+        self.path = path
+        # One connection shared by worker threads; the lock serializes its use
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")  # WAL keeps this crash-safe; a lost tail only costs a re-embed
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.TABLE_NAME} ("
+            "key TEXT PRIMARY KEY, payload BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT payload FROM {self.TABLE_NAME} WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), self.LOOKUP_CHUNK_SIZE):
+                chunk = keys[start:start + self.LOOKUP_CHUNK_SIZE]
+                placeholders = ", ".join("?" * len(chunk))
+                found.update(self._conn.execute(
+                    f"SELECT key, payload FROM {self.TABLE_NAME} WHERE key IN ({placeholders})", tuple(chunk)
+                ).fetchall())
+        return [found.get(key) for key in keys]
+
+    def put_many(self, items: Sequence[Tuple[str, bytes]]) -> None:
+        if not items:
+            return
+        now = time.time()
+        rows: List[Tuple[str, bytes, float]] = [(key, payload, now) for key, payload in items]
+        # One transaction per batch rather than one commit per row
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.TABLE_NAME} (key, payload, created_at) VALUES (?, ?, ?)",
+                rows
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.TABLE_NAME}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SemanticCache(Generic[V]):
+    """Cache keyed by embedding similarity, so paraphrased queries reuse an earlier result.
+
+    A hit requires both gates: cosine similarity to a stored query of at least
+    ``similarity_threshold``, and an identical ``scope`` (model, filters, limits),
+    so a close query is never answered with results computed for other parameters.
+    Vectors live in a fixed-capacity ring; the oldest entry is overwritten when full.
+    Not thread-safe; intended for use from a single event loop.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1024,
+        similarity_threshold: float = 0.97,
+        ttl_seconds: float = 300.0
+    ):
+        self.capacity = capacity
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self._vectors: Optional[np.ndarray] = None  # (capacity, D) unit rows, allocated on first set
+        self._entries: List[Optional[Tuple[Hashable, V, float]]] = [None] * capacity
+        self._next = 0
+
+    def get(self, vector: Union[List[float], np.ndarray], scope: Hashable) -> Optional[V]:
+        query = self._unit(vector)
+        if query is None or self._vectors is None or query.shape[0] != self._vectors.shape[1]:
+            return None
+
+        # Empty slots are zero rows and score 0, below any useful threshold
+        scores = self._vectors @ query
+        now = time.monotonic()
+        candidates = np.flatnonzero(scores >= self.similarity_threshold)
+        for slot in candidates[np.argsort(-scores[candidates])]:
+            entry = self._entries[slot]
+            if entry is not None and entry[0] == scope and entry[2] > now:
+                return entry[1]
+        return None
+
+    def set(self, vector: Union[List[float], np.ndarray], scope: Hashable, value: V) -> None:
+        unit = self._unit(vector)
+        if unit is None:
+            return
+        if self._vectors is None or self._vectors.shape[1] != unit.shape[0]:
+            # First use, or the embedding model changed dimensions: start over
+            self.clear()
+            self._vectors = np.zeros((self.capacity, unit.shape[0]), dtype=np.float32)
+
+        slot = self._next
+        self._vectors[slot] = unit
+        self._entries[slot] = (scope, value, time.monotonic() + self.ttl_seconds)
+        self._next = (slot + 1) % self.capacity
+
+    def clear(self) -> None:
+        self._vectors = None
+        self._entries = [None] * self.capacity
+        self._next = 0
+
+    @staticmethod
+    def _unit(vector: Union[List[float], np.ndarray]) -> Optional[np.ndarray]:
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else None
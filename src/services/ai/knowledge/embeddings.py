@@ -2,29 +2,61 @@
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
+import random
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+import numpy as np
 from pydantic import BaseModel, Field
 
+from src.core.cache import TTLCache
 from src.core.exceptions import AIServiceError
 from src.core.logging import get_logger
+from src.services.ai.fallback import MicroBatcher
+from src.services.ai.knowledge.embedding_cache import EmbeddingCacheBackend
 from src.services.ai.models import AIModel, ModelCapability
 from src.services.ai.orchestrator import AIOrchestrator, AIRequest, AIResponse
 
 logger = get_logger(__name__)
 
+# Embedding vectors as accepted by the similarity helpers
+Vector = Union[List[float], np.ndarray]
 
-@dataclass
+# Embedding cache bounds; embeddings are deterministic, so the TTL only ages out cold entries
+EMBEDDING_CACHE_MAX_ENTRIES = 100_000
+EMBEDDING_CACHE_MAX_BYTES = 256 * 1024 * 1024
+EMBEDDING_CACHE_TTL_SECONDS = 24 * 3600
+BATCH_CACHE_MAX_ENTRIES = 1000
+
+# generate_batch slices in flight at once, and the random stagger before each follow-on slice
+MAX_INFLIGHT_BATCHES = 5
+BATCH_DISPATCH_JITTER_SECONDS = 0.05
+
+# Batched embedding request limits (OpenAI: at most 2048 inputs and 300k tokens per request)
+MAX_INPUTS_PER_REQUEST = 2048
+MAX_TOKENS_PER_REQUEST = 300_000
+
+
+def _result_nbytes(result: EmbeddingResult) -> int:
+    """Approximate memory held by a cached result: its vector plus its text."""
+    return result.embedding.nbytes + len(result.text)
+
+
+@dataclass(eq=False)  # ndarray fields have no single-bool ==
 class EmbeddingResult:
     """Result of embedding generation."""
     text: str
-    embedding: List[float]
+    embedding: np.ndarray  # float32, 1-D; may be a row view into a batch matrix
     model_used: str
     token_usage: int
     metadata: Dict[str, Any]
+    
+    def to_list(self) -> List[float]:
+        """Embedding as plain floats, for JSON and vector store payloads."""
+        return self.embedding.tolist()
 
 
 @dataclass
@@ -43,12 +75,42 @@ class EmbeddingService:
     def __init__(
         self,
         orchestrator: AIOrchestrator,
-        default_model: str = "text-embedding-3-small"
+        default_model: str = "text-embedding-3-small",
+        batch_wait_ms: float = 2.0,
+        max_batch_size: int = 32,
+        cache_max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES,
+        cache_max_bytes: int = EMBEDDING_CACHE_MAX_BYTES,
+        cache_ttl_seconds: float = EMBEDDING_CACHE_TTL_SECONDS,
+        persistent_cache: Optional[EmbeddingCacheBackend] = None,
+        max_inflight_batches: int = MAX_INFLIGHT_BATCHES
     ):
         self.orchestrator = orchestrator
         self.default_model = default_model
-        self.embedding_cache: Dict[str, EmbeddingResult] = {}
-        self.batch_cache: Dict[str, EmbeddingBatch] = {}
+        # LRU bounded by entry count and vector bytes, so a long-lived service cannot grow without limit
+        self.embedding_cache: TTLCache[EmbeddingResult] = TTLCache(
+            maxsize=cache_max_entries,
+            ttl_seconds=cache_ttl_seconds,
+            max_bytes=cache_max_bytes,
+            sizeof=_result_nbytes,
+        )
+        self.batch_cache: TTLCache[EmbeddingBatch] = TTLCache(
+            maxsize=BATCH_CACHE_MAX_ENTRIES, ttl_seconds=cache_ttl_seconds
+        )
+        # Optional second tier (e.g. SQLiteEmbeddingCache) so warm entries survive restarts
+        self.persistent_cache = persistent_cache
+        # Bound on concurrent generate_batch slices; tune per provider rate limits
+        self.max_inflight_batches = max_inflight_batches
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._persistent_hits = 0
+        self._token_encoders: Dict[str, Any] = {}
+        # Concurrent single-text requests are coalesced into batched provider calls
+        self._batcher = MicroBatcher(self._embed_coalesced, window_ms=batch_wait_ms, max_batch=max_batch_size)
+        self._requests_in_flight = 0
+        # float32 (K, D) matrix and row norms for the last candidate list searched
+        self._candidate_items: Tuple[EmbeddingResult, ...] = ()
+        self._candidate_matrix: Optional[np.ndarray] = None
+        self._candidate_norms: Optional[np.ndarray] = None
     
     async def generate_embedding(
         self,
@@ -61,13 +123,37 @@ class EmbeddingService:
         
         # Check cache first
         cache_key = self._get_cache_key(text, model_name)
-        if cache_key in self.embedding_cache:
+        cached = await self._lookup(cache_key, text)
+        if cached is not None:
             logger.debug(f"Using cached embedding for text: {text[:50]}...")
-            return self.embedding_cache[cache_key]
+            return cached
         
-        # Prepare context
-        context = context or {}
+        # While another request is in flight, join its batching window rather than
+        # paying a round trip of our own; a lone request goes out immediately
+        if self._requests_in_flight and not context and self._supports_batch(model_name):
+            ai_model = self.orchestrator.model_registry.get_model(model_name)
+            try:
+                result = await self._batcher.submit(ai_model, text)
+            except Exception as e:
+                logger.error(f"Embedding generation failed: {str(e)}")
+                raise AIServiceError(f"Embedding generation failed: {str(e)}")
+            await self._remember([(cache_key, result)])
+            return result
         
+        self._requests_in_flight += 1
+        try:
+            return await self._generate_single(text, model_name, cache_key, context or {})
+        finally:
+            self._requests_in_flight -= 1
+    
+    async def _generate_single(
+        self,
+        text: str,
+        model_name: str,
+        cache_key: str,
+        context: Dict[str, Any]
+    ) -> EmbeddingResult:
+        """Embed one text with its own provider request."""
         # Create AI request
         request = AIRequest(
             capability=ModelCapability.EMBEDDINGS,
@@ -82,7 +168,7 @@ class EmbeddingService:
             
             # Extract embedding
             if isinstance(response.content, list):
-                embedding = response.content
+                embedding = np.asarray(response.content, dtype=np.float32)
             else:
                 raise AIServiceError("Invalid embedding response format")
             
@@ -100,7 +186,7 @@ class EmbeddingService:
             )
             
             # Cache the result
-            self.embedding_cache[cache_key] = result
+            await self._remember([(cache_key, result)])
             
             logger.debug(f"Generated embedding for text: {text[:50]}... (dimensions: {len(embedding)})")
             
@@ -115,9 +201,10 @@ class EmbeddingService:
         texts: List[str],
         model: Optional[str] = None,
         context: Optional[Dict[str, Any]] = None,
-        batch_size: int = 100
+        batch_size: int = MAX_INPUTS_PER_REQUEST,
+        max_tokens_per_request: int = MAX_TOKENS_PER_REQUEST
     ) -> EmbeddingBatch:
-        """Generate embeddings for multiple texts in batches."""
+        """Generate embeddings for multiple texts in batches packed by size and estimated tokens."""
         import time
         import uuid
         
@@ -129,28 +216,39 @@ class EmbeddingService:
         cached_results = []
         texts_to_process = []
         
-        for text in texts:
-            cache_key = self._get_cache_key(text, model_name)
-            if cache_key in self.embedding_cache:
-                cached_results.append(self.embedding_cache[cache_key])
+        keys = [self._get_cache_key(text, model_name) for text in texts]
+        for text, cached in zip(texts, await self._lookup_many(keys, texts)):
+            if cached is not None:
+                cached_results.append(cached)
             else:
                 texts_to_process.append(text)
         
         # Process texts in batches
         all_results = cached_results.copy()
+        slices = self._pack_batches(texts_to_process, model_name, batch_size, max_tokens_per_request)
         
         if texts_to_process:
-            for i in range(0, len(texts_to_process), batch_size):
-                batch_texts = texts_to_process[i:i + batch_size]
-                
-                # Process batch
-                batch_results = await self._process_batch(batch_texts, model_name, context)
-                all_results.extend(batch_results)
+            semaphore = asyncio.Semaphore(self.max_inflight_batches)
+            
+            async def run_slice(index: int, batch_texts: List[str]) -> List[EmbeddingResult]:
+                if index:
+                    # Stagger follow-on slices so they do not hit the provider in lockstep
+                    await asyncio.sleep(random.uniform(0, BATCH_DISPATCH_JITTER_SECONDS))
+                async with semaphore:
+                    batch_results = await self._process_batch(batch_texts, model_name, context)
                 
                 # Cache results
-                for result in batch_results:
-                    cache_key = self._get_cache_key(result.text, model_name)
-                    self.embedding_cache[cache_key] = result
+                await self._remember([
+                    (self._get_cache_key(result.text, model_name), result) for result in batch_results
+                ])
+                return batch_results
+            
+            # Slices overlap their network latency; gather keeps results in slice order
+            slice_results = await asyncio.gather(
+                *(run_slice(index, batch_texts) for index, (batch_texts, _) in enumerate(slices))
+            )
+            for batch_results in slice_results:
+                all_results.extend(batch_results)
         
         # Calculate statistics
         total_tokens = sum(result.token_usage for result in all_results)
@@ -168,11 +266,15 @@ class EmbeddingService:
                 "cached_count": len(cached_results),
                 "processed_count": len(texts_to_process),
                 "batch_size": batch_size,
+                "request_count": len(slices),
+                "avg_tokens_per_request": (
+                    sum(tokens for _, tokens in slices) / len(slices) if slices else 0.0
+                ),
             }
         )
         
         # Cache the batch
-        self.batch_cache[batch_id] = batch
+        self.batch_cache.set(batch_id, batch)
         
         logger.info(f"Generated {len(all_results)} embeddings in {processing_time:.2f}s (batch: {batch_id})")
         
@@ -185,10 +287,70 @@ class EmbeddingService:
         context: Optional[Dict[str, Any]]
     ) -> List[EmbeddingResult]:
         """Process a batch of texts for embedding generation."""
-        results = []
+        if not self._supports_batch(model):
+            return await self._process_batch_individually(texts, model, context)
         
-        # Process texts concurrently (with rate limiting)
-        import asyncio
+        try:
+            return await self._embed_batch(texts, model, context)
+        except Exception as e:
+            logger.error(f"Batch embedding generation failed for {len(texts)} texts: {str(e)}")
+            return [self._failed_result(text, model, e) for text in texts]
+    
+    async def _embed_coalesced(self, model: AIModel, texts: List[str]) -> List[EmbeddingResult]:
+        """MicroBatcher callback: one batched call for coalesced generate_embedding requests."""
+        return await self._embed_batch(texts, model.name, None)
+    
+    async def _embed_batch(
+        self,
+        texts: List[str],
+        model: str,
+        context: Optional[Dict[str, Any]]
+    ) -> List[EmbeddingResult]:
+        """Embed texts with a single provider call; raises on failure."""
+        # One provider call for the whole batch instead of one round trip per text
+        request = AIRequest(
+            capability=ModelCapability.EMBEDDINGS_BATCH,
+            input_data=texts,
+            model_preference=model,
+            context=context or {}
+        )
+        
+        response = await self.orchestrator.process_request(request)
+        if not isinstance(response.content, list) or len(response.content) != len(texts):
+            raise AIServiceError("Invalid batch embedding response format")
+        try:
+            # One contiguous (N, D) buffer; each result holds a row view into it
+            embeddings = np.asarray(response.content, dtype=np.float32)
+        except ValueError:
+            raise AIServiceError("Batch embedding response has inconsistent dimensions")
+        
+        # The provider reports usage for the whole call; spread it so per-result totals still add up
+        tokens_each, tokens_extra = divmod(response.token_usage.total_tokens, len(texts))
+        metadata = {
+            "processing_time": response.processing_time,
+            "fallback_used": response.fallback_used,
+            "confidence": response.confidence,
+            "batched": True,
+        }
+        
+        return [
+            EmbeddingResult(
+                text=text,
+                embedding=embedding,
+                model_used=response.model_used,
+                token_usage=tokens_each + (1 if i < tokens_extra else 0),
+                metadata=dict(metadata)
+            )
+            for i, (text, embedding) in enumerate(zip(texts, embeddings))
+        ]
+    
+    async def _process_batch_individually(
+        self,
+        texts: List[str],
+        model: str,
+        context: Optional[Dict[str, Any]]
+    ) -> List[EmbeddingResult]:
+        """Embed texts one request each, for models without batched embeddings."""
         semaphore = asyncio.Semaphore(10)  # Limit concurrent requests
         
         async def process_single(text: str) -> EmbeddingResult:
@@ -203,24 +365,149 @@ class EmbeddingService:
         for i, result in enumerate(results):
             if isinstance(result, Exception):
                 logger.error(f"Failed to generate embedding for text {i}: {str(result)}")
-                # Create fallback result
-                fallback_result = EmbeddingResult(
-                    text=texts[i],
-                    embedding=[0.0] * 1536,  # Default dimension
-                    model_used=model,
-                    token_usage=0,
-                    metadata={"error": str(result)}
-                )
-                valid_results.append(fallback_result)
+                valid_results.append(self._failed_result(texts[i], model, result))
             else:
                 valid_results.append(result)
         
         return valid_results
     
+    def _pack_batches(
+        self,
+        texts: List[str],
+        model: str,
+        max_inputs: int,
+        max_tokens: int
+    ) -> List[Tuple[List[str], int]]:
+        """Greedily pack texts, in order, into requests under the input and token limits.
+        
+        Returns (texts, estimated_tokens) per request. A text that alone exceeds
+        max_tokens still gets a request of its own; the provider reports that error.
+        """
+        batches: List[Tuple[List[str], int]] = []
+        current: List[str] = []
+        current_tokens = 0
+        
+        for text in texts:
+            tokens = self._estimate_tokens(text, model)
+            if current and (len(current) >= max_inputs or current_tokens + tokens > max_tokens):
+                batches.append((current, current_tokens))
+                current, current_tokens = [], 0
+            current.append(text)
+            current_tokens += tokens
+        
+        if current:
+            batches.append((current, current_tokens))
+        return batches
+    
+    def _estimate_tokens(self, text: str, model: str) -> int:
+        """Token count for text: exact with tiktoken when installed, otherwise a conservative estimate."""
+        encoder = self._token_encoders.get(model)
+        if encoder is None and model not in self._token_encoders:
+            try:
+                import tiktoken
+                try:
+                    encoder = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    encoder = tiktoken.get_encoding("cl100k_base")
+            except ImportError:
+                encoder = None
+            self._token_encoders[model] = encoder
+        
+        if encoder is not None:
+            return len(encoder.encode(text))
+        # Roughly 4 bytes per token for English; 3 overestimates so packed requests stay under limits
+        return len(text.encode()) // 3 + 1
+    
+    def _supports_batch(self, model: str) -> bool:
+        """Whether the model can embed many texts in one provider call."""
+        ai_model = self.orchestrator.model_registry.get_model(model)
+        return ai_model is not None and ModelCapability.EMBEDDINGS_BATCH in ai_model.capabilities
+    
+    def _failed_result(self, text: str, model: str, error: Exception) -> EmbeddingResult:
+        """Placeholder result for a text whose embedding could not be generated."""
+        return EmbeddingResult(
+            text=text,
+            embedding=np.zeros(self.get_embedding_dimensions(model), dtype=np.float32),
+            model_used=model,
+            token_usage=0,
+            metadata={"error": str(error)}
+        )
+    
+    async def _lookup(self, cache_key: str, text: str) -> Optional[EmbeddingResult]:
+        """Find a cached result in memory, then in the persistent tier."""
+        return (await self._lookup_many([cache_key], [text]))[0]
+    
+    async def _lookup_many(self, cache_keys: List[str], texts: List[str]) -> List[Optional[EmbeddingResult]]:
+        """Find cached results in memory, then misses in the persistent tier; counts hits and misses."""
+        results: List[Optional[EmbeddingResult]] = [self.embedding_cache.get(key) for key in cache_keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        
+        if missing and self.persistent_cache is not None:
+            # Blocking store I/O runs in a worker thread, one hop for all misses
+            try:
+                payloads = await asyncio.to_thread(
+                    self.persistent_cache.get_many, [cache_keys[i] for i in missing]
+                )
+            except Exception as e:
+                logger.warning(f"Persistent embedding cache read failed: {str(e)}")
+                payloads = [None] * len(missing)
+            for i, payload in zip(missing, payloads):
+                if payload is not None:
+                    results[i] = self._decode_result(texts[i], payload)
+                    self.embedding_cache.set(cache_keys[i], results[i])
+                    self._persistent_hits += 1
+        
+        misses = sum(1 for result in results if result is None)
+        self._cache_misses += misses
+        self._cache_hits += len(results) - misses
+        return results
+    
+    async def _remember(self, entries: List[Tuple[str, EmbeddingResult]]) -> None:
+        """Cache results in memory and write them through to the persistent tier."""
+        # Failure placeholders are never cached, so the next request for the text retries it
+        entries = [(cache_key, result) for cache_key, result in entries if "error" not in result.metadata]
+        for cache_key, result in entries:
+            if result.embedding.base is not None:
+                # A row view would pin its whole batch matrix while sized as one row; cache an owned copy
+                result.embedding = result.embedding.copy()
+            self.embedding_cache.set(cache_key, result)
+        
+        if self.persistent_cache is None or not entries:
+            return
+        payloads = [(cache_key, self._encode_result(result)) for cache_key, result in entries]
+        try:
+            await asyncio.to_thread(self.persistent_cache.put_many, payloads)
+        except Exception as e:
+            logger.warning(f"Persistent embedding cache write failed: {str(e)}")
+    
+    @staticmethod
+    def _encode_result(result: EmbeddingResult) -> bytes:
+        """Serialize a result as a one-line JSON header followed by the raw float32 vector."""
+        header = json.dumps({"model_used": result.model_used, "token_usage": result.token_usage})
+        return header.encode() + b"\n" + np.ascontiguousarray(result.embedding, dtype=np.float32).tobytes()
+    
+    @staticmethod
+    def _decode_result(text: str, payload: bytes) -> EmbeddingResult:
+        """Rebuild a result from _encode_result output; the vector is a read-only view of the payload."""
+        header, _, vector = payload.partition(b"\n")
+        fields = json.loads(header)
+        return EmbeddingResult(
+            text=text,
+            embedding=np.frombuffer(vector, dtype=np.float32),
+            model_used=fields["model_used"],
+            token_usage=fields["token_usage"],
+            metadata={"cache": "persistent"}
+        )
+    
     def _get_cache_key(self, text: str, model: str) -> str:
         """Generate cache key for text and model."""
-        content = f"{text}:{model}"
-        return hashlib.md5(content.encode()).hexdigest()
+        # Non-cryptographic use: BLAKE2b is faster than MD5 per byte, and feeding the
+        # parts separately avoids building an intermediate joined string
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(text.encode())
+        digest.update(b"\0")
+        digest.update(model.encode())
+        return digest.hexdigest()
     
     def get_embedding_dimensions(self, model: str) -> int:
         """Get embedding dimensions for a model."""
@@ -233,18 +520,17 @@ class EmbeddingService:
     
     def calculate_similarity(
         self,
-        embedding1: List[float],
-        embedding2: List[float],
+        embedding1: Vector,
+        embedding2: Vector,
         method: str = "cosine"
     ) -> float:
         """Calculate similarity between two embeddings."""
-        import numpy as np
-        
         if len(embedding1) != len(embedding2):
             raise ValueError("Embeddings must have the same dimension")
         
-        vec1 = np.array(embedding1)
-        vec2 = np.array(embedding2)
+        # No copy for ndarray inputs
+        vec1 = np.asarray(embedding1)
+        vec2 = np.asarray(embedding2)
         
         if method == "cosine":
             # Cosine similarity
@@ -271,34 +557,71 @@ class EmbeddingService:
     
     def find_similar_embeddings(
         self,
-        query_embedding: List[float],
+        query_embedding: Vector,
         candidate_embeddings: List[EmbeddingResult],
         top_k: int = 10,
         similarity_threshold: float = 0.7,
         method: str = "cosine"
     ) -> List[Dict[str, Any]]:
         """Find similar embeddings using various similarity methods."""
-        similarities = []
+        if not candidate_embeddings or top_k <= 0:
+            return []
         
-        for candidate in candidate_embeddings:
-            similarity = self.calculate_similarity(
-                query_embedding,
-                candidate.embedding,
-                method
-            )
-            
-            if similarity >= similarity_threshold:
-                similarities.append({
-                    "text": candidate.text,
-                    "similarity": similarity,
-                    "model_used": candidate.model_used,
-                    "metadata": candidate.metadata,
-                })
-        
-        # Sort by similarity (descending)
-        similarities.sort(key=lambda x: x["similarity"], reverse=True)
-        
-        return similarities[:top_k]
+        matrix, norms = self._get_candidate_matrix(candidate_embeddings)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.shape != (matrix.shape[1],):
+            raise ValueError("Embeddings must have the same dimension")
+        
+        # Score every candidate with one matrix-vector product instead of a per-candidate loop
+        if method == "cosine":
+            query_norm = np.linalg.norm(query)
+            if query_norm == 0:
+                scores = np.zeros(len(candidate_embeddings), dtype=np.float32)
+            else:
+                denom = norms * query_norm
+                scores = np.divide(matrix @ query, denom, out=np.zeros_like(denom), where=denom != 0)
+        elif method == "euclidean":
+            scores = 1.0 / (1.0 + np.linalg.norm(matrix - query, axis=1))
+        elif method == "dot_product":
+            scores = matrix @ query
+        else:
+            raise ValueError(f"Unsupported similarity method: {method}")
+        
+        matches = np.flatnonzero(scores >= similarity_threshold)
+        if len(matches) > top_k:
+            # Partial selection of the top_k, then sort only those
+            matches = matches[np.argpartition(-scores[matches], top_k - 1)[:top_k]]
+        matches = matches[np.argsort(-scores[matches], kind="stable")]
+        
+        return [
+            {
+                "text": candidate_embeddings[i].text,
+                "similarity": float(scores[i]),
+                "model_used": candidate_embeddings[i].model_used,
+                "metadata": candidate_embeddings[i].metadata,
+            }
+            for i in matches
+        ]
+    
+    def _get_candidate_matrix(
+        self,
+        candidate_embeddings: List[EmbeddingResult]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Stacked float32 candidate vectors and their norms, reused while the candidates are unchanged."""
+        cached = self._candidate_items
+        if (
+            self._candidate_matrix is None
+            or len(cached) != len(candidate_embeddings)
+            or any(a is not b for a, b in zip(cached, candidate_embeddings))
+        ):
+            try:
+                matrix = np.asarray([c.embedding for c in candidate_embeddings], dtype=np.float32)
+            except ValueError:
+                raise ValueError("Embeddings must have the same dimension")
+            self._candidate_items = tuple(candidate_embeddings)
+            self._candidate_matrix = matrix
+            self._candidate_norms = np.linalg.norm(matrix, axis=1)
+        return self._candidate_matrix, self._candidate_norms
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get embedding cache statistics."""
@@ -311,18 +634,28 @@ class EmbeddingService:
         # Calculate total batch tokens
         total_batch_tokens = sum(batch.total_tokens for batch in self.batch_cache.values())
         
+        lookups = self._cache_hits + self._cache_misses
+        
         return {
             "total_embeddings": total_embeddings,
             "total_batches": total_batches,
             "total_tokens": total_tokens,
             "total_batch_tokens": total_batch_tokens,
-            "cache_hit_rate": "N/A",  # Would need hit/miss tracking
+            "cache_bytes": self.embedding_cache.current_bytes,
+            "cache_hits": self._cache_hits,
+            "persistent_cache_hits": self._persistent_hits,
+            "cache_misses": self._cache_misses,
+            "cache_hit_rate": self._cache_hits / lookups if lookups else 0.0,
         }
     
     def clear_cache(self) -> None:
         """Clear embedding cache."""
+        # In-memory tiers only; the persistent tier is meant to outlive this process state
         self.embedding_cache.clear()
         self.batch_cache.clear()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._persistent_hits = 0
         logger.info("Embedding cache cleared")
     
     def get_cached_embedding(self, text: str, model: str) -> Optional[EmbeddingResult]:
@@ -341,8 +674,6 @@ class EmbeddingService:
         context: Optional[Dict[str, Any]] = None
     ) -> None:
         """Precompute embeddings for common texts (async operation)."""
-        import asyncio
-        
         async def precompute():
             try:
                 await self.generate_batch(texts, model, context)
@@ -353,7 +684,7 @@ class EmbeddingService:
         # Run in background
         asyncio.create_task(precompute())
     
-    def validate_embedding(self, embedding: List[float], model: str) -> bool:
+    def validate_embedding(self, embedding: Vector, model: str) -> bool:
         """Validate embedding format and dimensions."""
         expected_dim = self.get_embedding_dimensions(model)
         
@@ -361,23 +692,21 @@ class EmbeddingService:
             logger.warning(f"Embedding dimension mismatch: expected {expected_dim}, got {len(embedding)}")
             return False
         
-        if not all(isinstance(x, (int, float)) for x in embedding):
+        if np.asarray(embedding).dtype.kind not in "biuf":
             logger.warning("Embedding contains non-numeric values")
             return False
         
         return True
     
-    def normalize_embedding(self, embedding: List[float]) -> List[float]:
+    def normalize_embedding(self, embedding: Vector) -> np.ndarray:
         """Normalize embedding to unit vector."""
-        import numpy as np
-        
-        vec = np.array(embedding)
+        vec = np.asarray(embedding, dtype=np.float32)
         norm = np.linalg.norm(vec)
         
         if norm == 0:
-            return embedding
+            return vec
         
-        return (vec / norm).tolist()
+        return vec / norm
     
     def analyze_embedding_quality(
         self,
@@ -387,28 +716,25 @@ class EmbeddingService:
         if not embeddings:
             return {}
         
-        import numpy as np
-        
-        # Extract embedding vectors
-        vectors = [np.array(emb.embedding) for emb in embeddings]
+        # Extract embedding vectors as one (N, D) matrix
+        vectors = np.stack([np.asarray(emb.embedding, dtype=np.float32) for emb in embeddings])
         
         # Calculate statistics
-        dimensions = len(vectors[0]) if vectors else 0
+        dimensions = vectors.shape[1]
         total_tokens = sum(emb.token_usage for emb in embeddings)
         
-        # Calculate pairwise similarities
-        similarities = []
-        for i in range(len(vectors)):
-            for j in range(i + 1, len(vectors)):
-                sim = self.calculate_similarity(vectors[i].tolist(), vectors[j].tolist())
-                similarities.append(sim)
+        # Pairwise cosine similarities from a single matrix product; zero vectors score 0
+        norms = np.linalg.norm(vectors, axis=1)
+        denom = np.outer(norms, norms)
+        sim_matrix = np.divide(vectors @ vectors.T, denom, out=np.zeros_like(denom), where=denom != 0)
+        similarities = sim_matrix[np.triu_indices(len(vectors), k=1)]
         
         # Calculate quality metrics
-        avg_similarity = np.mean(similarities) if similarities else 0.0
-        std_similarity = np.std(similarities) if similarities else 0.0
+        avg_similarity = float(similarities.mean()) if similarities.size else 0.0
+        std_similarity = float(similarities.std()) if similarities.size else 0.0
         
         # Check for duplicate embeddings
-        unique_embeddings = len(set(tuple(emb.embedding) for emb in embeddings))
+        unique_embeddings = int(np.unique(vectors, axis=0).shape[0])
         duplicate_rate = 1.0 - (unique_embeddings / len(embeddings))
         
         return {
@@ -13,6 +13,7 @@ from pydantic import BaseModel, Field
 
 from src.core.exceptions import AIServiceError
 from src.core.logging import get_logger
+from src.services.ai.knowledge.embedding_cache import SemanticCache
 from src.services.ai.knowledge.embeddings import EmbeddingService, EmbeddingResult
 from src.services.ai.knowledge.vector_store import VectorStore, VectorSearchResult
 
@@ -59,13 +60,16 @@ class KnowledgeIndexer:
         embedding_service: EmbeddingService,
         vector_store: VectorStore,
         chunk_size: int = 1000,
-        chunk_overlap: int = 200
+        chunk_overlap: int = 200,
+        search_cache: Optional[SemanticCache[List[VectorSearchResult]]] = None
     ):
         self.embedding_service = embedding_service
         self.vector_store = vector_store
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.indexed_entries: Dict[str, KnowledgeEntry] = {}
+        # Optional: paraphrased queries with the same filters reuse earlier search results
+        self.search_cache = search_cache
     
     async def index_entry(
         self,
@@ -94,7 +98,7 @@ class KnowledgeIndexer:
                     }
                 )
                 
-                entry.embedding = embedding_result.embedding
+                entry.embedding = embedding_result.to_list()
                 entry.embedding_model = embedding_result.model_used
                 result.embedding_generated = True
                 
@@ -121,6 +125,7 @@ class KnowledgeIndexer:
                 
                 await self.vector_store.upsert([vector_data])
                 result.vector_stored = True
+                self._invalidate_search_cache()
                 
                 logger.debug(f"Stored vector for entry: {entry.id}")
             
@@ -258,7 +263,23 @@ class KnowledgeIndexer:
         try:
             # Generate embedding for query
             embedding_result = await self.embedding_service.generate_embedding(query)
-            query_embedding = embedding_result.embedding
+            
+            # Results are only reused for an identical model, filters and limits
+            scope = (
+                embedding_result.model_used,
+                top_k,
+                category_filter,
+                source_filter,
+                tuple(tags_filter) if tags_filter else None,
+                similarity_threshold,
+            )
+            if self.search_cache is not None:
+                cached = self.search_cache.get(embedding_result.embedding, scope)
+                if cached is not None:
+                    logger.debug(f"Reusing cached search results for query: {query[:50]}...")
+                    return list(cached)
+            
+            query_embedding = embedding_result.to_list()
             
             # Prepare filters
             filter_metadata = {}
@@ -282,6 +303,9 @@ class KnowledgeIndexer:
                 if result.score >= similarity_threshold
             ]
             
+            if self.search_cache is not None:
+                self.search_cache.set(embedding_result.embedding, scope, filtered_results)
+            
             logger.info(f"Found {len(filtered_results)} relevant knowledge entries")
             
             return filtered_results
@@ -333,6 +357,7 @@ class KnowledgeIndexer:
                 }
                 
                 await self.vector_store.upsert([vector_data])
+                self._invalidate_search_cache()
             
             logger.info(f"Updated entry: {entry_id}")
             return True
@@ -346,6 +371,7 @@ class KnowledgeIndexer:
         try:
             # Delete from vector store
             await self.vector_store.delete([entry_id])
+            self._invalidate_search_cache()
             
             # Remove from memory
             if entry_id in self.indexed_entries:
@@ -358,6 +384,11 @@ class KnowledgeIndexer:
             logger.error(f"Failed to delete entry {entry_id}: {str(e)}")
             return False
     
+    def _invalidate_search_cache(self) -> None:
+        """Drop cached search results once the indexed vectors change."""
+        if self.search_cache is not None:
+            self.search_cache.clear()
+    
     async def get_entry(self, entry_id: str) -> Optional[KnowledgeEntry]:
         """Get a knowledge entry by ID."""
         return self.indexed_entries.get(entry_id)
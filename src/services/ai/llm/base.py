@@ -94,6 +94,15 @@ class BaseLLMService(ABC):
         """Generate embeddings for text."""
         pass
     
+    async def generate_embeddings_batch(
+        self,
+        texts: List[str],
+        model: AIModel,
+        **kwargs
+    ) -> AIResponse:
+        """Generate embeddings for several texts in one request; content is one vector per text."""
+        raise NotImplementedError
+    
     async def classify_intent(
         self,
         text: str,
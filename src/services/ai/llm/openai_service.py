@@ -7,7 +7,7 @@ from typing import Any, Dict, List, Optional
 
 from src.core.exceptions import AIServiceError
 from src.core.logging import get_logger
-from src.services.ai.models import AIModel, ModelProvider
+from src.services.ai.models import AIModel, ModelCapability, ModelProvider
 from src.services.ai.llm.base import BaseLLMService, ChatMessage, GenerationConfig, AIResponse, TokenUsage
 
 logger = get_logger(__name__)
@@ -232,6 +232,66 @@ class OpenAIService(BaseLLMService):
             logger.error(f"OpenAI embeddings generation failed: {str(e)}")
             raise AIServiceError(f"OpenAI embeddings generation failed: {str(e)}")
     
+    async def generate_embeddings_batch(
+        self,
+        texts: List[str],
+        model: AIModel,
+        **kwargs
+    ) -> AIResponse:
+        """Generate embeddings for several texts with one OpenAI embeddings call."""
+        if model.provider != ModelProvider.OPENAI:
+            raise AIServiceError(f"Model {model.name} is not an OpenAI model")
+        
+        if ModelCapability.EMBEDDINGS_BATCH not in model.capabilities:
+            raise AIServiceError(f"Model {model.name} does not support batched embeddings")
+        
+        start_time = time.time()
+        
+        # The embeddings endpoint accepts an array input and returns one item per element
+        data = {
+            "model": model.name,
+            "input": texts,
+            "encoding_format": "float",
+        }
+        
+        try:
+            response_data = await self._make_request(
+                f"{self.base_url}/embeddings",
+                self.headers,
+                data,
+                timeout=model.timeout
+            )
+            
+            data_list = response_data.get("data", [])
+            if len(data_list) != len(texts):
+                raise AIServiceError(
+                    f"Expected {len(texts)} embeddings from OpenAI, got {len(data_list)}"
+                )
+            
+            # Items carry their input index; order by it rather than trusting response order
+            embeddings = [item.get("embedding", []) for item in sorted(data_list, key=lambda item: item.get("index", 0))]
+            
+            usage_data = response_data.get("usage", {})
+            token_usage = self._create_token_usage(
+                model,
+                usage_data.get("prompt_tokens", 0),
+                0  # No completion tokens for embeddings
+            )
+            
+            processing_time = time.time() - start_time
+            
+            return self._create_ai_response(
+                content=embeddings,
+                model=model,
+                token_usage=token_usage,
+                confidence=1.0,  # Embeddings are deterministic
+                processing_time=processing_time
+            )
+            
+        except Exception as e:
+            logger.error(f"OpenAI batch embeddings generation failed: {str(e)}")
+            raise AIServiceError(f"OpenAI batch embeddings generation failed: {str(e)}")
+    
     def _estimate_confidence(self, response_data: Dict[str, Any], content: str) -> float:
         """Estimate confidence based on response characteristics."""
         # OpenAI doesn't provide confidence scores, so we estimate based on:
@@ -29,6 +29,7 @@ class ModelCapability(str, Enum):
     """Model capabilities."""
     TEXT_GENERATION = "text_generation"
     EMBEDDINGS = "embeddings"
+    EMBEDDINGS_BATCH = "embeddings_batch"  # many texts embedded in one provider call
     INTENT_CLASSIFICATION = "intent_classification"
     ENTITY_EXTRACTION = "entity_extraction"
     SENTIMENT_ANALYSIS = "sentiment_analysis"
@@ -257,7 +258,7 @@ DEFAULT_MODELS = [
         name="text-embedding-3-large",
         provider=ModelProvider.OPENAI,
         model_type=ModelType.EMBEDDING,
-        capabilities=[ModelCapability.EMBEDDINGS],
+        capabilities=[ModelCapability.EMBEDDINGS, ModelCapability.EMBEDDINGS_BATCH],
         max_tokens=8191,
         cost_per_1k_tokens=0.00013,
         context_window=8191,
@@ -266,7 +267,7 @@ DEFAULT_MODELS = [
         name="text-embedding-3-small",
         provider=ModelProvider.OPENAI,
         model_type=ModelType.EMBEDDING,
-        capabilities=[ModelCapability.EMBEDDINGS],
+        capabilities=[ModelCapability.EMBEDDINGS, ModelCapability.EMBEDDINGS_BATCH],
         max_tokens=8191,
         cost_per_1k_tokens=0.00002,
         context_window=8191,
@@ -276,7 +277,7 @@ DEFAULT_MODELS = [
         name="text-embedding-ada-002",
         provider=ModelProvider.OPENAI,
         model_type=ModelType.EMBEDDING,
-        capabilities=[ModelCapability.EMBEDDINGS],
+        capabilities=[ModelCapability.EMBEDDINGS, ModelCapability.EMBEDDINGS_BATCH],
         max_tokens=8191,
         cost_per_1k_tokens=0.0001,
         context_window=8191,
@@ -30,7 +30,7 @@ class TokenUsage:
 class AIRequest:
     """AI service request with context and metadata."""
     capability: ModelCapability
-    input_data: Union[str, Dict[str, Any]]
+    input_data: Union[str, List[str], Dict[str, Any]]  # List[str] for EMBEDDINGS_BATCH
     model_preference: Optional[str] = None
     max_tokens: Optional[int] = None
     temperature: Optional[float] = None
@@ -74,6 +74,15 @@ class AIServiceProvider:
         """Generate embeddings for the given text."""
         raise NotImplementedError
     
+    async def generate_embeddings_batch(
+        self,
+        texts: List[str],
+        model: AIModel,
+        **kwargs
+    ) -> AIResponse:
+        """Generate embeddings for several texts in one call; content is one vector per text, in order."""
+        raise NotImplementedError
+    
     async def classify_intent(
         self,
         text: str,
@@ -227,6 +236,8 @@ class AIOrchestrator:
             return await provider.generate_text(input_text, model, **model_params)
         elif request.capability == ModelCapability.EMBEDDINGS:
             return await provider.generate_embeddings(input_text, model, **model_params)
+        elif request.capability == ModelCapability.EMBEDDINGS_BATCH:
+            return await provider.generate_embeddings_batch(request.input_data, model, **model_params)
         elif request.capability == ModelCapability.INTENT_CLASSIFICATION:
             return await provider.classify_intent(input_text, model, **model_params)
         elif request.capability == ModelCapability.ENTITY_EXTRACTION:
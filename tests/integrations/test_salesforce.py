@@ -4,8 +4,9 @@ Tests for Salesforce integration functionality.
 
 import pytest
 import asyncio
+import orjson
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 
 from src.integrations.salesforce import (
@@ -14,10 +15,15 @@ from src.integrations.salesforce import (
     SalesforceCase,
     SalesforceContact,
     SalesforceAccount,
+    SalesforceCaseStatus,
+    SalesforceCasePriority,
+    SalesforceCaseOrigin,
     SyncDirection,
     ConflictResolutionStrategy
 )
-from src.integrations.salesforce.sync import SalesforceSyncEngine
+from src.integrations.salesforce.models import SalesforceOmniChannelPresenceStatus
+from src.integrations.salesforce.service_cloud import ServiceCloudError
+from src.integrations.salesforce.sync import SalesforceSyncEngine, SyncError, _newest_stamp
 from src.integrations.base import RateLimitError, OAuth2Config
 
 
@@ -841,4 +847,1598 @@ class TestSalesforceErrorHandling:
         result = await sync_engine.sync_to_salesforce(mock_case)
         
         assert result.success is False
-        assert result.error == "Sync failed"
\ No newline at end of file
+        assert result.error == "Sync failed"
+
+class TestSalesforceEnumLookups:
+    """Test pre-resolved enum lookup tables."""
+    
+    def test_lookup_tables_cover_all_members(self):
+        """Every enum value resolves to the same member as Enum.__call__."""
+        from src.integrations.salesforce import models
+        
+        pairs = [
+            (models._CASE_STATUS_FROM_STR, models.SalesforceCaseStatus),
+            (models._CASE_PRIORITY_FROM_STR, models.SalesforceCasePriority),
+            (models._CASE_ORIGIN_FROM_STR, models.SalesforceCaseOrigin),
+            (models._CASE_TYPE_FROM_STR, models.SalesforceCaseType),
+            (models._CASE_REASON_FROM_STR, models.SalesforceCaseReason),
+            (models._OMNI_STATUS_FROM_STR, models.SalesforceOmniChannelStatus),
+            (models._OMNI_PRESENCE_STATUS_FROM_STR, models.SalesforceOmniChannelPresenceStatus),
+            (models._KB_STATUS_FROM_STR, models.SalesforceKnowledgeArticleStatus),
+            (models._LIVE_AGENT_STATUS_FROM_STR, models.SalesforceLiveAgentStatus),
+        ]
+        
+        for lookup, enum_cls in pairs:
+            assert len(lookup) == len(enum_cls)
+            for member in enum_cls:
+                assert lookup[member.value] is enum_cls(member.value)
+    
+    @pytest.mark.asyncio
+    async def test_get_case_uses_lookup(self):
+        """get_case maps raw Salesforce strings onto enum members."""
+        client = Mock()
+        client.config = Mock(case_cache_ttl_seconds=300, case_cache_max_entries=16)
+        client.get_object = AsyncMock(return_value={
+            "Id": "500xx000000001AAA",
+            "CaseNumber": "00001001",
+            "Subject": "Login issue",
+            "Description": "Cannot log in",
+            "Status": "Working",
+            "Priority": "High",
+            "Origin": "Email",
+            "CreatedDate": "2024-01-01T10:00:00.000Z",
+            "LastModifiedDate": "2024-01-02T10:00:00.000Z",
+        })
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(client, uuid4())
+        
+        case = await service_cloud.get_case("500xx000000001AAA")
+        
+        assert case.status is SalesforceCaseStatus.WORKING
+        assert case.priority is SalesforceCasePriority.HIGH
+        assert case.origin is SalesforceCaseOrigin.EMAIL
+
+
+class TestSalesforceFieldMappingTransformations:
+    """Test precompiled field mapping transformation rules."""
+    
+    def test_rule_compiled_at_creation(self):
+        """Transformation rules are compiled once and applied per value."""
+        from src.integrations.salesforce.models import SalesforceFieldMapping
+        
+        mapping = SalesforceFieldMapping(
+            local_field="subject",
+            salesforce_field="Subject",
+            field_type="string",
+            transformation_rule="strip|truncate:10"
+        )
+        
+        assert mapping.apply_transformation("  Hello world, long subject ") == "Hello worl"
+    
+    def test_mapping_without_rule_is_identity(self):
+        """Mappings without a rule pass values through unchanged."""
+        from src.integrations.salesforce.models import SalesforceFieldMapping
+        
+        mapping = SalesforceFieldMapping(local_field="email", salesforce_field="Email", field_type="email")
+        
+        assert mapping.apply_transformation("a@example.com") == "a@example.com"
+    
+    @pytest.mark.parametrize("rule,value,expected", [
+        ("upper", "high", "HIGH"),
+        ("lower|strip", "  MiXeD ", "mixed"),
+        ("title", "jane doe", "Jane Doe"),
+        ('map:{"P1": "High", "P3": "Low|Minor"}', "P1", "High"),
+        ('map:{"P1": "High", "P3": "Low|Minor"}|upper', "P3", "LOW|MINOR"),
+        ('map:{"P1": "High"}', "P2", "P2"),
+        ("default:Email", None, "Email"),
+        ("default:Email", "Web", "Web"),
+        ("truncate:3", 12345, 12345),
+    ])
+    def test_named_transforms(self, rule, value, expected):
+        """Named transforms apply left to right; non-string values pass through string transforms."""
+        from src.integrations.salesforce.models import compile_transformation_rule
+        
+        assert compile_transformation_rule(rule)(value) == expected
+    
+    @pytest.mark.parametrize("rule", [
+        "__import__('os')",
+        "v.__class__",
+        "open('/etc/passwd')",
+        "v), (1",
+        "v.strip()",
+        "'{0.__class__.__mro__[1].__subclasses__}'.format(v)",
+        "v.format_map({})",
+        "strip|__subclasses__",
+        "truncate:abc",
+        "truncate:-1",
+        "truncate",
+        "upper:1",
+        "map:[1, 2]",
+        "map:{not json}",
+    ])
+    def test_unsafe_or_unknown_rules_rejected(self, rule):
+        """Anything other than a pipeline of known named transforms is rejected."""
+        from src.integrations.salesforce.models import SalesforceFieldMapping
+        
+        with pytest.raises(ValueError):
+            SalesforceFieldMapping(
+                local_field="subject",
+                salesforce_field="Subject",
+                field_type="string",
+                transformation_rule=rule
+            )
+    
+    def test_format_strings_are_never_evaluated(self):
+        """Format-string payloads in map tables are plain data, not code."""
+        from src.integrations.salesforce.models import compile_transformation_rule
+        
+        transform = compile_transformation_rule('map:{"x": "{0.__class__.__mro__}"}')
+        
+        assert transform("x") == "{0.__class__.__mro__}"
+        assert transform("{0.__class__}") == "{0.__class__}"
+
+
+class TestServiceCloudBulkCaseCreation:
+    """Test batched Case creation via sObject Collections."""
+    
+    @pytest.fixture
+    def service_cloud(self):
+        client = Mock()
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            return SalesforceServiceCloud(client, uuid4())
+    
+    def _make_cases(self, org_id, count):
+        return [
+            SalesforceCase(organization_id=org_id, subject=f"Case {i}", description="Bulk ingest")
+            for i in range(count)
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_cases_chunked_into_collections(self, service_cloud):
+        """Cases are posted in chunks of at most 200 records."""
+        async def create_collection(object_type, records, all_or_none=False):
+            return [{"id": f"500{i:015d}", "success": True, "errors": []} for i in range(len(records))]
+        
+        service_cloud.client.create_objects_collection = AsyncMock(side_effect=create_collection)
+        cases = self._make_cases(service_cloud.organization_id, 450)
+        
+        created = await service_cloud.create_cases_bulk(cases)
+        
+        assert len(created) == 450
+        chunk_sizes = [len(c.args[1]) for c in service_cloud.client.create_objects_collection.call_args_list]
+        assert chunk_sizes == [200, 200, 50]
+        assert all(case.id for case in created)
+    
+    @pytest.mark.asyncio
+    async def test_per_record_errors_collected(self, service_cloud):
+        """Failed records are reported without discarding the successful ones."""
+        from src.integrations.salesforce.service_cloud import ServiceCloudBulkError
+        
+        service_cloud.client.create_objects_collection = AsyncMock(return_value=[
+            {"id": "500000000000000001", "success": True, "errors": []},
+            {"success": False, "errors": [{"statusCode": "REQUIRED_FIELD_MISSING"}]},
+        ])
+        cases = self._make_cases(service_cloud.organization_id, 2)
+        
+        with pytest.raises(ServiceCloudBulkError) as exc_info:
+            await service_cloud.create_cases_bulk(cases)
+        
+        assert [c.id for c in exc_info.value.created] == ["500000000000000001"]
+        assert exc_info.value.errors[0]["index"] == 1
+
+
+class TestServiceCloudHealthCheck:
+    """Test Service Cloud health probes."""
+    
+    @pytest.mark.asyncio
+    async def test_probe_failures_are_isolated(self):
+        """A failing probe only clears its own flag."""
+        client = Mock()
+        client.config = Mock(enable_omni_channel=True, enable_bulk_api=True, enable_platform_events=True)
+        
+        async def query(soql):
+            if "KnowledgeArticleVersion" in soql:
+                raise Exception("Knowledge not enabled")
+            return {"records": []}
+        
+        client.query = AsyncMock(side_effect=query)
+        client.get_api_usage = AsyncMock(return_value={"used": 100, "limit": 1000})
+        
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(client, uuid4())
+        
+        health = await service_cloud.health_check()
+        
+        assert health["service_cloud_available"] is True
+        assert health["knowledge_enabled"] is False
+        assert health["live_agent_enabled"] is True
+        assert health["governor_limits_healthy"] is True
+        assert health["status"] == "healthy"
+        assert client.query.await_count == 3
+
+
+class TestServiceCloudCrossCloudOrchestration:
+    """Test cross-cloud orchestration fan-out."""
+    
+    @pytest.mark.asyncio
+    async def test_clouds_dispatched_concurrently(self):
+        """Known clouds run together and unknown clouds are skipped."""
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(Mock(), uuid4())
+        
+        async def slow_marketing(self, case_id, data):
+            await asyncio.sleep(0.2)
+            return {"cloud": "Marketing"}
+        
+        async def slow_commerce(self, case_id, data):
+            await asyncio.sleep(0.2)
+            return {"cloud": "Commerce"}
+        
+        start = asyncio.get_running_loop().time()
+        with patch.object(SalesforceServiceCloud, "_orchestrate_marketing_cloud", slow_marketing), \
+                patch.object(SalesforceServiceCloud, "_orchestrate_commerce_cloud", slow_commerce):
+            result = await service_cloud.orchestrate_cross_cloud("500xx", ["Marketing", "Commerce", "Unknown"], {})
+        elapsed = asyncio.get_running_loop().time() - start
+        
+        assert set(result["orchestration_results"]) == {"marketing", "commerce"}
+        assert elapsed < 0.35
+
+
+class TestServiceCloudKnowledgeCache:
+    """Test knowledge article caching."""
+    
+    @pytest.fixture
+    def service_cloud(self):
+        client = Mock()
+        client.config = Mock(
+            knowledge_article_cache_ttl_seconds=900,
+            knowledge_search_cache_ttl_seconds=300,
+            knowledge_cache_max_entries=16
+        )
+        client.query = AsyncMock(return_value={"records": [{
+            "Id": "ka0xx0000000001AAA",
+            "Title": "Reset your password",
+            "Summary": "Steps to reset a password",
+            "UrlName": "reset-password",
+            "ArticleType": "FAQ__kav",
+            "LastPublishedDate": "2024-01-01T10:00:00.000Z",
+            "Language": "en-US",
+            "ArticleNumber": "000001001",
+        }]})
+        client.search = AsyncMock(return_value={"searchRecords": client.query.return_value["records"]})
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            return SalesforceServiceCloud(client, uuid4())
+    
+    @pytest.mark.asyncio
+    async def test_article_lookup_cached_until_invalidated(self, service_cloud):
+        """Repeat lookups are served from cache until the article is invalidated."""
+        first = await service_cloud.get_knowledge_article("ka0xx0000000001AAA")
+        second = await service_cloud.get_knowledge_article("ka0xx0000000001AAA")
+        
+        assert first is second
+        assert service_cloud.client.query.await_count == 1
+        
+        service_cloud.invalidate_article("ka0xx0000000001AAA")
+        await service_cloud.get_knowledge_article("ka0xx0000000001AAA")
+        
+        assert service_cloud.client.query.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_search_cached_per_query(self, service_cloud):
+        """Searches are cached by query, language and limit."""
+        await service_cloud.search_knowledge_articles("password")
+        await service_cloud.search_knowledge_articles("password")
+        await service_cloud.search_knowledge_articles("password", limit=5)
+        
+        assert service_cloud.client.search.await_count == 2
+
+
+class TestServiceCloudCaseSearch:
+    """Test case search query construction."""
+    
+    @pytest.fixture
+    def service_cloud(self):
+        client = Mock()
+        client.search = AsyncMock(return_value={"searchRecords": []})
+        client.query = AsyncMock(return_value={"records": []})
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            return SalesforceServiceCloud(client, uuid4())
+    
+    @pytest.mark.asyncio
+    async def test_free_text_uses_sosl(self, service_cloud):
+        """Free-text queries are sent as escaped SOSL with SOQL-escaped filters."""
+        await service_cloud.search_cases(
+            "can't login {now}",
+            status=SalesforceCaseStatus.NEW,
+            contact_id="003' OR Id != '",
+            limit=10
+        )
+        
+        sosl = service_cloud.client.search.call_args.args[0]
+        assert sosl.startswith("FIND {can\\'t login \\{now\\}} IN ALL FIELDS RETURNING Case(")
+        assert "Status = 'New'" in sosl
+        assert "ContactId = '003\\' OR Id != \\''" in sosl
+        assert "LIMIT 10" in sosl
+        service_cloud.client.query.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_filter_only_search_uses_soql(self, service_cloud):
+        """Searches without free text stay on SOQL."""
+        await service_cloud.search_cases("", priority=SalesforceCasePriority.HIGH)
+        
+        soql = service_cloud.client.query.call_args.args[0]
+        assert "Priority = 'High'" in soql
+        assert "LIKE" not in soql
+        service_cloud.client.search.assert_not_called()
+
+
+class TestServiceCloudCaseStreaming:
+    """Test paged case streaming."""
+    
+    @staticmethod
+    def _record(i):
+        return {
+            "Id": f"500xx{i:013d}",
+            "Subject": f"Case {i}",
+            "Description": "",
+            "CreatedDate": "2024-01-01T10:00:00.000Z",
+            "LastModifiedDate": "2024-01-01T10:00:00.000Z",
+        }
+    
+    @pytest.mark.asyncio
+    async def test_iter_cases_follows_next_records_url(self):
+        """Pages are fetched lazily through queryMore."""
+        client = Mock()
+        client.query = AsyncMock(return_value={
+            "done": False,
+            "nextRecordsUrl": "/services/data/v58.0/query/01gxx-2",
+            "records": [self._record(0), self._record(1)],
+        })
+        client.query_more = AsyncMock(return_value={"done": True, "records": [self._record(2)]})
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(client, uuid4())
+        
+        stream = service_cloud.iter_cases(status=SalesforceCaseStatus.NEW)
+        first = await stream.__anext__()
+        
+        assert first.subject == "Case 0"
+        client.query_more.assert_not_called()
+        
+        remaining = [case async for case in stream]
+        
+        assert [c.subject for c in remaining] == ["Case 1", "Case 2"]
+        client.query_more.assert_awaited_once_with("/services/data/v58.0/query/01gxx-2")
+    
+    @pytest.mark.asyncio
+    async def test_rows_by_default_models_on_request(self):
+        """Streaming yields slotted rows unless hydration is requested."""
+        from src.integrations.salesforce import SalesforceCaseRow
+        
+        client = Mock()
+        client.query = AsyncMock(return_value={"done": True, "records": [self._record(0)]})
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(client, uuid4())
+        
+        rows = [case async for case in service_cloud.iter_cases(status=SalesforceCaseStatus.NEW)]
+        cases = await service_cloud.search_cases("", status=SalesforceCaseStatus.NEW)
+        
+        assert type(rows[0]) is SalesforceCaseRow
+        assert rows[0].status is SalesforceCaseStatus.NEW
+        assert not hasattr(rows[0], "__dict__")
+        assert isinstance(cases[0], SalesforceCase)
+        assert cases[0].id == rows[0].id
+
+
+class TestServiceCloudAgentWorkAssignments:
+    """Test coalesced AgentWork lookups."""
+    
+    @pytest.mark.asyncio
+    async def test_assignments_grouped_by_user(self):
+        """One IN query serves several agents and results are grouped per agent."""
+        client = Mock()
+        client.query = AsyncMock(return_value={"done": True, "records": [
+            {"Id": "0Bz1", "UserId": "005A", "CaseId": "500A", "Status": "Assigned",
+             "CapacityWeight": 1, "CreatedDate": "2024-01-01T10:00:00.000Z"},
+            {"Id": "0Bz2", "UserId": "005B", "CaseId": "500B", "Status": "Opened",
+             "CapacityWeight": 2, "CreatedDate": "2024-01-01T11:00:00.000Z"},
+        ]})
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(client, uuid4())
+        
+        result = await service_cloud.get_agent_work_assignments_many(["005A", "005B", "005C"])
+        
+        assert client.query.await_count == 1
+        assert "UserId IN ('005A', '005B', '005C')" in client.query.call_args.args[0]
+        assert [a["case_id"] for a in result["005A"]] == ["500A"]
+        assert [a["case_id"] for a in result["005B"]] == ["500B"]
+        assert result["005C"] == []
+
+
+class TestSalesforceClientConnectionReuse:
+    """Test shared SSL context and integration lifecycle."""
+    
+    def test_ssl_context_shared_between_clients(self):
+        """Identical security settings reuse one SSL context."""
+        from src.integrations.salesforce.client import _build_ssl_context
+        
+        first = _build_ssl_context("1.3", None, None, ())
+        second = _build_ssl_context("1.3", None, None, ())
+        
+        assert first is second
+    
+    @pytest.mark.asyncio
+    async def test_integration_context_manager_closes_client(self):
+        """Leaving the async context closes the underlying client."""
+        client = Mock()
+        client.close = AsyncMock()
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            async with SalesforceServiceCloud(client, uuid4()) as service_cloud:
+                assert service_cloud.client is client
+        
+        client.close.assert_awaited_once()
+
+
+class TestSalesforceClientHTTPBackend:
+    """Test selectable HTTP transport backends."""
+    
+    @staticmethod
+    def _config(**overrides):
+        from src.integrations.config import SalesforceIntegrationConfig, OAuth2ClientConfig
+        
+        return SalesforceIntegrationConfig(
+            organization_id="org-1",
+            instance_url="https://test.my.salesforce.com",
+            oauth=OAuth2ClientConfig(
+                client_id="test_client",
+                client_secret="test_secret",
+                authorization_url="https://login.salesforce.com/services/oauth2/authorize",
+                token_url="https://login.salesforce.com/services/oauth2/token",
+                redirect_uri="https://app.example.com/callback"
+            ),
+            **overrides
+        )
+    
+    @pytest.mark.asyncio
+    async def test_httpx_is_default(self):
+        """Without configuration the default httpx transport is used."""
+        with patch("src.integrations.salesforce.client.get_settings"):
+            client = SalesforceClient(self._config())
+        
+        assert type(client.http_client._transport).__name__ == "AsyncHTTPTransport"
+        await client.http_client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_aiohttp_backend_selectable(self):
+        """The aiohttp transport is used when configured."""
+        pytest.importorskip("httpx_aiohttp")
+        from src.integrations.config import HTTPBackend
+        
+        with patch("src.integrations.salesforce.client.get_settings"):
+            client = SalesforceClient(self._config(http_backend=HTTPBackend.AIOHTTP))
+        
+        assert type(client.http_client._transport).__name__ == "AiohttpTransport"
+        await client.http_client.aclose()
+
+
+class TestSalesforceEnumSerialization:
+    """Test the outbound enum -> str table."""
+    
+    def test_enum_str_matches_values(self):
+        """Every outbound enum member maps to its plain string value."""
+        from src.integrations.salesforce.models import _ENUM_STR
+        
+        for member, value in _ENUM_STR.items():
+            assert value == member.value
+            assert type(value) is str
+        assert _ENUM_STR[SalesforceCasePriority.HIGH] == "High"
+
+
+class TestSalesforceTimestampParsing:
+    """Test the memoized Salesforce timestamp parser."""
+    
+    def test_parses_zulu_and_offset_forms(self):
+        """Both ``Z`` and ``+0000`` suffixes parse to the same UTC instant."""
+        from src.integrations.salesforce.models import _parse_sf_ts
+        
+        zulu = _parse_sf_ts("2024-01-15T10:30:00.000Z")
+        offset = _parse_sf_ts("2024-01-15T10:30:00.000+0000")
+        assert zulu == offset
+        assert zulu.utcoffset() == timedelta(0)
+    
+    def test_repeated_timestamps_hit_cache(self):
+        """Identical timestamps return the cached datetime instance."""
+        from src.integrations.salesforce.models import _parse_sf_ts
+        
+        first = _parse_sf_ts("2024-02-01T08:00:00.000Z")
+        assert _parse_sf_ts("2024-02-01T08:00:00.000Z") is first
+
+
+class TestServiceCloudPresenceBatching:
+    """Test background coalescing of agent presence updates."""
+    
+    @pytest.mark.asyncio
+    async def test_updates_coalesce_into_one_request(self):
+        """Several updates inside the window become one PATCH with the latest values."""
+        client = Mock()
+        client.config = Mock(presence_flush_ms=10, presence_ttl_seconds=60, max_tracked_agents=100)
+        client.update_objects_collection = AsyncMock(return_value=[
+            {"id": "0Bz1", "success": True}, {"id": "0Bz2", "success": True}
+        ])
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(client, uuid4())
+        service_cloud._presence_workid.update({"005A": "0Bz1", "005B": "0Bz2"})
+        service_cloud._presence_status.update({"005A": "Available", "005B": "Available"})
+        service_cloud._presence_capacity.update({"005A": 5, "005B": 5})
+        
+        await service_cloud.update_agent_presence("005A", SalesforceOmniChannelPresenceStatus.BUSY, 3)
+        await service_cloud.update_agent_presence("005B", SalesforceOmniChannelPresenceStatus.BUSY)
+        result = await service_cloud.update_agent_presence("005A", SalesforceOmniChannelPresenceStatus.AWAY)
+        
+        assert result["status"] == "Away"
+        assert result["capacity"] == 3
+        client.update_objects_collection.assert_not_awaited()
+        
+        await asyncio.sleep(0.05)
+        
+        client.update_objects_collection.assert_awaited_once()
+        object_type, records = client.update_objects_collection.call_args.args
+        assert object_type == "AgentWork"
+        assert records == [
+            {"id": "0Bz1", "Status": "Away", "Capacity": 3},
+            {"id": "0Bz2", "Status": "Busy"},
+        ]
+        service_cloud._presence_update_task.cancel()
+    
+    @pytest.mark.asyncio
+    async def test_failed_flush_requeues_under_newer_update(self):
+        """A failed batch is retried without overwriting a newer queued change."""
+        client = Mock()
+        client.update_objects_collection = AsyncMock(side_effect=Exception("timeout"))
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(client, uuid4())
+        service_cloud._pending_presence = {"005A": {"id": "0Bz1", "Status": "Busy", "Capacity": 2}}
+        
+        async def newer_update(*args, **kwargs):
+            service_cloud._pending_presence["005A"] = {"id": "0Bz1", "Status": "Away"}
+            raise Exception("timeout")
+        
+        client.update_objects_collection.side_effect = newer_update
+        await service_cloud.flush_presence()
+        
+        assert service_cloud._pending_presence["005A"] == {"id": "0Bz1", "Status": "Away", "Capacity": 2}
+    
+    def test_presence_state_has_no_instance_dict(self):
+        """The integration is slotted and keeps presence in per-field dicts."""
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(Mock(), uuid4())
+        
+        assert not hasattr(service_cloud, "__dict__")
+        with pytest.raises(AttributeError):
+            service_cloud._agent_presence = {}
+    
+    @pytest.mark.asyncio
+    async def test_stale_and_overflow_agents_marked_offline(self):
+        """Idle agents and the oldest agents beyond the cap are set Offline and forgotten."""
+        client = Mock()
+        client.config = Mock(presence_ttl_seconds=60, max_tracked_agents=2)
+        client.update_objects_collection = AsyncMock(return_value=[])
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(client, uuid4())
+        
+        now = datetime.utcnow()
+        for user_id, age in [("005A", 300), ("005B", 30), ("005C", 20), ("005D", 10)]:
+            service_cloud._presence_workid[user_id] = f"0Bz{user_id[-1]}"
+            service_cloud._presence_status[user_id] = "Available"
+            service_cloud._presence_capacity[user_id] = 5
+            service_cloud._presence_ts[user_id] = now - timedelta(seconds=age)
+        
+        dropped = await service_cloud._unregister_stale_agents()
+        
+        assert dropped == 2
+        assert list(service_cloud._presence_ts) == ["005C", "005D"]
+        assert set(service_cloud._presence_workid) == {"005C", "005D"}
+        client.update_objects_collection.assert_awaited_once_with(
+            "AgentWork", [{"id": "0BzA", "Status": "Offline"}, {"id": "0BzB", "Status": "Offline"}]
+        )
+
+
+class TestServiceCloudLiveAgentWatch:
+    """Test streaming Live Agent status changes."""
+    
+    @pytest.mark.asyncio
+    async def test_yields_changes_until_ended(self):
+        """Current status comes first, then pushed changes for this session only."""
+        async def events(channel):
+            for transcript_id, status in [
+                ("570B", "Ended"),
+                ("570A", "Waiting"),
+                ("570A", "Chatting"),
+                ("570A", "Ended"),
+                ("570A", "Chatting"),
+            ]:
+                yield {"data": {"payload": {"TranscriptId__c": transcript_id, "Status__c": status}}}
+        
+        client = Mock()
+        client.config.enable_platform_events = True
+        client.get_object = AsyncMock(return_value={"Status": "Waiting"})
+        client.subscribe_platform_events = Mock(side_effect=events)
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(client, uuid4())
+        
+        statuses = [s async for s in service_cloud.watch_live_agent_status("570A")]
+        
+        assert [s.value for s in statuses] == ["Waiting", "Chatting", "Ended"]
+        client.get_object.assert_awaited_once()
+
+
+class TestServiceCloudCaseExport:
+    """Test Bulk API 2.0 case exports."""
+    
+    @staticmethod
+    def _page(*case_ids):
+        header = "Id,CaseNumber,Subject,Description,Status,Priority,Origin,ContactId,AccountId,CreatedDate,LastModifiedDate\n"
+        rows = "".join(
+            f"{case_id},0001,Subject {case_id},,New,High,Web,,,2024-01-01T10:00:00.000Z,2024-01-01T10:00:00.000Z\n"
+            for case_id in case_ids
+        )
+        return header + rows
+    
+    def _client(self, pages):
+        in_flight = {"now": 0, "max": 0}
+        
+        async def fetch_page(link):
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(0.01 if link != "p0" else 0.03)
+            in_flight["now"] -= 1
+            return pages[link]
+        
+        client = Mock()
+        client.config.enable_bulk_api = True
+        client.create_query_job = AsyncMock(return_value="750xx")
+        client.get_query_job_status = AsyncMock(side_effect=[{"state": "InProgress"}, {"state": "JobComplete"}])
+        client.get_query_result_pages = AsyncMock(return_value=list(pages))
+        client.get_query_result_page = AsyncMock(side_effect=fetch_page)
+        return client, in_flight
+    
+    @pytest.mark.asyncio
+    async def test_pages_fetched_concurrently_and_yielded_in_order(self):
+        """Result pages download in parallel up to the limit but keep their order."""
+        pages = {f"p{i}": self._page(f"500{i}a", f"500{i}b") for i in range(5)}
+        client, in_flight = self._client(pages)
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(client, uuid4())
+        
+        cases = [c async for c in service_cloud.export_cases("SELECT ...", max_concurrency=3, poll_interval=0)]
+        
+        assert [c.id for c in cases] == [f"500{i}{s}" for i in range(5) for s in "ab"]
+        assert cases[0].contact_id is None
+        assert in_flight["max"] == 3
+    
+    @pytest.mark.asyncio
+    async def test_closing_early_settles_pending_downloads(self):
+        """Abandoning the export cancels and awaits the page downloads still in flight."""
+        pages = {f"p{i}": self._page(f"500{i}") for i in range(5)}
+        client, _ = self._client(pages)
+        
+        async def fetch_page(link):
+            await asyncio.sleep(0 if link == "p0" else 10)
+            return pages[link]
+        
+        client.get_query_result_page = fetch_page
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(client, uuid4())
+        
+        export = service_cloud.export_cases("SELECT ...", max_concurrency=3, poll_interval=0)
+        assert (await export.__anext__()).id == "5000"
+        await export.aclose()
+        
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+    
+    @pytest.mark.asyncio
+    async def test_large_search_routes_through_bulk_export(self):
+        """Filter-only searches above the threshold use a bulk query job."""
+        client, _ = self._client({"p0": self._page("500a")})
+        client.get_query_job_status = AsyncMock(return_value={"state": "JobComplete"})
+        client.query = AsyncMock()
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(client, uuid4())
+        
+        cases = await service_cloud.search_cases("", status=SalesforceCaseStatus.NEW, limit=50_000)
+        
+        assert [c.id for c in cases] == ["500a"]
+        client.query.assert_not_called()
+        assert "LIMIT 50000" in client.create_query_job.call_args.args[0]
+
+
+class TestServiceCloudQueryTemplates:
+    """Test the prebuilt SOQL templates."""
+    
+    @pytest.mark.asyncio
+    async def test_knowledge_search_fills_escaped_fragments(self):
+        """Only the variable fragments change and user input is escaped."""
+        client = Mock()
+        client.config = Mock(knowledge_search_cache_ttl_seconds=300, knowledge_cache_max_entries=16)
+        client.query = AsyncMock(return_value={"records": []})
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(client, uuid4())
+        
+        await service_cloud.search_knowledge_articles("%", language="fr'", limit=5)
+        
+        soql = client.query.call_args.args[0]
+        assert soql.startswith("SELECT Id, Title, Summary")
+        assert "Language = 'fr\\''" in soql
+        assert "Title LIKE '%\\%%'" in soql
+        assert soql.endswith("ORDER BY LastPublishedDate DESC LIMIT 5")
+
+
+class TestServiceCloudCaseUpdate:
+    """Test case updates answered from last-known state."""
+    
+    @pytest.fixture
+    def client(self):
+        client = Mock()
+        client.config = Mock(case_cache_ttl_seconds=300, case_cache_max_entries=16)
+        client.update_object = AsyncMock(return_value={})
+        client.get_object = AsyncMock(return_value={
+            "Id": "500xx000000001AAA",
+            "CaseNumber": "00001001",
+            "Subject": "Login issue",
+            "Description": "Cannot log in",
+            "Status": "New",
+            "Priority": "Medium",
+            "Origin": "Email",
+            "CreatedDate": "2024-01-01T10:00:00.000Z",
+            "LastModifiedDate": "2024-01-02T10:00:00.000Z",
+        })
+        return client
+    
+    @pytest.mark.asyncio
+    async def test_update_merges_into_known_case(self, client):
+        """A case seen before is updated locally without a second request."""
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(client, uuid4())
+        await service_cloud.get_case("500xx000000001AAA")
+        
+        case = await service_cloud.update_case(
+            "500xx000000001AAA", status=SalesforceCaseStatus.ESCALATED, subject="Login issue (VIP)"
+        )
+        
+        assert client.get_object.await_count == 1
+        assert case.status is SalesforceCaseStatus.ESCALATED
+        assert case.subject == "Login issue (VIP)"
+        assert case.case_number == "00001001"
+        assert client.update_object.call_args.args[2] == {"Status": "Escalated", "Subject": "Login issue (VIP)"}
+    
+    @pytest.mark.asyncio
+    async def test_unknown_case_is_fetched(self, client):
+        """Without a known baseline the update falls back to get_case."""
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(client, uuid4())
+        
+        case = await service_cloud.update_case("500xx000000001AAA", priority=SalesforceCasePriority.HIGH)
+        
+        client.get_object.assert_awaited_once()
+        assert case.id == "500xx000000001AAA"
+
+
+class TestSalesforceClientResponseDecoding:
+    """Test response body decoding."""
+    
+    @pytest.mark.asyncio
+    async def test_json_bodies_decoded_with_orjson(self):
+        """Responses are decoded from raw bytes and empty bodies become {}."""
+        with patch("src.integrations.salesforce.client.get_settings"):
+            client = SalesforceClient(TestSalesforceClientHTTPBackend._config())
+        client.access_token = "token"
+        
+        body = Mock(status_code=200, headers={}, content=b'{"totalSize": 1, "records": [{"Id": "500A"}]}')
+        empty = Mock(status_code=204, headers={}, content=b"")
+        client.http_client.request = AsyncMock(side_effect=[body, empty])
+        
+        with patch("src.integrations.salesforce.client.orjson.loads", wraps=__import__("orjson").loads) as loads:
+            assert await client.query("SELECT Id FROM Case") == {"totalSize": 1, "records": [{"Id": "500A"}]}
+            assert await client.update_object("Case", "500A", {"Status": "Closed"}) == {}
+        
+        loads.assert_called_once_with(body.content)
+        await client.http_client.aclose()
+
+
+class TestServiceCloudRequestCoalescing:
+    """Test collapsing of concurrent lookups for the same record."""
+    
+    @pytest.fixture
+    def client(self):
+        client = Mock()
+        client.config = Mock(case_cache_ttl_seconds=300, case_cache_max_entries=16)
+        return client
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_get_case_shares_one_request(self, client):
+        """Callers asking for the same case at once get one REST call between them."""
+        async def slow_get(object_type, object_id):
+            await asyncio.sleep(0.01)
+            return {
+                "Id": object_id, "Subject": "Login issue", "Description": "",
+                "CreatedDate": "2024-01-01T10:00:00.000Z", "LastModifiedDate": "2024-01-01T10:00:00.000Z",
+            }
+        
+        client.get_object = AsyncMock(side_effect=slow_get)
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(client, uuid4())
+        
+        results = await asyncio.gather(*(service_cloud.get_case("500A") for _ in range(5)), service_cloud.get_case("500B"))
+        
+        assert client.get_object.await_count == 2
+        assert all(case is results[0] for case in results[:5])
+        assert service_cloud._inflight_cases == {}
+    
+    @pytest.mark.asyncio
+    async def test_failure_propagates_to_all_waiters(self, client):
+        """A failed shared lookup raises for every caller and is not remembered."""
+        async def failing_get(object_type, object_id):
+            await asyncio.sleep(0.01)
+            raise Exception("boom")
+        
+        client.get_object = AsyncMock(side_effect=failing_get)
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(client, uuid4())
+        
+        results = await asyncio.gather(
+            service_cloud.get_case("500A"), service_cloud.get_case("500A"), return_exceptions=True
+        )
+        
+        assert client.get_object.await_count == 1
+        assert all(isinstance(r, ServiceCloudError) for r in results)
+        assert service_cloud._inflight_cases == {}
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_cancel_waiters(self, client):
+        """Cancelling the caller running the lookup makes waiters retry rather than fail."""
+        async def slow_get(object_type, object_id):
+            await asyncio.sleep(0.01)
+            return {
+                "Id": object_id, "Subject": "Login issue", "Description": "",
+                "CreatedDate": "2024-01-01T10:00:00.000Z", "LastModifiedDate": "2024-01-01T10:00:00.000Z",
+            }
+        
+        client.get_object = AsyncMock(side_effect=slow_get)
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(client, uuid4())
+        
+        leader = asyncio.create_task(service_cloud.get_case("500A"))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(service_cloud.get_case("500A")) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        
+        results = await asyncio.gather(*waiters)
+        
+        assert leader.cancelled()
+        assert all(case.id == "500A" for case in results)
+        assert client.get_object.await_count == 2
+        assert service_cloud._inflight_cases == {}
+
+
+class TestServiceCloudPayloadBuilding:
+    """Test single-literal payload construction."""
+    
+    def test_case_payload_field_precedence(self):
+        """Optional fields appear only when set, custom fields cannot override AI context."""
+        from src.integrations.salesforce.models import SalesforceCaseType
+        
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(Mock(), uuid4())
+        
+        payload = service_cloud._build_case_payload(
+            subject="Printer on fire",
+            description="Smoke everywhere",
+            account_id="001A",
+            case_type=SalesforceCaseType.BILLING_INQUIRY,
+            custom_fields={"Priority": "High", "AI_Source_System__c": "other", "Region__c": "EU"}
+        )
+        
+        assert "ContactId" not in payload and "Reason" not in payload
+        assert payload["AccountId"] == "001A"
+        assert payload["Type"] == "Billing Inquiry"
+        assert payload["Priority"] == "High"
+        assert payload["Region__c"] == "EU"
+        assert payload["AI_Source_System__c"] == "AI_Customer_Service_Agent"
+
+
+class TestServiceCloudUnifiedSearch:
+    """Test SOSL-based case and knowledge search."""
+    
+    @pytest.fixture
+    def client(self):
+        client = Mock()
+        client.config = Mock(knowledge_search_cache_ttl_seconds=300, knowledge_cache_max_entries=16)
+        client.query = AsyncMock()
+        return client
+    
+    @pytest.mark.asyncio
+    async def test_unified_search_splits_objects_and_highlights(self, client):
+        """One SOSL call returns open cases, articles and their highlight snippets."""
+        client.search = AsyncMock(return_value={"searchRecords": [
+            {"attributes": {"type": "Case"}, "Id": "500A", "Subject": "Password reset",
+             "Description": "", "CreatedDate": "2024-01-01T10:00:00.000Z",
+             "LastModifiedDate": "2024-01-01T10:00:00.000Z",
+             "highlight": {"Subject": "<mark>Password</mark> reset"}},
+            {"attributes": {"type": "KnowledgeArticleVersion"}, "Id": "ka0A", "Title": "Reset a password",
+             "LastPublishedDate": "2024-01-01T10:00:00.000Z"},
+        ]})
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(client, uuid4())
+        
+        result = await service_cloud.unified_search("pass-word", limit=10)
+        
+        sosl = client.search.call_args.args[0]
+        assert sosl.startswith("FIND {pass\\-word*} IN ALL FIELDS RETURNING Case(")
+        assert "WHERE Status != 'Closed' LIMIT 10" in sosl
+        assert sosl.endswith("WITH HIGHLIGHT")
+        assert [c.id for c in result["cases"]] == ["500A"]
+        assert [a.id for a in result["articles"]] == ["ka0A"]
+        assert result["highlights"] == {"500A": {"Subject": "<mark>Password</mark> reset"}}
+    
+    @pytest.mark.asyncio
+    async def test_knowledge_search_uses_sosl(self, client):
+        """Knowledge searches with a real term use the search index, not LIKE."""
+        client.search = AsyncMock(return_value={"searchRecords": []})
+        with patch("src.integrations.salesforce.service_cloud.get_settings"):
+            service_cloud = SalesforceServiceCloud(client, uuid4())
+        
+        await service_cloud.search_knowledge_articles("password", limit=5)
+        
+        client.query.assert_not_called()
+        assert "RETURNING KnowledgeArticleVersion(" in client.search.call_args.args[0]
+
+
+class TestSalesforceSyncBatching:
+    """Test concurrent, batched record sync."""
+    
+    @staticmethod
+    def _engine(batch_size, max_concurrency=16):
+        client = Mock()
+        client.config.sync = Mock(lag_threshold_seconds=5, batch_size=batch_size, max_concurrency=max_concurrency)
+        with patch("src.integrations.salesforce.sync.get_settings"):
+            return SalesforceSyncEngine(client, uuid4(), Mock())
+    
+    @staticmethod
+    async def _stream(records):
+        for record in records:
+            yield record
+    
+    @pytest.mark.asyncio
+    async def test_full_sync_runs_records_concurrently_within_limit(self):
+        """Record syncs overlap a batch at a time, never more than batch_size in flight."""
+        engine = self._engine(batch_size=3)
+        local = [{"id": str(i), "salesforce_id": f"500{i}"} for i in range(10)]
+        remote = [{"Id": f"500{i}"} for i in range(12)]
+        engine._get_all_local_records = lambda object_type: self._stream(local)
+        engine._get_all_remote_records = lambda object_type: self._stream(remote)
+        engine._get_remote_records_by_id = AsyncMock(return_value={})
+        engine._get_last_sync_times = AsyncMock(return_value={})
+        
+        in_flight = {"now": 0, "max": 0}
+        synced = []
+        
+        async def fake_sync(object_type, record, remote_record, action):
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            in_flight["now"] -= 1
+            synced.append(record["id"])
+        
+        async def fake_remote_only(object_type, record):
+            if record["Id"] == "50010":
+                raise SyncError("pull failed")
+            synced.append(record["Id"])
+        
+        engine._sync_single_record = fake_sync
+        engine._pull_from_salesforce = fake_remote_only
+        
+        await engine._perform_full_sync("Case")
+        
+        assert in_flight["max"] == 3
+        assert sorted(synced) == sorted([str(i) for i in range(10)] + ["50011"])
+        assert engine._sync_stats["failed"] == 1
+        # Local records are matched a batch at a time
+        assert [c.args[1] for c in engine._get_remote_records_by_id.await_args_list] == [
+            ["5000", "5001", "5002"], ["5003", "5004", "5005"], ["5006", "5007", "5008"], ["5009"]
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_concurrency_is_capped_independently_of_batch_size(self):
+        """A large batch still runs at most max_concurrency record syncs at once."""
+        engine = self._engine(batch_size=10, max_concurrency=2)
+        in_flight = {"now": 0, "max": 0}
+        
+        async def call():
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            in_flight["now"] -= 1
+        
+        await engine._gather_bounded(call() for _ in range(10))
+        
+        assert in_flight["max"] == 2
+    
+    def test_batch_classified_against_remote_index(self):
+        """Each local record is matched by Salesforce ID and classified in one pass."""
+        engine = self._engine(batch_size=10)
+        last_sync = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        batch = [
+            {"id": "1", "salesforce_id": "500A", "last_modified_date": "2024-01-03T00:00:00Z"},
+            {"id": "2", "salesforce_id": "500B", "last_modified_date": "2024-01-02T00:00:00Z"},
+            {"id": "3", "salesforce_id": "500C", "last_modified_date": "2023-12-30T00:00:00Z"},
+            {"id": "4"},
+            {"id": "5", "salesforce_id": "500E"},
+        ]
+        remote_index = {
+            "500A": {"Id": "500A", "LastModifiedDate": "2024-01-02T00:00:00.000+0000"},
+            "500B": {"Id": "500B", "LastModifiedDate": "2024-01-03T00:00:00.000+0000"},
+            "500C": {"Id": "500C", "LastModifiedDate": "2024-01-03T00:00:00.000+0000"},
+            "500E": {"Id": "500E", "LastModifiedDate": "2024-01-03T00:00:00.000+0000"},
+        }
+        last_sync_times = {"1": last_sync, "2": last_sync, "3": last_sync, "5": last_sync}
+        
+        actions = engine._classify_batch(batch, remote_index, last_sync_times)
+        
+        assert [a.value for a in actions] == ["local_wins", "remote_wins", "in_sync", "push", "in_sync"]
+    
+    def test_last_write_wins_breaks_ties_by_id(self):
+        """Equal timestamps pick a winner from the record IDs, not the side."""
+        engine = self._engine(batch_size=10)
+        same = "2024-01-02T00:00:00Z"
+        batch = [
+            {"id": "a1", "salesforce_id": "500A", "last_modified_date": same},
+            {"id": "1", "salesforce_id": "500A", "last_modified_date": same},
+        ]
+        remote_index = {"500A": {"Id": "500A", "LastModifiedDate": same}}
+        last_sync = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        
+        actions = engine._classify_batch(batch, remote_index, {"a1": last_sync, "1": last_sync})
+        
+        assert [a.value for a in actions] == ["local_wins", "remote_wins"]
+    
+    @pytest.mark.asyncio
+    async def test_conflict_dispatched_by_strategy(self):
+        """Conflicting records are counted and resolved toward the winning side."""
+        engine = self._engine(batch_size=10)
+        engine._push_to_salesforce = AsyncMock()
+        engine._pull_from_salesforce = AsyncMock()
+        local, remote = {"id": "1"}, {"Id": "500A"}
+        actions = engine._classify_batch(
+            [{"id": "1", "salesforce_id": "500A", "last_modified_date": "2024-01-01T00:00:01Z"}],
+            {"500A": {"Id": "500A", "LastModifiedDate": "2024-01-01T00:00:02Z"}},
+            {"1": datetime(2024, 1, 1, tzinfo=timezone.utc)}
+        )
+        
+        await engine._sync_single_record("Case", local, remote, actions[0])
+        
+        assert engine._sync_stats["conflicts"] == 1
+        engine._pull_from_salesforce.assert_awaited_once_with("Case", remote)
+        engine._push_to_salesforce.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_sync_state_buffered_until_batch_full(self):
+        """Sync states are coalesced per record and flushed once a batch fills."""
+        engine = self._engine(batch_size=2)
+        flushed = []
+        
+        async def fake_flush():
+            flushed.append(dict(engine._sync_state_buffer))
+            engine._sync_state_buffer.clear()
+        
+        engine._flush_sync_state = fake_flush
+        
+        await engine._update_sync_state("Case", "1", "500A", status="conflict")
+        await engine._update_sync_state("Case", "1", "500A")
+        assert flushed == []
+        
+        await engine._update_sync_state("Case", "2", "500B")
+        
+        assert len(flushed) == 1
+        assert {key: row["sync_status"] for key, row in flushed[0].items()} == {
+            ("1", "Case"): "synced", ("2", "Case"): "synced"
+        }
+    
+    @pytest.mark.asyncio
+    async def test_pushes_sent_through_collections(self):
+        """Queued pushes go out as one create and one update collection request."""
+        engine = self._engine(batch_size=100)
+        engine._transform_to_salesforce = AsyncMock(side_effect=lambda ot, r: {"Subject": r["subject"]})
+        engine._add_to_dead_letter_queue = AsyncMock()
+        engine.client.create_objects_collection = AsyncMock(return_value=[
+            {"id": "500N1", "success": True}, {"success": False, "errors": ["REQUIRED_FIELD_MISSING"]}
+        ])
+        engine.client.update_objects_collection = AsyncMock(return_value=[{"id": "500U", "success": True}])
+        engine._sync_stats["successful"] = 3
+        
+        await engine._push_to_salesforce("Case", {"id": "1", "subject": "new one"})
+        await engine._push_to_salesforce("Case", {"id": "2", "subject": "new two"})
+        await engine._push_to_salesforce("Case", {"id": "3", "subject": "edit", "salesforce_id": "500U"})
+        engine.client.create_objects_collection.assert_not_called()
+        
+        await engine._flush_pushes("Case")
+        
+        engine.client.create_objects_collection.assert_awaited_once_with(
+            "Case", [{"Subject": "new one"}, {"Subject": "new two"}]
+        )
+        engine.client.update_objects_collection.assert_awaited_once_with(
+            "Case", [{"id": "500U", "Subject": "edit"}]
+        )
+        assert {key: row["salesforce_id"] for key, row in engine._sync_state_buffer.items()} == {
+            ("1", "Case"): "500N1", ("3", "Case"): "500U"
+        }
+        assert engine._sync_stats["successful"] == 2
+        assert engine._sync_stats["failed"] == 1
+        engine._add_to_dead_letter_queue.assert_awaited_once()
+
+
+class TestSalesforceSyncRemoteScans:
+    """Test SystemModstamp-based remote change scans."""
+    
+    @staticmethod
+    def _engine(enable_bulk_api=False):
+        client = Mock()
+        client.config.sync = Mock(lag_threshold_seconds=5, batch_size=10, max_concurrency=16)
+        client.config.enable_bulk_api = enable_bulk_api
+        redis = Mock()
+        redis.get = AsyncMock(return_value=None)
+        redis.set = AsyncMock()
+        with patch("src.integrations.salesforce.sync.get_settings"):
+            return SalesforceSyncEngine(client, uuid4(), redis)
+    
+    @pytest.mark.asyncio
+    async def test_remote_changes_query_systemmodstamp_and_follow_pages(self):
+        """Changes are selected by SystemModstamp with a SOQL literal and every page is read."""
+        engine = self._engine()
+        queries = []
+        
+        async def query_paginated(soql, page_size=None):
+            queries.append(soql)
+            yield {"records": [{"Id": "5001"}], "done": False}
+            yield {"records": [{"Id": "5002"}], "done": True}
+        
+        engine.client.query_paginated = query_paginated
+        
+        since = datetime(2024, 1, 2, 3, 4, 5, 678000, tzinfo=timezone(timedelta(hours=2)))
+        records = [r async for r in engine._get_remote_changes("Case", since)]
+        
+        assert [r["Id"] for r in records] == ["5001", "5002"]
+        soql = queries[0]
+        assert "WHERE SystemModstamp > 2024-01-02T01:04:05Z" in soql
+        assert soql.endswith("ORDER BY SystemModstamp ASC")
+    
+    @pytest.mark.asyncio
+    async def test_batch_lookup_fetches_only_referenced_ids(self):
+        """A local batch pulls just its remote twins, limited to changes in incremental mode."""
+        engine = self._engine()
+        queries = []
+        
+        async def query_paginated(soql, page_size=None):
+            queries.append(soql)
+            yield {"records": [{"Id": "500B"}], "done": True}
+        
+        engine.client.query_paginated = query_paginated
+        
+        remote_index = await engine._get_remote_records_by_id("Case", ["500A", "500B"], datetime(2024, 1, 1))
+        
+        assert remote_index == {"500B": {"Id": "500B"}}
+        assert "WHERE Id IN ('500A', '500B') AND SystemModstamp > 2024-01-01T00:00:00Z" in queries[0]
+        assert await engine._get_remote_records_by_id("Case", [], None) == {}
+        
+        await engine._get_remote_records_by_id("Case", ["500A') OR Name != ('x"], None)
+        assert "WHERE Id IN ('500A\\') OR Name != (\\'x')" in queries[1]
+    
+    @pytest.mark.asyncio
+    async def test_remote_id_lookup_is_chunked(self):
+        """Large local batches are split into several Id IN queries and merged."""
+        from src.integrations.salesforce.sync import REMOTE_ID_CHUNK_SIZE
+        
+        engine = self._engine()
+        queries = []
+        
+        async def query_paginated(soql, page_size=None):
+            queries.append(soql)
+            ids = soql.split("Id IN (")[1].split(")")[0].replace("'", "").split(", ")
+            yield {"records": [{"Id": sfid} for sfid in ids], "done": True}
+        
+        engine.client.query_paginated = query_paginated
+        sfids = [f"500{i:015d}" for i in range(REMOTE_ID_CHUNK_SIZE * 2 + 1)]
+        
+        remote_index = await engine._get_remote_records_by_id("Case", sfids, None)
+        
+        assert len(queries) == 3
+        assert all(query.count("'500") <= REMOTE_ID_CHUNK_SIZE for query in queries)
+        assert list(remote_index) == sfids
+    
+    @pytest.mark.asyncio
+    async def test_large_scans_use_bulk_query_job(self):
+        """Scans above the threshold read rows from a bulk query job."""
+        engine = self._engine(enable_bulk_api=True)
+        engine.client.query = AsyncMock(return_value={"totalSize": 50_000})
+        engine.client.create_query_job = AsyncMock(return_value="750xx")
+        engine.client.get_query_job_status = AsyncMock(return_value={"state": "JobComplete"})
+        engine.client.get_query_result_pages = AsyncMock(return_value=["p0", "p1"])
+        engine.client.get_query_result_page = AsyncMock(side_effect=lambda link: (
+            f"Id,LastModifiedDate,SystemModstamp\n{link}a,2024-01-01T00:00:00.000Z,2024-01-01T00:00:00.000Z\n"
+        ))
+        
+        records = [r async for r in engine._get_all_remote_records("Case")]
+        
+        assert [r["Id"] for r in records] == ["p0a", "p1a"]
+        assert engine.client.query.call_count == 1
+        assert "SystemModstamp" in engine.client.create_query_job.call_args.args[0]
+    
+    @pytest.mark.asyncio
+    async def test_bulk_query_settles_prefetch_when_closed(self):
+        """Closing the bulk row stream early cancels and awaits the prefetched page."""
+        engine = self._engine(enable_bulk_api=True)
+        engine.client.create_query_job = AsyncMock(return_value="750xx")
+        engine.client.get_query_job_status = AsyncMock(return_value={"state": "JobComplete"})
+        engine.client.get_query_result_pages = AsyncMock(return_value=["p0", "p1"])
+        
+        async def fetch_page(link):
+            await asyncio.sleep(0 if link == "p0" else 10)
+            return f"Id\n{link}a\n"
+        
+        engine.client.get_query_result_page = fetch_page
+        
+        rows = engine._bulk_query_records("SELECT Id FROM Case", poll_interval=0)
+        assert (await rows.__anext__())["Id"] == "p0a"
+        await rows.aclose()
+        
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+    
+    @pytest.mark.asyncio
+    async def test_high_water_mark_round_trips_through_redis(self):
+        """The newest SystemModstamp is stored and becomes the next sync start."""
+        engine = self._engine()
+        await engine._store_high_water_mark("Case", _newest_stamp([
+            {"Id": "5001", "SystemModstamp": "2024-01-01T10:00:00.000+0000"},
+            {"Id": "5002", "SystemModstamp": "2024-01-03T10:00:00.000+0000"},
+        ], "2024-01-02T10:00:00.000+0000"))
+        
+        key, stored = engine.redis.set.call_args.args
+        assert key.endswith(":Case")
+        assert stored == "2024-01-03T10:00:00.000+0000"
+        
+        engine.redis.get = AsyncMock(return_value=stored.encode())
+        assert await engine._get_last_sync_timestamp("Case") == datetime(2024, 1, 3, 10, tzinfo=timezone.utc)
+    
+    @pytest.mark.asyncio
+    async def test_incremental_sync_keeps_local_and_remote_marks_apart(self):
+        """Local changes start at the last run's local start time, remote ones at the SystemModstamp."""
+        engine = self._engine()
+        store = {
+            engine._high_water_mark_key("Case"): b"2024-01-03T10:00:00.000+0000",
+            engine._local_high_water_mark_key("Case"): b"2024-01-03T09:00:00+00:00",
+        }
+        engine.redis.get = AsyncMock(side_effect=lambda key: store.get(key))
+        engine.redis.set = AsyncMock(side_effect=lambda key, value, **kwargs: store.__setitem__(key, value))
+        engine._get_local_changes = Mock(return_value="local")
+        engine._get_remote_changes = Mock(return_value="remote")
+        engine._sync_streams = AsyncMock(return_value=0)
+        
+        before = datetime.now(timezone.utc)
+        await engine._perform_incremental_sync("Case")
+        
+        engine._get_local_changes.assert_called_once_with("Case", datetime(2024, 1, 3, 9, tzinfo=timezone.utc))
+        remote_since = datetime(2024, 1, 3, 10, tzinfo=timezone.utc)
+        engine._get_remote_changes.assert_called_once_with("Case", remote_since)
+        engine._sync_streams.assert_awaited_once_with("Case", "local", "remote", since=remote_since)
+        # The next run reads local changes from when this one started
+        assert await engine._get_local_high_water_mark("Case") >= before
+    
+    @pytest.mark.asyncio
+    async def test_failed_sync_keeps_the_local_mark(self):
+        """The local mark only moves after a successful run."""
+        engine = self._engine()
+        engine.redis.get = AsyncMock(return_value=None)
+        engine._get_last_synced_date = AsyncMock(return_value=None)
+        engine._sync_streams = AsyncMock(side_effect=SyncError("boom"))
+        
+        with pytest.raises(SyncError):
+            await engine._perform_incremental_sync("Case")
+        
+        engine.redis.set.assert_not_called()
+
+
+class TestSalesforceSyncFieldMappingCache:
+    """Test in-process field mapping caching with Redis invalidation."""
+    
+    @pytest.mark.asyncio
+    async def test_mappings_load_once_until_invalidated(self):
+        """Mappings are cached per object type and evicted by pub/sub messages."""
+        messages: asyncio.Queue = asyncio.Queue()
+        
+        async def listen():
+            while True:
+                yield await messages.get()
+        
+        pubsub = Mock()
+        pubsub.subscribe = AsyncMock()
+        pubsub.reset = AsyncMock()
+        pubsub.listen = listen
+        redis = Mock()
+        redis.pubsub = Mock(return_value=pubsub)
+        
+        client = Mock()
+        client.config.sync = Mock(lag_threshold_seconds=5, batch_size=10, max_concurrency=16)
+        with patch("src.integrations.salesforce.sync.get_settings"):
+            engine = SalesforceSyncEngine(client, uuid4(), redis)
+        engine._load_field_mapping = AsyncMock(return_value={})
+        
+        await engine._get_field_mapping("Case")
+        await engine._get_field_mapping("Case")
+        assert engine._load_field_mapping.await_count == 1
+        
+        await messages.put({"type": "message", "data": b"Case"})
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        await engine._get_field_mapping("Case")
+        assert engine._load_field_mapping.await_count == 2
+        
+        await engine.aclose()
+        pubsub.subscribe.assert_awaited_once_with("sf:mapping:invalidated")
+        pubsub.reset.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_compiled_transformers_apply_mapping_both_ways(self):
+        """Records are mapped through transformers compiled once per object type."""
+        from src.integrations.salesforce.models import SalesforceFieldMapping
+        
+        client = Mock()
+        client.config.sync = Mock(lag_threshold_seconds=5, batch_size=10, max_concurrency=16)
+        with patch("src.integrations.salesforce.sync.get_settings"):
+            engine = SalesforceSyncEngine(client, uuid4(), Mock())
+        engine._ensure_mapping_listener = Mock()
+        engine._get_local_id_by_salesforce_id = AsyncMock(return_value="1")
+        engine._load_field_mapping = AsyncMock(return_value={
+            "subject": SalesforceFieldMapping(
+                local_field="subject", salesforce_field="Subject", field_type="string",
+                transformation_rule="strip"
+            ),
+            "priority": SalesforceFieldMapping(local_field="priority", salesforce_field="Priority", field_type="string"),
+        })
+        
+        outbound = await engine._transform_to_salesforce("Case", {"subject": "  Help  ", "other": 1})
+        inbound = await engine._transform_from_salesforce("Case", {"Id": "500A", "Priority": "High"})
+        
+        assert outbound["Subject"] == "Help"
+        assert "Priority" not in outbound
+        assert inbound["priority"] == "High"
+        assert "subject" not in inbound
+        assert engine._load_field_mapping.await_count == 1
+        
+        engine._evict_field_mapping("Case")
+        assert "Case" not in engine._compiled_transformers
+
+
+class TestSalesforceSyncQueueCounters:
+    """Test dead letter and conflict queue counters."""
+    
+    @staticmethod
+    def _engine(existed):
+        pipe = MagicMock()
+        pipe.__aenter__ = AsyncMock(return_value=pipe)
+        pipe.__aexit__ = AsyncMock(return_value=False)
+        pipe.execute = AsyncMock(return_value=existed + [True] * 5 * len(existed))
+        redis = Mock()
+        redis.pipeline = Mock(return_value=pipe)
+        redis.decrby = AsyncMock()
+        
+        client = Mock()
+        client.config.sync = Mock(lag_threshold_seconds=5, batch_size=10, max_concurrency=16)
+        with patch("src.integrations.salesforce.sync.get_settings"):
+            return SalesforceSyncEngine(client, uuid4(), redis), pipe
+    
+    @pytest.mark.asyncio
+    async def test_new_dlq_entry_counted_in_same_transaction(self):
+        """Adding an entry sets it and bumps the org counter atomically."""
+        engine, pipe = self._engine(existed=[0])
+        
+        await engine._add_to_dead_letter_queue("Case", {"id": "1"}, "boom")
+        engine.redis.pipeline.assert_not_called()
+        await engine._flush_queue_entries()
+        
+        engine.redis.pipeline.assert_called_once_with(transaction=True)
+        key, _, payload = pipe.setex.call_args.args
+        assert key == f"salesforce_dlq:{engine.organization_id}:Case:1"
+        assert orjson.loads(payload)["error_message"] == "boom"
+        index_key, members = pipe.zadd.call_args.args
+        assert index_key == f"salesforce_dlq_index:{engine.organization_id}"
+        assert list(members) == [key]
+        counter = f"salesforce_dlq_count:{engine.organization_id}"
+        pipe.incr.assert_called_once_with(counter)
+        pipe.expire.assert_any_call(counter, timedelta(days=7))
+        engine.redis.decrby.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_buffered_entries_written_in_one_pipeline(self):
+        """A batch of entries is one round trip and replaced entries are uncounted."""
+        engine, pipe = self._engine(existed=[1, 0, 1])
+        
+        for record_id in ("1", "2", "3"):
+            await engine._add_to_dead_letter_queue("Case", {"id": record_id}, "boom")
+        await engine._add_to_dead_letter_queue("Case", {"id": "1"}, "boom again")
+        await engine._flush_queue_entries()
+        
+        pipe.execute.assert_awaited_once()
+        assert pipe.setex.call_count == 3
+        assert orjson.loads(pipe.setex.call_args_list[0].args[2])["error_message"] == "boom again"
+        engine.redis.decrby.assert_awaited_once_with(f"salesforce_dlq_count:{engine.organization_id}", 2)
+    
+    @pytest.mark.asyncio
+    async def test_dlq_listed_through_index(self):
+        """Listing prunes expired index members and skips entries that just expired."""
+        engine, _ = self._engine(existed=[])
+        engine.redis.zremrangebyscore = AsyncMock()
+        engine.redis.zrevrange = AsyncMock(return_value=[b"k2", b"k1"])
+        engine.redis.mget = AsyncMock(return_value=[orjson.dumps({"error_message": "b"}), None])
+        
+        entries = await engine.list_dead_letter_queue(limit=2)
+        
+        assert entries == [{"error_message": "b"}]
+        index_key = f"salesforce_dlq_index:{engine.organization_id}"
+        assert engine.redis.zremrangebyscore.call_args.args[:2] == (index_key, "-inf")
+        engine.redis.zrevrange.assert_awaited_once_with(index_key, 0, 1)
+
+
+class TestSalesforceSyncHealthCheck:
+    """Test sync engine health checks."""
+    
+    @pytest.mark.asyncio
+    async def test_lag_probes_run_concurrently(self):
+        """All lag probes overlap and a failing probe reports -1."""
+        client = Mock()
+        client.config.sync = Mock(lag_threshold_seconds=5, batch_size=10, max_concurrency=16)
+        client.config.sync_objects = ["Case", "Contact", "Account"]
+        client.health_check = AsyncMock(return_value={"status": "healthy"})
+        with patch("src.integrations.salesforce.sync.get_settings"):
+            engine = SalesforceSyncEngine(client, uuid4(), Mock())
+        
+        in_flight = {"now": 0, "max": 0}
+        
+        async def fake_lag(object_type):
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            in_flight["now"] -= 1
+            if object_type == "Account":
+                raise SyncError("query failed")
+            return 1.0
+        
+        engine.get_sync_lag = fake_lag
+        
+        health = await engine.health_check()
+        
+        assert in_flight["max"] == 3
+        assert health["sync_lags"] == {"Case": 1.0, "Contact": 1.0, "Account": -1.0}
+        assert health["status"] == "healthy"
+
+
+class TestSalesforceSyncLock:
+    """Test the cross-worker sync lock."""
+    
+    @staticmethod
+    def _engine(acquired):
+        redis = Mock()
+        redis.set = AsyncMock(return_value=acquired)
+        release = AsyncMock(return_value=1)
+        redis.register_script = Mock(return_value=release)
+        
+        client = Mock()
+        client.config.sync = Mock(lag_threshold_seconds=5, batch_size=10, max_concurrency=16, lock_ttl_seconds=900)
+        with patch("src.integrations.salesforce.sync.get_settings"):
+            engine = SalesforceSyncEngine(client, uuid4(), redis)
+        engine._perform_incremental_sync = AsyncMock(return_value={"status": "completed"})
+        return engine, release
+    
+    @pytest.mark.asyncio
+    async def test_lock_taken_and_released_with_own_token(self):
+        """A sync holds the lock for its run and releases only its own token."""
+        engine, release = self._engine(acquired=True)
+        
+        result = await engine.sync_bidirectional("Case")
+        
+        assert result["status"] == "completed"
+        key, token = engine.redis.set.call_args.args
+        assert key == f"sf:sync_lock:{engine.organization_id}:Case"
+        assert engine.redis.set.call_args.kwargs == {"nx": True, "ex": 900}
+        release.assert_awaited_once_with(keys=[key], args=[token])
+    
+    @pytest.mark.asyncio
+    async def test_sync_skipped_when_another_worker_holds_lock(self):
+        """A held lock skips the run without syncing or releasing it."""
+        engine, release = self._engine(acquired=None)
+        
+        result = await engine.sync_bidirectional("Case")
+        
+        assert result["status"] == "skipped"
+        engine._perform_incremental_sync.assert_not_called()
+        release.assert_not_called()
+        assert engine._sync_in_progress is False
+
+
+class TestSalesforceSyncChangeEvents:
+    """Test applying Change Data Capture events."""
+    
+    @staticmethod
+    def _engine():
+        client = Mock()
+        client.config.sync = Mock(lag_threshold_seconds=5, batch_size=10, max_concurrency=16)
+        with patch("src.integrations.salesforce.sync.get_settings"):
+            engine = SalesforceSyncEngine(client, uuid4(), Mock())
+        engine._pull_from_salesforce = AsyncMock()
+        engine._flush_sync_state = AsyncMock()
+        engine.sync_bidirectional = AsyncMock()
+        return engine
+    
+    @staticmethod
+    def _event(change_type, changed_fields=("Status",), **fields):
+        header = {
+            "entityName": "Case",
+            "changeType": change_type,
+            "recordIds": ["500A", "500B"],
+            "changedFields": list(changed_fields),
+        }
+        return {"data": {"payload": {"ChangeEventHeader": header, **fields}}}
+    
+    @pytest.mark.asyncio
+    async def test_update_applied_from_event_payload(self):
+        """Changed fields are pulled per record without querying Salesforce."""
+        engine = self._engine()
+        
+        await engine._handle_real_time_change(self._event("UPDATE", Status="Closed"))
+        
+        assert [c.args for c in engine._pull_from_salesforce.await_args_list] == [
+            ("Case", {"Status": "Closed", "Id": "500A"}),
+            ("Case", {"Status": "Closed", "Id": "500B"}),
+        ]
+        engine._flush_sync_state.assert_awaited_once()
+        engine.sync_bidirectional.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_gap_event_falls_back_to_incremental_sync(self):
+        """Gap events carry no values, so the object is resynced."""
+        engine = self._engine()
+        
+        await engine._handle_real_time_change(self._event("GAP_OVERFLOW"))
+        
+        engine.sync_bidirectional.assert_awaited_once_with("Case", sync_mode="incremental")
+        engine._pull_from_salesforce.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_echo_of_own_push_ignored(self):
+        """Changes stamped by this engine's pushes are not pulled back."""
+        engine = self._engine()
+        
+        await engine._handle_real_time_change(
+            self._event("UPDATE", changed_fields=("Subject", "AI_Last_Sync_Date__c"), Subject="x")
+        )
+        
+        engine._pull_from_salesforce.assert_not_called()
+
+
+class TestSalesforceSyncBatchClock:
+    """Test the per-batch timestamp."""
+    
+    @pytest.mark.asyncio
+    async def test_records_in_a_batch_share_one_aware_timestamp(self):
+        """Sync states written in one batch carry the same UTC timestamp."""
+        client = Mock()
+        client.config.sync = Mock(lag_threshold_seconds=5, batch_size=10, max_concurrency=16)
+        with patch("src.integrations.salesforce.sync.get_settings"):
+            engine = SalesforceSyncEngine(client, uuid4(), Mock())
+        
+        engine._start_batch_clock()
+        await engine._update_sync_state("Case", "1", "500A")
+        await asyncio.sleep(0.001)
+        await engine._update_sync_state("Case", "2", "500B")
+        
+        stamps = {row["last_sync_date"] for row in engine._sync_state_buffer.values()}
+        assert len(stamps) == 1
+        assert next(iter(stamps)).tzinfo is timezone.utc
@@ -0,0 +1,304 @@
+"""Tests for embedding generation and caching."""
+
+import pytest
+import asyncio
+import threading
+
+import numpy as np
+
+from src.core.exceptions import AIServiceError
+from src.services.ai.knowledge.embedding_cache import SQLiteEmbeddingCache
+from src.services.ai.knowledge.embeddings import EmbeddingResult, EmbeddingService
+from src.services.ai.models import ModelCapability, create_default_registry
+from src.services.ai.orchestrator import AIResponse, TokenUsage
+
+
+class FakeOrchestrator:
+    """Orchestrator stand-in that embeds each text as [len(text), 1.0, 0.0]."""
+    
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.model_registry = create_default_registry()
+        self.delay = delay
+        self.fail = fail
+        self.requests = []
+    
+    async def process_request(self, request):
+        self.requests.append(request)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise AIServiceError("provider unavailable")
+        
+        batched = request.capability == ModelCapability.EMBEDDINGS_BATCH
+        texts = request.input_data if batched else [request.input_data]
+        vectors = [[float(len(text)), 1.0, 0.0] for text in texts]
+        return AIResponse(
+            content=vectors if batched else vectors[0],
+            model_used=request.model_preference,
+            token_usage=TokenUsage(total_tokens=5 * len(texts)),
+            confidence=1.0,
+        )
+    
+    def capabilities(self):
+        return [request.capability for request in self.requests]
+
+
+class TestEmbeddingBatches:
+    """Test batched embedding dispatch in generate_batch."""
+    
+    @pytest.mark.asyncio
+    async def test_batch_model_embeds_slice_in_one_call(self):
+        """A batch-capable model gets one EMBEDDINGS_BATCH call per slice, results in input order."""
+        orchestrator = FakeOrchestrator()
+        service = EmbeddingService(orchestrator)
+        texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+        
+        batch = await service.generate_batch(texts, batch_size=2)
+        
+        assert orchestrator.capabilities() == [ModelCapability.EMBEDDINGS_BATCH] * 3
+        # Slices are dispatched concurrently, so only the slicing itself is deterministic
+        assert sorted(request.input_data for request in orchestrator.requests) == [["a", "bb"], ["ccc", "dddd"], ["eeeee"]]
+        assert [result.text for result in batch.embeddings] == texts
+        assert [float(result.embedding[0]) for result in batch.embeddings] == [1.0, 2.0, 3.0, 4.0, 5.0]
+        assert batch.total_tokens == 25
+        assert batch.metadata["request_count"] == 3
+    
+    @pytest.mark.asyncio
+    async def test_cached_texts_are_not_sent_again(self):
+        """Texts embedded earlier come from the cache."""
+        orchestrator = FakeOrchestrator()
+        service = EmbeddingService(orchestrator)
+        await service.generate_batch(["a", "bb"])
+        
+        batch = await service.generate_batch(["a", "bb", "ccc"])
+        
+        assert [request.input_data for request in orchestrator.requests] == [["a", "bb"], ["ccc"]]
+        assert batch.metadata["cached_count"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_failed_slice_is_not_cached(self):
+        """Placeholders for a failed provider call are returned but never cached."""
+        orchestrator = FakeOrchestrator(fail=True)
+        service = EmbeddingService(orchestrator)
+        
+        batch = await service.generate_batch(["a", "bb"])
+        
+        assert all("error" in result.metadata for result in batch.embeddings)
+        assert not any(result.embedding.any() for result in batch.embeddings)
+        assert len(service.embedding_cache) == 0
+        
+        orchestrator.fail = False
+        result = await service.generate_embedding("a")
+        
+        assert "error" not in result.metadata
+        assert float(result.embedding[0]) == 1.0
+
+    
+    @pytest.mark.asyncio
+    async def test_cached_rows_do_not_pin_the_batch_matrix(self):
+        """Cached vectors own their memory, so the byte bound covers what is actually held."""
+        orchestrator = FakeOrchestrator()
+        service = EmbeddingService(orchestrator)
+        texts = ["a", "bb", "ccc", "dddd"]
+        
+        await service.generate_batch(texts)
+        
+        cached = [service.get_cached_embedding(text, service.default_model) for text in texts]
+        assert all(result.embedding.base is None for result in cached)
+        assert service.embedding_cache.current_bytes == sum(result.embedding.nbytes + len(result.text) for result in cached)
+
+
+class TestEmbeddingCoalescing:
+    """Test coalescing of concurrent generate_embedding calls."""
+    
+    @pytest.mark.asyncio
+    async def test_lone_request_is_sent_immediately(self):
+        """With nothing else in flight a request makes its own single-text call."""
+        orchestrator = FakeOrchestrator()
+        service = EmbeddingService(orchestrator)
+        
+        result = await service.generate_embedding("hello")
+        
+        assert orchestrator.capabilities() == [ModelCapability.EMBEDDINGS]
+        assert float(result.embedding[0]) == 5.0
+        assert service._requests_in_flight == 0
+    
+    @pytest.mark.asyncio
+    async def test_requests_during_an_in_flight_call_share_a_batch(self):
+        """Requests arriving while another is in flight are coalesced into one batched call."""
+        orchestrator = FakeOrchestrator(delay=0.01)
+        service = EmbeddingService(orchestrator, batch_wait_ms=5)
+        texts = ["a", "bb", "ccc", "dddd"]
+        
+        results = await asyncio.gather(*(service.generate_embedding(text) for text in texts))
+        
+        assert orchestrator.capabilities() == [ModelCapability.EMBEDDINGS, ModelCapability.EMBEDDINGS_BATCH]
+        assert orchestrator.requests[1].input_data == ["bb", "ccc", "dddd"]
+        assert [float(result.embedding[0]) for result in results] == [1.0, 2.0, 3.0, 4.0]
+        assert len(service.embedding_cache) == 4
+        assert service._requests_in_flight == 0
+    
+    @pytest.mark.asyncio
+    async def test_requests_with_context_or_without_batch_support_are_not_coalesced(self):
+        """Per-request context and models without batched embeddings keep one call per text."""
+        orchestrator = FakeOrchestrator(delay=0.01)
+        service = EmbeddingService(orchestrator)
+        
+        await asyncio.gather(
+            service.generate_embedding("a"),
+            service.generate_embedding("bb", context={"tenant": "t1"}),
+            service.generate_embedding("ccc", model="custom-embedding"),
+        )
+        
+        assert orchestrator.capabilities() == [ModelCapability.EMBEDDINGS] * 3
+    
+    @pytest.mark.asyncio
+    async def test_coalesced_failure_raises_for_each_caller(self):
+        """A failed coalesced call raises AIServiceError for every request that joined it."""
+        orchestrator = FakeOrchestrator(delay=0.01, fail=True)
+        service = EmbeddingService(orchestrator)
+        
+        results = await asyncio.gather(
+            *(service.generate_embedding(text) for text in ["a", "bb", "ccc"]), return_exceptions=True
+        )
+        
+        assert all(isinstance(result, AIServiceError) for result in results)
+        assert len(service.embedding_cache) == 0
+
+
+class RecordingBackend:
+    """In-memory persistent tier that records which thread each call ran on."""
+    
+    def __init__(self):
+        self.data = {}
+        self.threads = set()
+    
+    def get(self, key):
+        self.threads.add(threading.get_ident())
+        return self.data.get(key)
+    
+    def get_many(self, keys):
+        self.threads.add(threading.get_ident())
+        return [self.data.get(key) for key in keys]
+    
+    def put_many(self, items):
+        self.threads.add(threading.get_ident())
+        self.data.update(items)
+
+
+class TestPersistentEmbeddingCache:
+    """Test the optional persistent embedding cache tier."""
+    
+    def test_encode_decode_round_trip(self):
+        """Serialized results decode to the same vector and usage."""
+        vector = np.array([0.1, -2.5, 3e-7, 1e6], dtype=np.float32)
+        result = EmbeddingResult(text="hi", embedding=vector, model_used="m", token_usage=7, metadata={})
+        
+        decoded = EmbeddingService._decode_result("hi", EmbeddingService._encode_result(result))
+        
+        assert np.array_equal(decoded.embedding, vector)
+        assert decoded.embedding.dtype == np.float32
+        assert (decoded.text, decoded.model_used, decoded.token_usage) == ("hi", "m", 7)
+        assert decoded.metadata == {"cache": "persistent"}
+    
+    def test_sqlite_get_many_spans_chunks(self, tmp_path):
+        """get_many returns payloads in key order, None for missing keys, across lookup chunks."""
+        cache = SQLiteEmbeddingCache(str(tmp_path / "embeddings.db"))
+        cache.LOOKUP_CHUNK_SIZE = 2
+        cache.put_many([("a", b"1"), ("c", b"3"), ("e", b"5")])
+        
+        assert cache.get_many(["a", "b", "c", "d", "e"]) == [b"1", None, b"3", None, b"5"]
+        assert cache.get("c") == b"3"
+        cache.close()
+    
+    @pytest.mark.asyncio
+    async def test_entries_survive_a_new_service(self, tmp_path):
+        """A fresh service with the same SQLite file serves earlier embeddings without provider calls."""
+        path = str(tmp_path / "embeddings.db")
+        first = EmbeddingService(FakeOrchestrator(), persistent_cache=SQLiteEmbeddingCache(path))
+        await first.generate_batch(["a", "bb"])
+        await first.generate_embedding("ccc")
+        
+        orchestrator = FakeOrchestrator()
+        second = EmbeddingService(orchestrator, persistent_cache=SQLiteEmbeddingCache(path))
+        batch = await second.generate_batch(["a", "bb", "ccc", "dddd"])
+        
+        assert [request.input_data for request in orchestrator.requests] == [["dddd"]]
+        assert [float(result.embedding[0]) for result in batch.embeddings[:3]] == [1.0, 2.0, 3.0]
+        assert second.get_cache_stats()["persistent_cache_hits"] == 3
+        assert (await second.generate_embedding("a")).metadata == {"cache": "persistent"}
+        assert orchestrator.requests[1:] == []
+    
+    @pytest.mark.asyncio
+    async def test_backend_calls_run_off_the_event_loop(self):
+        """Persistent reads and writes happen in a worker thread, never on the loop thread."""
+        backend = RecordingBackend()
+        service = EmbeddingService(FakeOrchestrator(), persistent_cache=backend)
+        
+        await service.generate_embedding("a")
+        await service.generate_batch(["bb", "ccc"])
+        
+        assert len(backend.data) == 3
+        assert backend.threads
+        assert threading.get_ident() not in backend.threads
+    
+    @pytest.mark.asyncio
+    async def test_failed_results_are_not_persisted(self):
+        """Placeholders for failed calls never reach the persistent tier."""
+        backend = RecordingBackend()
+        service = EmbeddingService(FakeOrchestrator(fail=True), persistent_cache=backend)
+        
+        await service.generate_batch(["a", "bb"])
+        
+        assert backend.data == {}
+
+
+class TestTokenAwarePacking:
+    """Test packing of generate_batch requests by input count and estimated tokens."""
+    
+    @pytest.fixture
+    def service(self):
+        service = EmbeddingService(FakeOrchestrator())
+        # One token per character keeps the limits easy to reason about
+        service._estimate_tokens = lambda text, model: len(text)
+        return service
+    
+    def test_packs_in_order_under_token_limit(self, service):
+        """A request is closed when the next text would exceed the token limit."""
+        batches = service._pack_batches(["aaaa", "bbb", "cc", "dddddd", "e"], "m", max_inputs=10, max_tokens=7)
+        
+        assert batches == [(["aaaa", "bbb"], 7), (["cc"], 2), (["dddddd", "e"], 7)]
+    
+    def test_packs_under_input_limit(self, service):
+        """A request is closed once it holds max_inputs texts."""
+        batches = service._pack_batches(["a"] * 5, "m", max_inputs=2, max_tokens=100)
+        
+        assert [texts for texts, _ in batches] == [["a", "a"], ["a", "a"], ["a"]]
+    
+    def test_oversized_text_gets_its_own_request(self, service):
+        """A text over the token limit on its own is still sent, alone."""
+        batches = service._pack_batches(["ab", "x" * 20, "cd"], "m", max_inputs=10, max_tokens=5)
+        
+        assert batches == [(["ab"], 2), (["x" * 20], 20), (["cd"], 2)]
+    
+    def test_empty_input(self, service):
+        """No texts pack into no requests."""
+        assert service._pack_batches([], "m", max_inputs=10, max_tokens=10) == []
+    
+    def test_estimate_without_tiktoken_overestimates(self):
+        """The fallback estimate errs high relative to the usual four characters per token."""
+        service = EmbeddingService(FakeOrchestrator())
+        service._token_encoders["m"] = None  # as if tiktoken were unavailable
+        
+        assert service._estimate_tokens("x" * 300, "m") == 101
+        assert service._estimate_tokens("", "m") == 1
+    
+    @pytest.mark.asyncio
+    async def test_generate_batch_reports_packing(self, service):
+        """generate_batch sends one call per packed request and reports the average size."""
+        orchestrator = service.orchestrator
+        
+        batch = await service.generate_batch(["aaaa", "bbb", "cc"], max_tokens_per_request=7)
+        
+        assert sorted(request.input_data for request in orchestrator.requests) == [["aaaa", "bbb"], ["cc"]]
+        assert batch.metadata["request_count"] == 2
+        assert batch.metadata["avg_tokens_per_request"] == 4.5
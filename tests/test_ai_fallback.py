@@ -0,0 +1,479 @@
+"""Tests for AI fallback execution."""
+
+import pytest
+import asyncio
+import time
+from types import SimpleNamespace
+
+from src.core.exceptions import AIServiceError
+from src.services.ai.fallback import (
+    CircuitBreaker,
+    ErrorType,
+    FallbackConfig,
+    FallbackManager,
+    FallbackStrategy,
+    MicroBatcher,
+    _CBState,
+)
+from src.services.ai.models import AIModel, ModelCapability, ModelProvider, ModelType
+
+
+def make_model(name: str, **metadata) -> AIModel:
+    """Create a minimal chat model configuration."""
+    return AIModel(
+        name=name,
+        provider=ModelProvider.OPENAI,
+        model_type=ModelType.CHAT,
+        capabilities=[ModelCapability.TEXT_GENERATION],
+        max_tokens=1000,
+        metadata=metadata,
+    )
+
+
+def response(content: str, confidence: float = 0.9) -> SimpleNamespace:
+    """Create a model response carrying a confidence score."""
+    return SimpleNamespace(content=content, confidence=confidence)
+
+
+class TestFallbackSingleFlight:
+    """Test collapsing of concurrent identical fallback requests."""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_share_one_execution(self):
+        """Followers await the leader's result instead of calling the model again."""
+        manager = FallbackManager(FallbackConfig(retry_delay=0))
+        calls = []
+        
+        async def request_func(model, prompt):
+            calls.append(prompt)
+            await asyncio.sleep(0.01)
+            return response(prompt)
+        
+        results = await asyncio.gather(*(
+            manager.execute_with_fallback(make_model("a"), [], ModelCapability.TEXT_GENERATION,
+                                          request_func, "hi", cache_key="hi")
+            for _ in range(4)
+        ))
+        
+        assert calls == ["hi"]
+        assert all(result is results[0] for result in results)
+        assert manager._inflight == {}
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_cancel_followers(self):
+        """Cancelling the leader makes followers retry and elect a new leader."""
+        manager = FallbackManager(FallbackConfig(retry_delay=0))
+        calls = []
+        
+        async def request_func(model, prompt):
+            calls.append(prompt)
+            await asyncio.sleep(0.01)
+            return response(prompt)
+        
+        def execute():
+            return manager.execute_with_fallback(
+                make_model("a"), [], ModelCapability.TEXT_GENERATION, request_func, "hi", cache_key="hi"
+            )
+        
+        leader = asyncio.create_task(execute())
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(execute()) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        
+        results = await asyncio.gather(*followers)
+        
+        assert leader.cancelled()
+        assert all(result.success and result.response.content == "hi" for result in results)
+        assert len(calls) == 2
+        assert manager._inflight == {}
+    
+    @pytest.mark.asyncio
+    async def test_successful_response_cached_within_ttl(self):
+        """With cache_ttl set, a later identical request reuses the earlier response."""
+        manager = FallbackManager(FallbackConfig(retry_delay=0, cache_ttl=60))
+        calls = []
+        
+        async def request_func(model, prompt):
+            calls.append(prompt)
+            return response(prompt)
+        
+        for _ in range(2):
+            result = await manager.execute_with_fallback(
+                make_model("a"), [], ModelCapability.TEXT_GENERATION, request_func, "hi", cache_key="hi"
+            )
+            assert result.success and result.final_model == "a"
+        
+        assert calls == ["hi"]
+
+
+def expire_open_breaker(breaker: CircuitBreaker) -> None:
+    """Open a breaker whose timeout has already elapsed, so the next check goes half-open."""
+    breaker.state = _CBState.OPEN
+    breaker.last_failure_time = time.monotonic() - breaker.timeout - 1
+
+
+class TestCircuitBreaker:
+    """Test circuit breaker state transitions."""
+    
+    def test_opens_after_failure_threshold(self):
+        """The breaker opens once consecutive failures reach the threshold."""
+        breaker = CircuitBreaker(failure_threshold=2, timeout=60)
+        
+        breaker.record_failure()
+        assert breaker.can_execute()
+        breaker.record_failure()
+        
+        assert breaker.state is _CBState.OPEN
+        assert not breaker.can_execute()
+    
+    def test_half_open_limits_concurrent_probes(self):
+        """After the timeout only half_open_max_calls probes are admitted."""
+        breaker = CircuitBreaker(timeout=60, half_open_max_calls=2)
+        expire_open_breaker(breaker)
+        
+        assert breaker.can_execute()
+        assert breaker.state is _CBState.HALF_OPEN
+        assert breaker.can_execute()
+        assert not breaker.can_execute()
+        
+        breaker.release()
+        assert breaker.can_execute()
+    
+    def test_closes_after_consecutive_probe_successes(self):
+        """A half-open breaker closes only after success_threshold successful probes."""
+        breaker = CircuitBreaker(timeout=60, half_open_max_calls=1, success_threshold=2)
+        expire_open_breaker(breaker)
+        
+        assert breaker.can_execute()
+        breaker.record_success()
+        assert breaker.state is _CBState.HALF_OPEN
+        
+        assert breaker.can_execute()
+        breaker.record_success()
+        assert breaker.state is _CBState.CLOSED
+    
+    def test_failed_probe_reopens(self):
+        """A failed probe reopens the breaker immediately."""
+        breaker = CircuitBreaker(failure_threshold=5, timeout=60, success_threshold=2)
+        expire_open_breaker(breaker)
+        
+        assert breaker.can_execute()
+        breaker.record_success()
+        assert breaker.can_execute()
+        breaker.record_failure()
+        
+        assert breaker.state is _CBState.OPEN
+        assert not breaker.can_execute()
+    
+    @pytest.mark.asyncio
+    async def test_parallel_winner_does_not_leak_sibling_probe_slot(self):
+        """A sibling cancelled before it starts leaves its half-open breaker usable."""
+        manager = FallbackManager(FallbackConfig(strategy=FallbackStrategy.PARALLEL))
+        for name in ("x", "y"):
+            expire_open_breaker(manager.get_circuit_breaker(name))
+        
+        async def request_func(model, prompt):
+            return response(model.name)
+        
+        result = await manager.execute_with_fallback(
+            make_model("x"), [make_model("y")], ModelCapability.TEXT_GENERATION, request_func, "hi"
+        )
+        
+        assert result.success and result.final_model == "x"
+        breaker = manager.get_circuit_breaker("y")
+        assert breaker._half_open_inflight == 0
+        assert breaker.can_execute()
+    
+    @pytest.mark.asyncio
+    async def test_parallel_all_breakers_open(self):
+        """Parallel execution fails fast when no breaker admits a call."""
+        manager = FallbackManager(FallbackConfig(strategy=FallbackStrategy.PARALLEL, circuit_breaker_timeout=60))
+        for name in ("x", "y"):
+            breaker = manager.get_circuit_breaker(name)
+            breaker.state = _CBState.OPEN
+            breaker.last_failure_time = time.monotonic()
+        
+        async def request_func(model, prompt):
+            raise AssertionError("breaker should have rejected the call")
+        
+        result = await manager.execute_with_fallback(
+            make_model("x"), [make_model("y")], ModelCapability.TEXT_GENERATION, request_func, "hi"
+        )
+        
+        assert not result.success
+        assert result.error == "No models available (all circuit breakers open)"
+
+
+class TestParallelFallback:
+    """Test parallel first-acceptable-wins execution."""
+    
+    @pytest.mark.asyncio
+    async def test_first_success_wins_and_losers_are_cancelled(self):
+        """The fastest successful model wins; slower calls are cancelled, not awaited."""
+        manager = FallbackManager(FallbackConfig(strategy=FallbackStrategy.PARALLEL))
+        cancelled = []
+        
+        async def request_func(model, prompt):
+            try:
+                await asyncio.sleep({"fast": 0, "slow": 10}[model.name])
+            except asyncio.CancelledError:
+                cancelled.append(model.name)
+                raise
+            return response(model.name)
+        
+        started = time.monotonic()
+        result = await manager.execute_with_fallback(
+            make_model("slow"), [make_model("fast")], ModelCapability.TEXT_GENERATION, request_func, "hi"
+        )
+        
+        assert result.success and result.final_model == "fast"
+        assert result.response.content == "fast"
+        assert cancelled == ["slow"]
+        assert time.monotonic() - started < 1
+        assert [attempt.model_name for attempt in result.attempts] == ["fast"]
+        assert manager.get_circuit_breaker("slow").failure_count == 0
+    
+    @pytest.mark.asyncio
+    async def test_failures_do_not_stop_a_later_success(self):
+        """A model that errors is recorded and the group keeps waiting for another model."""
+        manager = FallbackManager(FallbackConfig(strategy=FallbackStrategy.PARALLEL))
+        
+        async def request_func(model, prompt):
+            if model.name == "broken":
+                raise Exception("connection reset")
+            await asyncio.sleep(0.01)
+            return response(model.name)
+        
+        result = await manager.execute_with_fallback(
+            make_model("broken"), [make_model("ok")], ModelCapability.TEXT_GENERATION, request_func, "hi"
+        )
+        
+        assert result.success and result.final_model == "ok"
+        assert [(a.model_name, a.success) for a in result.attempts] == [("broken", False), ("ok", True)]
+        assert result.attempts[0].error_type is ErrorType.NETWORK_ERROR
+    
+    @pytest.mark.asyncio
+    async def test_parallel_timeout_cancels_all_attempts(self):
+        """When nothing finishes within parallel_timeout the result is a failure."""
+        manager = FallbackManager(FallbackConfig(strategy=FallbackStrategy.PARALLEL, parallel_timeout=0.05))
+        cancelled = []
+        
+        async def request_func(model, prompt):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(model.name)
+                raise
+        
+        result = await manager.execute_with_fallback(
+            make_model("a"), [make_model("b")], ModelCapability.TEXT_GENERATION, request_func, "hi"
+        )
+        
+        assert not result.success
+        assert result.error == "Parallel execution timeout or no successful results"
+        assert sorted(cancelled) == ["a", "b"]
+        assert result.attempts == []
+    
+    @pytest.mark.asyncio
+    async def test_cancelling_the_caller_cancels_every_attempt(self):
+        """Cancelling the request cancels all in-flight model calls."""
+        manager = FallbackManager(FallbackConfig(strategy=FallbackStrategy.PARALLEL))
+        cancelled = []
+        
+        async def request_func(model, prompt):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(model.name)
+                raise
+        
+        task = asyncio.create_task(manager.execute_with_fallback(
+            make_model("a"), [make_model("b")], ModelCapability.TEXT_GENERATION, request_func, "hi"
+        ))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert sorted(cancelled) == ["a", "b"]
+    
+    @pytest.mark.asyncio
+    async def test_low_confidence_attempts_are_recorded_and_do_not_win(self):
+        """Completed low-confidence responses are recorded as failures, numbered in completion order."""
+        manager = FallbackManager(FallbackConfig(strategy=FallbackStrategy.PARALLEL, confidence_threshold=0.7))
+        
+        async def request_func(model, prompt):
+            delay, confidence = {"unsure": (0, 0.3), "sure": (0.02, 0.95)}[model.name]
+            await asyncio.sleep(delay)
+            return response(model.name, confidence)
+        
+        result = await manager.execute_with_fallback(
+            make_model("unsure"), [make_model("sure")], ModelCapability.TEXT_GENERATION, request_func, "hi"
+        )
+        
+        assert result.success and result.final_model == "sure"
+        unsure, sure = result.attempts
+        assert (unsure.model_name, unsure.attempt_number, unsure.success) == ("unsure", 1, False)
+        assert unsure.error_type is ErrorType.LOW_CONFIDENCE
+        assert unsure.confidence == 0.3
+        assert (sure.model_name, sure.attempt_number, sure.success) == ("sure", 2, True)
+        assert manager.get_circuit_breaker("unsure").failure_count == 1
+        
+        stats = manager.get_stats()["model_stats"]
+        assert stats["unsure"]["failed_attempts"] == 1
+        assert stats["sure"]["successful_attempts"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_all_low_confidence_is_a_failure(self):
+        """When every model answers below the threshold there is no winner."""
+        manager = FallbackManager(FallbackConfig(strategy=FallbackStrategy.PARALLEL, confidence_threshold=0.7))
+        
+        async def request_func(model, prompt):
+            return response(model.name, 0.1)
+        
+        result = await manager.execute_with_fallback(
+            make_model("a"), [make_model("b")], ModelCapability.TEXT_GENERATION, request_func, "hi"
+        )
+        
+        assert not result.success
+        assert len(result.attempts) == 2
+        assert all(attempt.error_type is ErrorType.LOW_CONFIDENCE for attempt in result.attempts)
+
+
+class TestMicroBatcher:
+    """Test coalescing of single-payload requests into batch calls."""
+    
+    @pytest.mark.asyncio
+    async def test_requests_within_window_share_one_call(self):
+        """Requests arriving inside the window are sent together and answered in order."""
+        batches = []
+        
+        async def batch_func(model, payloads):
+            batches.append(list(payloads))
+            return [payload.upper() for payload in payloads]
+        
+        batcher = MicroBatcher(batch_func, window_ms=10, max_batch=8)
+        model = make_model("embed")
+        
+        results = await asyncio.gather(*(batcher.submit(model, text) for text in ["a", "b", "c"]))
+        
+        assert results == ["A", "B", "C"]
+        assert batches == [["a", "b", "c"]]
+    
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_without_waiting_and_splits(self):
+        """A batch is sent as soon as max_batch requests queue up; the rest go in the next one."""
+        batches = []
+        
+        async def batch_func(model, payloads):
+            batches.append(list(payloads))
+            return payloads
+        
+        batcher = MicroBatcher(batch_func, window_ms=10_000, max_batch=2)
+        model = make_model("embed")
+        
+        first = await asyncio.wait_for(
+            asyncio.gather(batcher.submit(model, 1), batcher.submit(model, 2)), timeout=1
+        )
+        
+        assert first == [1, 2]
+        assert batches == [[1, 2]]
+        
+        tasks = [asyncio.create_task(batcher.submit(model, n)) for n in (3, 4, 5)]
+        await asyncio.sleep(0.01)
+        
+        assert batches == [[1, 2], [3, 4]]
+        assert [task.done() for task in tasks] == [True, True, False]
+        batcher._flush(model.name)
+        assert await tasks[2] == 5
+    
+    @pytest.mark.asyncio
+    async def test_models_are_batched_separately(self):
+        """Requests for different models never share a batch."""
+        batches = []
+        
+        async def batch_func(model, payloads):
+            batches.append((model.name, list(payloads)))
+            return payloads
+        
+        batcher = MicroBatcher(batch_func, window_ms=5, max_batch=8)
+        
+        await asyncio.gather(
+            batcher.submit(make_model("a"), 1), batcher.submit(make_model("b"), 2), batcher.submit(make_model("a"), 3)
+        )
+        
+        assert sorted(batches) == [("a", [1, 3]), ("b", [2])]
+    
+    @pytest.mark.asyncio
+    async def test_batch_error_fans_out_to_every_caller(self):
+        """A failed batch call raises the same error for each request in it."""
+        async def batch_func(model, payloads):
+            raise Exception("rate limit")
+        
+        batcher = MicroBatcher(batch_func, window_ms=5, max_batch=8)
+        model = make_model("embed")
+        
+        results = await asyncio.gather(
+            batcher.submit(model, "a"), batcher.submit(model, "b"), return_exceptions=True
+        )
+        
+        assert [str(result) for result in results] == ["rate limit", "rate limit"]
+    
+    @pytest.mark.asyncio
+    async def test_response_count_mismatch_fails_the_batch(self):
+        """A batch response with the wrong number of items is an error for every caller."""
+        async def batch_func(model, payloads):
+            return payloads[:1]
+        
+        batcher = MicroBatcher(batch_func, window_ms=5, max_batch=8)
+        model = make_model("embed")
+        
+        results = await asyncio.gather(
+            batcher.submit(model, "a"), batcher.submit(model, "b"), return_exceptions=True
+        )
+        
+        assert all(isinstance(result, AIServiceError) for result in results)
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_callers_are_dropped_from_the_batch(self):
+        """A request cancelled before dispatch is not sent to the provider."""
+        batches = []
+        
+        async def batch_func(model, payloads):
+            batches.append(list(payloads))
+            return payloads
+        
+        batcher = MicroBatcher(batch_func, window_ms=10, max_batch=8)
+        model = make_model("embed")
+        
+        dropped = asyncio.create_task(batcher.submit(model, "dropped"))
+        kept = asyncio.create_task(batcher.submit(model, "kept"))
+        await asyncio.sleep(0)
+        dropped.cancel()
+        
+        assert await kept == "kept"
+        assert batches == [["kept"]]
+    
+    @pytest.mark.asyncio
+    async def test_manager_routes_batch_capable_models_through_batcher(self):
+        """FallbackManager batches single-payload calls to models flagged supports_batch."""
+        batches = []
+        
+        async def batch_func(model, payloads):
+            batches.append(list(payloads))
+            return [response(payload) for payload in payloads]
+        
+        async def request_func(model, prompt):
+            raise AssertionError("batch-capable models should go through the batcher")
+        
+        manager = FallbackManager(FallbackConfig(batch_window_ms=5), batch_func=batch_func)
+        model = make_model("embed", supports_batch=True)
+        
+        results = await asyncio.gather(*(
+            manager.execute_with_fallback(model, [], ModelCapability.TEXT_GENERATION, request_func, text)
+            for text in ["a", "b"]
+        ))
+        
+        assert [result.response.content for result in results] == ["a", "b"]
+        assert batches == [["a", "b"]]
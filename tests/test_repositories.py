@@ -0,0 +1,331 @@
+"""Tests for repository statements, compiled against the PostgreSQL dialect."""
+
+import pytest
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import asyncpg
+from sqlalchemy.orm import Session
+
+from src.models.conversation import OPEN_CONVERSATION_STATUSES, Conversation
+from src.repositories.base import BaseRepository
+from src.repositories.conversation import ConversationRepository
+from src.repositories.message import MessageRepository
+from src.repositories.organization import OrganizationRepository, _feature_cache
+from src.repositories.user import UserRepository
+
+
+def compile_pg(stmt):
+    """Compile a statement for PostgreSQL, keeping bound parameters."""
+    return stmt.compile(dialect=postgresql.dialect())
+
+
+def result_with(**methods) -> MagicMock:
+    """Fake Result whose named (dotted) methods return the given values."""
+    return MagicMock(**{f"{name}.return_value": value for name, value in methods.items()})
+
+
+class RecordingSession:
+    """AsyncSession stand-in that records executed statements and replays canned results."""
+    
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+        self.params = []
+        self.commits = 0
+    
+    async def execute(self, stmt, params=None):
+        self.statements.append(stmt)
+        self.params.append(params)
+        return self.results.pop(0) if self.results else MagicMock()
+    
+    async def commit(self):
+        self.commits += 1
+
+
+class TestBaseRepositoryUpdate:
+    """Test BaseRepository.update via UPDATE ... RETURNING."""
+    
+    @pytest.mark.asyncio
+    async def test_update_is_one_statement_returning_the_row(self):
+        """update issues a single UPDATE ... RETURNING and hands back the returned row."""
+        updated = Conversation(status="resolved")
+        session = RecordingSession(result_with(scalar_one_or_none=updated))
+        repository = BaseRepository(session, Conversation)
+        conversation_id = uuid4()
+        
+        assert await repository.update(conversation_id, status="resolved") is updated
+        
+        (stmt,) = session.statements
+        compiled = compile_pg(stmt)
+        sql = str(compiled)
+        assert sql.startswith("UPDATE core.conversations SET status=")
+        assert "WHERE core.conversations.id = " in sql
+        assert "RETURNING core.conversations." in sql and "core.conversations.updated_at" in sql
+        assert conversation_id in compiled.params.values()
+        assert compiled.params["status"] == "resolved"
+        # Identity-map copies of the row are refreshed with the returned values
+        assert stmt.get_execution_options()["populate_existing"] is True
+    
+    @pytest.mark.asyncio
+    async def test_update_of_missing_row_returns_none(self):
+        """No row comes back when the id does not exist."""
+        session = RecordingSession(result_with(scalar_one_or_none=None))
+        repository = BaseRepository(session, Conversation)
+        
+        assert await repository.update(uuid4(), status="resolved") is None
+
+
+class TestBaseRepositoryDelete:
+    """Test BaseRepository.delete via DELETE ... RETURNING."""
+    
+    @pytest.mark.asyncio
+    async def test_delete_is_one_statement_and_reports_a_hit(self):
+        """delete issues a single DELETE ... RETURNING id and returns True when a row went."""
+        conversation_id = uuid4()
+        session = RecordingSession(result_with(scalar_one_or_none=conversation_id))
+        repository = BaseRepository(session, Conversation)
+        
+        assert await repository.delete(conversation_id) is True
+        
+        (stmt,) = session.statements
+        compiled = compile_pg(stmt)
+        assert str(compiled) == (
+            "DELETE FROM core.conversations WHERE core.conversations.id = %(id_1)s::UUID "
+            "RETURNING core.conversations.id"
+        )
+        assert compiled.params == {"id_1": conversation_id}
+    
+    @pytest.mark.asyncio
+    async def test_delete_of_missing_row_returns_false(self):
+        """delete returns False when no row matched."""
+        session = RecordingSession(result_with(scalar_one_or_none=None))
+        repository = BaseRepository(session, Conversation)
+        
+        assert await repository.delete(uuid4()) is False
+
+
+class TestBaseRepositoryBulkCreate:
+    """Test chunked multi-row inserts."""
+    
+    @pytest.mark.asyncio
+    async def test_bulk_create_chunks_and_keeps_row_order(self):
+        """Rows go out in BULK_INSERT_CHUNK_SIZE executemany batches with ids sorted back into row order."""
+        rows = [{"channel": "web", "status": "active"} for _ in range(5)]
+        ids = [uuid4() for _ in rows]
+        session = RecordingSession(
+            result_with(**{"scalars.return_value.all": ids[:2]}),
+            result_with(**{"scalars.return_value.all": ids[2:4]}),
+            result_with(**{"scalars.return_value.all": ids[4:]}),
+        )
+        repository = BaseRepository(session, Conversation)
+        
+        with patch("src.repositories.base.BULK_INSERT_CHUNK_SIZE", 2):
+            assert await repository.bulk_create(rows) == ids
+        
+        assert [len(params) for params in session.params] == [2, 2, 1]
+        for stmt in session.statements:
+            assert stmt._sort_by_parameter_order is True
+            assert str(compile_pg(stmt)).endswith("RETURNING core.conversations.id")
+    
+    @pytest.mark.asyncio
+    async def test_bulk_create_with_no_rows_issues_no_statement(self):
+        """An empty batch makes no round trip."""
+        session = RecordingSession()
+        
+        assert await BaseRepository(session, Conversation).bulk_create([]) == []
+        assert session.statements == []
+
+
+class TestLambdaStatements:
+    """Test that cached lambda_stmt queries bind each call's closure values."""
+    
+    @pytest.mark.asyncio
+    async def test_conversation_lookup_binds_each_calls_values(self):
+        """A second call reuses the cached statement but with its own user and channel."""
+        session = RecordingSession()
+        repository = ConversationRepository(session)
+        first, second = uuid4(), uuid4()
+        
+        await repository.get_active_by_user(first, "web")
+        await repository.get_active_by_user(second, "sms")
+        
+        params = [compile_pg(stmt).params for stmt in session.statements]
+        assert [(p["user_id_1"], p["channel_1"]) for p in params] == [(first, "web"), (second, "sms")]
+        assert list(params[0]["OPEN_CONVERSATION_STATUSES_1"]) == ["active", "waiting_for_user", "waiting_for_agent", "processing"]
+    
+    @pytest.mark.asyncio
+    async def test_message_listing_binds_conversation_and_limit(self):
+        """The conversation id and limit are bound parameters, not values frozen into the cache."""
+        session = RecordingSession()
+        repository = MessageRepository(session)
+        first, second = uuid4(), uuid4()
+        
+        await repository.list_by_conversation(first, limit=10)
+        await repository.list_by_conversation_lite(first, limit=5)
+        await repository.list_by_conversation(second, limit=20)
+        
+        compiled = [compile_pg(stmt) for stmt in session.statements]
+        assert [(c.params["conversation_id_1"], c.params["limit_1"]) for c in compiled] == [
+            (first, 10), (first, 5), (second, 20)
+        ]
+        assert "LIMIT %(limit_1)s" in str(compiled[2])
+    
+    @pytest.mark.asyncio
+    async def test_user_lookup_binds_organization_and_email(self):
+        """get_by_email binds each call's organization and address."""
+        session = RecordingSession()
+        repository = UserRepository(session)
+        org = uuid4()
+        
+        await repository.get_by_email(org, "a@example.com")
+        await repository.get_by_email(org, "b@example.com")
+        
+        emails = [
+            value for stmt in session.statements for value in compile_pg(stmt).params.values() if isinstance(value, str)
+        ]
+        assert emails == ["a@example.com", "b@example.com"]
+
+
+class TestCloseAbandoned:
+    """Test batched, skip-locked closing of stale conversations."""
+    
+    @pytest.mark.asyncio
+    async def test_batches_until_a_short_batch_committing_each(self):
+        """Full batches repeat the UPDATE; each batch is committed; the total is returned."""
+        session = RecordingSession(
+            result_with(fetchall=[(uuid4(),)] * 3),
+            result_with(fetchall=[(uuid4(),)] * 3),
+            result_with(fetchall=[(uuid4(),)]),
+        )
+        repository = ConversationRepository(session)
+        
+        assert await repository.close_abandoned(timeout_hours=12, batch_size=3) == 7
+        
+        assert len(session.statements) == 3
+        assert session.commits == 3
+    
+    @pytest.mark.asyncio
+    async def test_nothing_stale_is_one_empty_batch(self):
+        """With no stale rows a single UPDATE runs and is committed."""
+        session = RecordingSession(result_with(fetchall=[]))
+        
+        assert await ConversationRepository(session).close_abandoned() == 0
+        assert session.commits == 1
+    
+    @pytest.mark.asyncio
+    async def test_update_locks_a_bounded_batch_with_skip_locked(self):
+        """Each UPDATE targets at most batch_size ids chosen with FOR UPDATE SKIP LOCKED."""
+        session = RecordingSession(result_with(fetchall=[]))
+        
+        await ConversationRepository(session).close_abandoned(timeout_hours=12, batch_size=50)
+        
+        compiled = compile_pg(session.statements[0])
+        sql = " ".join(str(compiled).split())
+        assert sql.startswith("UPDATE core.conversations SET status=")
+        assert "WHERE core.conversations.id IN (SELECT core.conversations.id FROM core.conversations" in sql
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert compiled.params["status_1"] == ["active", "waiting_for_user"]
+        assert sql.endswith("RETURNING core.conversations.id")
+        assert 50 in compiled.params.values()
+        assert compiled.params["status"] == "abandoned"
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("batch_size", [0, -1])
+    async def test_rejects_non_positive_batch_size(self, batch_size):
+        """A batch size below one is refused before any statement runs."""
+        session = RecordingSession()
+        
+        with pytest.raises(ValueError):
+            await ConversationRepository(session).close_abandoned(batch_size=batch_size)
+        assert session.statements == []
+
+
+class TestSingleStatementWrites:
+    """Test writes that run one statement and leave flushing to the caller."""
+    
+    @pytest.mark.asyncio
+    async def test_create_is_one_insert_returning_the_row(self):
+        """create issues INSERT ... RETURNING and returns the row without add or flush."""
+        created = Conversation(channel="web")
+        session = RecordingSession(result_with(scalar_one=created))
+        session.add = MagicMock()
+        session.flush = MagicMock()
+        repository = BaseRepository(session, Conversation)
+        
+        assert await repository.create(channel="web") is created
+        
+        (stmt,) = session.statements
+        compiled = compile_pg(stmt)
+        sql = str(compiled)
+        assert sql.startswith("INSERT INTO core.conversations (channel")
+        assert "RETURNING core.conversations." in sql and "core.conversations.created_at" in sql
+        assert compiled.params["channel"] == "web"
+        session.add.assert_not_called()
+        session.flush.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_mark_escalated_does_not_flush(self):
+        """mark_escalated runs a single UPDATE and leaves flushing to the caller."""
+        session = RecordingSession()
+        session.flush = MagicMock()
+        conversation_id = uuid4()
+        
+        await ConversationRepository(session).mark_escalated(conversation_id, "customer request")
+        
+        (stmt,) = session.statements
+        compiled = compile_pg(stmt)
+        assert str(compiled).startswith("UPDATE core.conversations SET escalated=")
+        assert compiled.params["escalation_reason"] == "customer request"
+        assert conversation_id in compiled.params.values()
+        session.flush.assert_not_called()
+
+
+class TestConversationStatusType:
+    """Test that the status column binds to the deployed enum type."""
+    
+    def test_status_binds_to_the_schema_enum(self):
+        """Writes cast to core.conversation_status, whose values match database_schema.sql."""
+        status_type = Conversation.__table__.c.status.type
+        sql = str(update(Conversation).values(status="active").compile(dialect=asyncpg.dialect()))
+        
+        assert sql == "UPDATE core.conversations SET status=$1::core.conversation_status"
+        assert status_type.create_type is False
+        assert "waiting" not in status_type.enums
+        assert set(OPEN_CONVERSATION_STATUSES) <= set(status_type.enums)
+
+
+class TestOrganizationFeatureCache:
+    """Test that organization writes evict cached feature sets after their commit."""
+    
+    @pytest.mark.asyncio
+    async def test_update_evicts_again_after_commit(self):
+        """A stale value re-cached while the update is in flight is dropped when it commits."""
+        session = RecordingSession(result_with(scalar_one_or_none=None))
+        session.sync_session = Session()
+        org_id = uuid4()
+        _feature_cache.set(org_id, frozenset({"old"}))
+        
+        await OrganizationRepository(session).update(org_id, features=["new"])
+        assert _feature_cache.get(org_id) is None
+        
+        # A concurrent reader caches the pre-commit features
+        _feature_cache.set(org_id, frozenset({"old"}))
+        session.sync_session.dispatch.after_commit(session.sync_session)
+        
+        assert _feature_cache.get(org_id) is None
+    
+    @pytest.mark.asyncio
+    async def test_delete_evicts_again_after_rollback(self):
+        """Features cached from the rolled-back transaction do not outlive it."""
+        session = RecordingSession(result_with(scalar_one_or_none=None))
+        session.sync_session = Session()
+        org_id = uuid4()
+        
+        await OrganizationRepository(session).delete(org_id)
+        _feature_cache.set(org_id, frozenset({"sso"}))
+        session.sync_session.dispatch.after_rollback(session.sync_session)
+        
+        assert _feature_cache.get(org_id) is None